@@ -7,11 +7,17 @@ import os
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
+from config import settings
+from models import compression
 from models.database import Base
 from models.tables import *  # noqa: F401,F403
 
 config = context.config
-if config.config_file_name is not None:
+# 命令行运行时与应用使用同一个数据库（DATABASE_URL），init_db 调用时已显式设置
+if config.attributes.get("connection") is None:
+    config.set_main_option("sqlalchemy.url", settings.database_url)
+# init_db 以编程方式调用时不覆盖应用的日志配置
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
     fileConfig(config.config_file_name)
 
 target_metadata = Base.metadata
@@ -25,15 +31,27 @@ def run_migrations_offline():
 
 
 def run_migrations_online():
+    # init_db 会传入已有连接，命令行运行时自行创建
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run_with_connection(connection)
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
     )
+    # FTS 触发器/视图调用 unz()，命令行迁移同样需要注册
+    compression.install(connectable)
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
-        with context.begin_transaction():
-            context.run_migrations()
+        _run_with_connection(connection)
+
+
+def _run_with_connection(connection):
+    context.configure(connection=connection, target_metadata=target_metadata, render_as_batch=True)
+    with context.begin_transaction():
+        context.run_migrations()
 
 
 if context.is_offline_mode():
@@ -0,0 +1,25 @@
+"""keyset 分页索引：article(published_at, id)、vocab_item(created_at, id)
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 无发布时间的文章以抓取时间代替，保证排序键非空
+    op.execute("UPDATE article SET published_at = fetched_at WHERE published_at IS NULL")
+    op.create_index("ix_article_published_id", "article", ["published_at", "id"], if_not_exists=True)
+    op.create_index("ix_vocab_item_created_id", "vocab_item", ["created_at", "id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_vocab_item_created_id", table_name="vocab_item")
+    op.drop_index("ix_article_published_id", table_name="article")
@@ -0,0 +1,23 @@
+"""阅读器分页索引：article_sentence(article_id, index)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_article_sentence_article_index", "article_sentence", ["article_id", "index"], if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_article_sentence_article_index", table_name="article_sentence")
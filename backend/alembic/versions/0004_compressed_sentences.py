@@ -0,0 +1,87 @@
+"""句子文本压缩存储
+
+正文改由句子重建；重复的 article.content 在 0008 记录段落序号后才清空。
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00
+"""
+import random
+from datetime import datetime
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from models import compression
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_BATCH = 1000
+_TRAINING_SAMPLE = 20000
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    store = compression.store_for(conn)
+
+    # 旧触发器直接读明文列，先删除；init_db 随后按新定义重建 FTS 索引
+    for fts in ("article_fts", "sentence_fts", "sentence_zh_fts"):
+        for suffix in ("ai", "ad", "au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+
+    plain_ids = [r[0] for r in conn.execute(sa.text(
+        "SELECT id FROM article_sentence WHERE typeof(text_en) = 'text' ORDER BY id"
+    ))]
+    if plain_ids:
+        _train_dictionary(conn, plain_ids)
+
+    for i in range(0, len(plain_ids), _BATCH):
+        rows = conn.execute(
+            sa.text("SELECT id, text_en, text_zh FROM article_sentence WHERE id IN :ids")
+            .bindparams(sa.bindparam("ids", expanding=True)),
+            {"ids": plain_ids[i:i + _BATCH]},
+        ).all()
+        conn.execute(
+            sa.text("UPDATE article_sentence SET text_en = :en, text_zh = :zh WHERE id = :id"),
+            [
+                {"id": r.id, "en": store.compress(r.text_en), "zh": store.compress(r.text_zh)}
+                for r in rows
+            ],
+        )
+
+
+def _train_dictionary(conn, plain_ids: list[int]):
+    """用待压缩的明文句子训练首个字典，使迁移即获得字典压缩率"""
+    if conn.execute(sa.text("SELECT 1 FROM compression_dict LIMIT 1")).first():
+        return
+    sample = random.sample(plain_ids, min(_TRAINING_SAMPLE, len(plain_ids)))
+    texts = []
+    for i in range(0, len(sample), _BATCH):
+        texts += [r[0] for r in conn.execute(
+            sa.text("SELECT text_en FROM article_sentence WHERE id IN :ids")
+            .bindparams(sa.bindparam("ids", expanding=True)),
+            {"ids": sample[i:i + _BATCH]},
+        )]
+    data = compression.train_dictionary(texts)
+    dict_id = conn.execute(
+        sa.text("INSERT INTO compression_dict (data, sample_count, created_at) VALUES (:data, :n, :now)"),
+        {"data": data, "n": len(texts), "now": datetime.utcnow()},
+    ).lastrowid
+    compression.register_dictionary(dict_id, data, bind=conn)
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    store = compression.store_for(conn)
+    rows = conn.execute(sa.text("SELECT id, text_en, text_zh FROM article_sentence")).all()
+    conn.execute(
+        sa.text("UPDATE article_sentence SET text_en = :en, text_zh = :zh WHERE id = :id"),
+        [
+            {"id": r.id, "en": store.decompress(r.text_en), "zh": store.decompress(r.text_zh)}
+            for r in rows
+        ],
+    )
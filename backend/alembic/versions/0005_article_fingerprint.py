@@ -0,0 +1,30 @@
+"""近重复检测：article.canonical_id / fingerprint
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:00
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("article")}
+    with op.batch_alter_table("article") as batch:
+        if "canonical_id" not in columns:
+            batch.add_column(sa.Column("canonical_id", sa.Integer(), nullable=True))
+        if "fingerprint" not in columns:
+            batch.add_column(sa.Column("fingerprint", sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("article") as batch:
+        batch.drop_column("fingerprint")
+        batch.drop_column("canonical_id")
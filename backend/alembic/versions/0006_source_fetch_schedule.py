@@ -0,0 +1,42 @@
+"""RSS 源自适应抓取计划与健康状态
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:00
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_COLUMNS = [
+    sa.Column("fetch_interval_minutes", sa.Integer(), nullable=True),
+    sa.Column("next_fetch_at", sa.DateTime(), nullable=True),
+    sa.Column("etag", sa.String(200), nullable=True),
+    sa.Column("last_modified", sa.String(100), nullable=True),
+    sa.Column("health", sa.String(20), nullable=True, server_default="ok"),
+    sa.Column("failure_count", sa.Integer(), nullable=True, server_default="0"),
+    sa.Column("last_error", sa.Text(), nullable=True),
+    sa.Column("last_success_at", sa.DateTime(), nullable=True),
+]
+
+
+def upgrade() -> None:
+    existing = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("news_source")}
+    with op.batch_alter_table("news_source") as batch:
+        for column in _COLUMNS:
+            if column.name not in existing:
+                batch.add_column(column.copy())
+    op.create_index("ix_news_source_next_fetch_at", "news_source", ["next_fetch_at"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_news_source_next_fetch_at", table_name="news_source")
+    with op.batch_alter_table("news_source") as batch:
+        for column in reversed(_COLUMNS):
+            batch.drop_column(column.name)
@@ -0,0 +1,36 @@
+"""archived_article 使用独立主键，原文章 id 改存 article_id
+
+SQLite 未启用 AUTOINCREMENT 时会复用已删除的 article.id，原先以其作为
+archived_article 主键会在再次归档时主键冲突。已有行的 id 即原文章 id，原样复制。
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "archived_article" not in inspector.get_table_names():
+        return
+    columns = {c["name"] for c in inspector.get_columns("archived_article")}
+    if "article_id" not in columns:
+        with op.batch_alter_table("archived_article") as batch:
+            batch.add_column(sa.Column("article_id", sa.Integer(), nullable=True))
+        op.execute("UPDATE archived_article SET article_id = id WHERE article_id IS NULL")
+    op.create_index("ix_archived_article_article_id", "archived_article", ["article_id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_archived_article_article_id", table_name="archived_article")
+    with op.batch_alter_table("archived_article") as batch:
+        batch.drop_column("article_id")
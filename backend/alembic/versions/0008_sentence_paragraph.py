@@ -0,0 +1,113 @@
+"""article_sentence.paragraph 段落序号；随后清空重复的 article.content
+
+重建正文（storage_service.article_text）依赖段落序号恢复换行。段落序号由
+原 content 推算：按句序在正文中依次定位每个句子，其前的换行数即段落序号。
+全部句子都能定位的文章才清空 content；定位失败的保留原文。
+降级时按段落序号重建 content 后删除该列。
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from models import compression
+from services.storage_service import join_sentences
+
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_BATCH = 500
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    columns = {c["name"] for c in sa.inspect(conn).get_columns("article_sentence")}
+    if "paragraph" not in columns:
+        with op.batch_alter_table("article_sentence") as batch:
+            batch.add_column(sa.Column("paragraph", sa.Integer(), nullable=True))
+
+    store = compression.store_for(conn)
+    article_ids = [r[0] for r in conn.execute(sa.text(
+        "SELECT id FROM article WHERE content IS NOT NULL "
+        "AND EXISTS (SELECT 1 FROM article_sentence s WHERE s.article_id = article.id) ORDER BY id"
+    ))]
+    for i in range(0, len(article_ids), _BATCH):
+        batch_ids = article_ids[i:i + _BATCH]
+        contents = dict(conn.execute(
+            sa.text("SELECT id, content FROM article WHERE id IN :ids")
+            .bindparams(sa.bindparam("ids", expanding=True)),
+            {"ids": batch_ids},
+        ).all())
+        sentences: dict[int, list] = {}
+        for row in conn.execute(
+            sa.text("SELECT id, article_id, text_en FROM article_sentence WHERE article_id IN :ids "
+                    "ORDER BY article_id, \"index\"")
+            .bindparams(sa.bindparam("ids", expanding=True)),
+            {"ids": batch_ids},
+        ):
+            sentences.setdefault(row.article_id, []).append((row.id, store.decompress(row.text_en)))
+
+        updates, located = [], []
+        for article_id, rows in sentences.items():
+            paragraphs = _locate(contents[article_id], [text for _, text in rows])
+            if paragraphs is None:
+                continue
+            updates += [{"id": sid, "p": p} for (sid, _), p in zip(rows, paragraphs)]
+            located.append(article_id)
+        if updates:
+            conn.execute(sa.text("UPDATE article_sentence SET paragraph = :p WHERE id = :id"), updates)
+        if located:
+            conn.execute(
+                sa.text("UPDATE article SET content = NULL WHERE id IN :ids")
+                .bindparams(sa.bindparam("ids", expanding=True)),
+                {"ids": located},
+            )
+
+
+def _locate(content: str, sentences: list[str]) -> list[int] | None:
+    """各句在正文中的段落序号（段落为非空行）；有句子找不到时返回 None"""
+    lines = content.split("\n")
+    # 每个字符位置之前的非空段落数 = 所在段落序号
+    starts, paragraph, offset = [], -1, 0
+    for line in lines:
+        if line.strip():
+            paragraph += 1
+        starts.append((offset, max(paragraph, 0)))
+        offset += len(line) + 1
+
+    result, cursor, line_no = [], 0, 0
+    for sentence in sentences:
+        pos = content.find(sentence, cursor)
+        if pos == -1:
+            return None
+        while line_no + 1 < len(starts) and starts[line_no + 1][0] <= pos:
+            line_no += 1
+        result.append(starts[line_no][1])
+        cursor = pos + len(sentence)
+    return result
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    store = compression.store_for(conn)
+    texts: dict[int, list] = {}
+    for row in conn.execute(sa.text(
+        "SELECT s.article_id, s.text_en, s.paragraph FROM article_sentence s "
+        "JOIN article a ON a.id = s.article_id WHERE a.content IS NULL ORDER BY s.article_id, s.\"index\""
+    )):
+        texts.setdefault(row.article_id, []).append((store.decompress(row.text_en), row.paragraph))
+
+    if texts:
+        conn.execute(
+            sa.text("UPDATE article SET content = :content WHERE id = :id"),
+            [{"id": article_id, "content": join_sentences(rows)} for article_id, rows in texts.items()],
+        )
+
+    # 不用 batch 重建表：article_sentence_text 视图引用该表，重建时 RENAME 会失败
+    op.drop_column("article_sentence", "paragraph")
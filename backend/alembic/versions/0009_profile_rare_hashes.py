@@ -0,0 +1,50 @@
+"""article_profile.rare_hashes 打包的低频词哈希，由已有 rare_words 回填
+
+推荐打分逐篇比对低频词与生词本，原先每次请求都要 json.loads 候选文章的
+rare_words；改为读取打包的 uint32 crc32 数组。
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 00:00:00
+"""
+import json
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from services.profile_service import pack_hashes
+
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_BATCH = 1000
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    columns = {c["name"] for c in sa.inspect(conn).get_columns("article_profile")}
+    if "rare_hashes" not in columns:
+        op.add_column("article_profile", sa.Column("rare_hashes", sa.LargeBinary(), nullable=True))
+
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text("SELECT article_id, rare_words FROM article_profile "
+                    "WHERE article_id > :last AND rare_hashes IS NULL AND rare_words IS NOT NULL "
+                    "ORDER BY article_id LIMIT :n"),
+            {"last": last_id, "n": _BATCH},
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            sa.text("UPDATE article_profile SET rare_hashes = :h WHERE article_id = :id"),
+            [{"id": article_id, "h": pack_hashes(json.loads(words))} for article_id, words in rows],
+        )
+        last_id = rows[-1].article_id
+
+
+def downgrade() -> None:
+    op.drop_column("article_profile", "rare_hashes")
@@ -1,14 +1,24 @@
 """文章内容 API"""
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from models.database import get_db
-from models.tables import Article, ArticleSentence
-from schemas.schemas import ArticleOut, ArticleDetailOut
-from services.rss_service import fetch_all_sources, recommend_articles, generate_article_summary
+from models.tables import Article, ArticleSentence, NewsSource
+from schemas.schemas import ArticleOut, ArticleDetailOut, ArticleLexiconOut, NewsSourceOut, SentencePageOut
+from services.rss_service import fetch_all_sources, generate_article_summary
+from services.recommend_service import recommend_articles
+from services.profile_service import article_lexicon
+from services.pagination import apply_keyset, encode_cursor
+from services.storage_service import article_text
+from services.job_queue import enqueue
+from services.responses import rows_response
 
 router = APIRouter()
 
+# 阅读器每次下发的句子数
+SENTENCE_PAGE_SIZE = 50
+
 
 @router.post("/fetch")
 def fetch_content(db: Session = Depends(get_db)):
@@ -17,25 +27,31 @@ def fetch_content(db: Session = Depends(get_db)):
     return {"new_articles": count}
 
 
+@router.get("/sources", response_model=list[NewsSourceOut])
+def list_sources(db: Session = Depends(get_db)):
+    """RSS 源列表及抓取计划/健康状态"""
+    return db.query(NewsSource).order_by(NewsSource.id).all()
+
+
 @router.get("/recommend", response_model=list[ArticleOut])
 def get_recommendations(count: int = Query(5, ge=1, le=20), db: Session = Depends(get_db)):
     """获取推荐文章"""
     articles = recommend_articles(db, count)
-    result = []
-    for a in articles:
-        result.append(ArticleOut(
-            id=a.id,
-            title=a.title,
-            url=a.url,
-            summary=a.summary,
-            difficulty=a.difficulty,
-            category=a.category,
-            word_count=a.word_count,
-            is_read=a.is_read,
-            published_at=a.published_at,
-            source_name=a.source.name if a.source else None,
-        ))
-    return result
+    return rows_response([
+        {
+            "id": a.id,
+            "title": a.title,
+            "url": a.url,
+            "summary": a.summary,
+            "difficulty": a.difficulty,
+            "category": a.category,
+            "word_count": a.word_count,
+            "is_read": a.is_read,
+            "published_at": a.published_at,
+            "source_name": a.source.name if a.source else None,
+        }
+        for a in articles
+    ])
 
 
 @router.get("/articles", response_model=list[ArticleOut])
@@ -43,60 +59,144 @@ def list_articles(
     difficulty: str | None = None,
     category: str | None = None,
     limit: int = Query(20, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, description="上一页响应头 X-Next-Cursor 的值"),
+    offset: int = Query(0, ge=0, deprecated=True),
     db: Session = Depends(get_db),
 ):
-    """文章列表"""
-    query = db.query(Article).order_by(Article.published_at.desc())
+    """文章列表（keyset 分页，只查询列表所需列）"""
+    query = (
+        db.query(
+            Article.id, Article.title, Article.url, Article.summary,
+            Article.difficulty, Article.category, Article.word_count,
+            Article.is_read, Article.published_at, NewsSource.name.label("source_name"),
+        )
+        .outerjoin(NewsSource, NewsSource.id == Article.source_id)
+        .filter(Article.canonical_id.is_(None))
+    )
     if difficulty:
         query = query.filter(Article.difficulty == difficulty)
     if category:
         query = query.filter(Article.category == category)
-    articles = query.offset(offset).limit(limit).all()
-    return [
-        ArticleOut(
-            id=a.id, title=a.title, url=a.url, summary=a.summary,
-            difficulty=a.difficulty, category=a.category, word_count=a.word_count,
-            is_read=a.is_read, published_at=a.published_at,
-            source_name=a.source.name if a.source else None,
-        )
-        for a in articles
-    ]
+    try:
+        query = apply_keyset(query, Article.published_at, Article.id, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if offset and not cursor:
+        query = query.offset(offset)
+
+    rows = query.limit(limit).all()
+    headers = {}
+    if len(rows) == limit and rows[-1].published_at:
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1].published_at, rows[-1].id)
+    return rows_response([row._asdict() for row in rows], headers)
 
 
 @router.get("/article/{article_id}", response_model=ArticleDetailOut)
-def get_article(article_id: int, db: Session = Depends(get_db)):
-    """获取文章详情"""
-    article = db.query(Article).get(article_id)
-    if not article:
-        return {"error": "Not found"}
-
-    # 标记已读
-    article.is_read = True
-    db.commit()
-
-    # 如果没有摘要，异步生成（首次访问时）
-    if not article.summary and article.content:
-        try:
-            generate_article_summary(db, article_id)
-            db.refresh(article)
-        except Exception:
-            pass
+def get_article(
+    article_id: int,
+    sentence_limit: int = Query(SENTENCE_PAGE_SIZE, ge=0, le=500),
+    include_content: bool = False,
+    db: Session = Depends(get_db),
+):
+    """获取文章头信息 + 首批句子（只读，不加写锁）
 
+    后续句子通过 /article/{id}/sentences 分页获取，已读标记走 POST /article/{id}/read
+    """
+    header = (
+        db.query(
+            Article.id, Article.title, Article.url, Article.summary, Article.difficulty,
+            Article.category, Article.word_count, Article.is_read, Article.published_at,
+            NewsSource.name.label("source_name"),
+        )
+        .outerjoin(NewsSource, NewsSource.id == Article.source_id)
+        .filter(Article.id == article_id)
+        .first()
+    )
+    if not header:
+        raise HTTPException(status_code=404, detail="Article not found")
+
+    sentence_count = (
+        db.query(func.count(ArticleSentence.id))
+        .filter(ArticleSentence.article_id == article_id)
+        .scalar()
+    )
+    sentences, next_index = _sentence_page(db, article_id, 0, sentence_limit)
+    return rows_response({
+        **header._asdict(),
+        "content": article_text(db, article_id) if include_content else None,
+        "sentence_count": sentence_count,
+        "sentences": sentences,
+        "next_index": next_index,
+    })
+
+
+@router.get("/article/{article_id}/sentences", response_model=SentencePageOut)
+def get_article_sentences(
+    article_id: int,
+    start: int = Query(0, ge=0, description="从该句序号开始（含）"),
+    limit: int = Query(SENTENCE_PAGE_SIZE, ge=1, le=500),
+    db: Session = Depends(get_db),
+):
+    """按句序分页获取文章句子，用于长文渐进渲染"""
+    sentences, next_index = _sentence_page(db, article_id, start, limit)
+    return rows_response({"article_id": article_id, "sentences": sentences, "next_index": next_index})
+
+
+@router.post("/article/{article_id}/read")
+def mark_article_read(article_id: int, db: Session = Depends(get_db)):
+    """标记文章已读（幂等；已读时不产生写入）"""
+    updated = (
+        db.query(Article)
+        .filter(Article.id == article_id, Article.is_read == False)
+        .update({Article.is_read: True}, synchronize_session=False)
+    )
+    if updated:
+        db.commit()
+    elif not db.query(Article.id).filter(Article.id == article_id).first():
+        raise HTTPException(status_code=404, detail="Article not found")
+    return {"ok": True}
+
+
+@router.post("/article/{article_id}/summary")
+def summarize_article(article_id: int, db: Session = Depends(get_db)):
+    """为文章生成 AI 摘要（已有摘要时直接返回）
+
+    生成失败时转入 AI 任务队列重试，返回 job_id 供轮询 /api/jobs/{id}。
+    """
+    try:
+        generate_article_summary(db, article_id)
+    except Exception as e:
+        db.rollback()
+        job = enqueue(db, "summary", {"article_id": article_id})
+        print(f"[Content] 摘要生成失败，已转入队列 #{job.id}: {e}")
+        return {"summary": None, "job_id": job.id}
+    summary = db.query(Article.summary).filter(Article.id == article_id).scalar()
+    return {"summary": summary}
+
+
+def _sentence_page(db: Session, article_id: int, start: int, limit: int) -> tuple[list[dict], int | None]:
+    """按 (article_id, index) 索引顺序读取一页句子，返回 (句子, 下一页起始序号)"""
+    if limit <= 0:
+        return [], start
+    rows = (
+        db.query(ArticleSentence.index, ArticleSentence.text_en, ArticleSentence.text_zh)
+        .filter(ArticleSentence.article_id == article_id, ArticleSentence.index >= start)
+        .order_by(ArticleSentence.index)
+        .limit(limit + 1)
+        .all()
+    )
     sentences = [
-        {"index": s.index, "text_en": s.text_en, "text_zh": s.text_zh or ""}
-        for s in sorted(article.sentences, key=lambda x: x.index)
+        {"index": r.index, "text_en": r.text_en, "text_zh": r.text_zh or ""}
+        for r in rows[:limit]
     ]
+    next_index = rows[limit].index if len(rows) > limit else None
+    return sentences, next_index
 
-    return ArticleDetailOut(
-        id=article.id,
-        title=article.title,
-        url=article.url,
-        content=article.content,
-        summary=article.summary,
-        difficulty=article.difficulty,
-        category=article.category,
-        word_count=article.word_count,
-        is_read=article.is_read,
-        sentences=sentences,
-    )
+
+@router.get("/article/{article_id}/lexicon", response_model=ArticleLexiconOut)
+def get_article_lexicon(article_id: int, db: Session = Depends(get_db)):
+    """文章词汇画像：对照生词本给出已掌握 / 学习中 / 陌生词，供阅读器高亮"""
+    lexicon = article_lexicon(db, article_id)
+    if lexicon is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return lexicon
@@ -0,0 +1,37 @@
+"""AI 任务队列 API —— 提交任务后轮询状态"""
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from sqlalchemy.orm import Session
+
+from models.database import get_db
+from models.tables import AIJob
+from schemas.schemas import JobCreateRequest, JobOut
+from services.job_queue import enqueue, job_to_dict
+
+router = APIRouter()
+
+
+@router.post("", response_model=JobOut, status_code=202)
+def create_job(
+    req: JobCreateRequest,
+    response: Response,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+    db: Session = Depends(get_db),
+):
+    """提交 AI 任务；相同幂等键（或相同参数）返回已有任务"""
+    try:
+        job = enqueue(db, req.kind, req.payload, idempotency_key=req.idempotency_key or idempotency_key)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response.headers["Location"] = f"/api/jobs/{job.id}"
+    return job_to_dict(job)
+
+
+@router.get("/{job_id}", response_model=JobOut)
+def get_job(job_id: int, response: Response, db: Session = Depends(get_db)):
+    """查询任务状态与结果"""
+    job = db.query(AIJob).get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status in ("queued", "running"):
+        response.headers["Retry-After"] = "2"
+    return job_to_dict(job)
@@ -0,0 +1,21 @@
+"""全文检索 API"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from models.database import get_db
+from schemas.schemas import SearchResultOut
+from services.search_service import search
+
+router = APIRouter()
+
+
+@router.get("", response_model=SearchResultOut)
+def search_all(
+    q: str = Query(..., min_length=1, max_length=200),
+    scope: str = Query("articles", pattern="^(articles|sentences|vocab)$"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+):
+    """搜索文章 / 句子 / 生词（BM25 排序，带高亮片段）"""
+    return search(db, q, scope=scope, limit=limit, offset=offset)
@@ -1,12 +1,13 @@
 """学习统计 API"""
 from datetime import date, timedelta, datetime
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
 from models.database import get_db
 from models.tables import PlanTask, StudySession, VocabItem, VocabReview, DailyPlan
-from schemas.schemas import WeeklyStatsOut
+from schemas.schemas import AIMetricsOut, WeeklyStatsOut
+from services import ai_telemetry
 
 router = APIRouter()
 
@@ -134,3 +135,9 @@ def get_today_stats(db: Session = Depends(get_db)):
         "new_vocab": new_vocab,
         "due_review": due_review,
     }
+
+
+@router.get("/ai", response_model=AIMetricsOut)
+def get_ai_metrics(hours: int = Query(24, ge=1, le=24 * 30), db: Session = Depends(get_db)):
+    """AI 调用遥测：各功能的调用量、token 用量与延迟分位数"""
+    return ai_telemetry.summarize(db, hours=hours)
@@ -27,4 +27,4 @@ def ai_explain(req: AIExplainRequest):
 def translate_sentence_batch(sentences: list[str]):
     """批量翻译句子"""
     translations = translate_sentences(sentences)
-    return {"translations": translations}
+    return {"translations": [t or "" for t in translations]}
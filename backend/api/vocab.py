@@ -1,16 +1,23 @@
 """生词本 & 复习 API"""
 from datetime import date
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 
 from models.database import get_db
 from models.tables import VocabItem
-from schemas.schemas import VocabMarkRequest, VocabItemOut, VocabReviewRequest
+from schemas.schemas import VocabMarkRequest, VocabItemOut, VocabReviewRequest, ExampleSentenceOut
 from services.ai_service import get_word_definition
+from services.dictionary_service import lookup_word
+from services.example_service import UnsupportedWordError, find_examples
+from services.pagination import apply_keyset, encode_cursor
 from services.review_service import process_review, get_today_reviews
+from services.responses import model_response, rows_response
 
 router = APIRouter()
 
+_VOCAB_LIST = TypeAdapter(list[VocabItemOut])
+
 
 @router.post("/mark", response_model=VocabItemOut)
 def mark_vocab(req: VocabMarkRequest, db: Session = Depends(get_db)):
@@ -20,13 +27,16 @@ def mark_vocab(req: VocabMarkRequest, db: Session = Depends(get_db)):
     if existing:
         return existing
 
-    # 如果缺少释义信息，通过 AI 补全
+    # 如果缺少释义信息，优先查离线词典，未收录或需要语境释义时再调用 AI
     word_info = {}
     if not req.definition:
-        try:
-            word_info = get_word_definition(req.word, req.example_sentence or "")
-        except Exception:
-            pass
+        if not req.use_context:
+            word_info = lookup_word(db, req.word) or {}
+        if not word_info:
+            try:
+                word_info = get_word_definition(req.word, req.example_sentence or "")
+            except Exception:
+                pass
 
     vocab = VocabItem(
         word=req.word,
@@ -49,20 +59,32 @@ def mark_vocab(req: VocabMarkRequest, db: Session = Depends(get_db)):
 def list_vocab(
     mastered: bool | None = None,
     limit: int = Query(50, ge=1, le=200),
-    offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, description="上一页响应头 X-Next-Cursor 的值"),
+    offset: int = Query(0, ge=0, deprecated=True),
     db: Session = Depends(get_db),
 ):
-    """获取生词列表"""
-    query = db.query(VocabItem).order_by(VocabItem.created_at.desc())
+    """获取生词列表（keyset 分页，只查询列表所需列）"""
+    query = db.query(*[getattr(VocabItem, name) for name in VocabItemOut.model_fields])
     if mastered is not None:
         query = query.filter(VocabItem.is_mastered == mastered)
-    return query.offset(offset).limit(limit).all()
+    try:
+        query = apply_keyset(query, VocabItem.created_at, VocabItem.id, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if offset and not cursor:
+        query = query.offset(offset)
+
+    rows = query.limit(limit).all()
+    headers = {}
+    if len(rows) == limit:
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows_response([row._asdict() for row in rows], headers)
 
 
 @router.get("/review/today", response_model=list[VocabItemOut])
 def get_review_list(db: Session = Depends(get_db)):
     """获取今日待复习列表"""
-    return get_today_reviews(db)
+    return model_response(_VOCAB_LIST, get_today_reviews(db))
 
 
 @router.post("/review/{vocab_id}", response_model=VocabItemOut)
@@ -72,6 +94,22 @@ def submit_review(vocab_id: int, req: VocabReviewRequest, db: Session = Depends(
     return vocab
 
 
+@router.get("/{vocab_id}/examples", response_model=list[ExampleSentenceOut])
+def get_more_examples(
+    vocab_id: int,
+    limit: int = Query(5, ge=1, le=20),
+    db: Session = Depends(get_db),
+):
+    """从已抓取文章中查找该生词的更多例句"""
+    vocab = db.get(VocabItem, vocab_id)
+    if not vocab:
+        raise HTTPException(status_code=404, detail="Vocab not found")
+    try:
+        return find_examples(db, vocab, limit)
+    except UnsupportedWordError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
 @router.delete("/{vocab_id}")
 def delete_vocab(vocab_id: int, db: Session = Depends(get_db)):
     """删除生词"""
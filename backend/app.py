@@ -1,20 +1,26 @@
 """应用工厂"""
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
 
-from models.database import init_db
+from config import settings as app_settings
+from models.database import engine, init_db
+from services import ai_telemetry, metrics, profiling
 from services.scheduler import start_scheduler, shutdown_scheduler
-from api import plan, content, vocab, speaking, writing, stats, translate, settings
+from api import plan, content, vocab, speaking, writing, stats, translate, settings, search, jobs
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理"""
     init_db()
-    start_scheduler()
+    if app_settings.scheduler_enabled:
+        start_scheduler()
     yield
-    shutdown_scheduler()
+    if app_settings.scheduler_enabled:
+        shutdown_scheduler()
+    ai_telemetry.shutdown()
 
 
 def create_app() -> FastAPI:
@@ -30,7 +36,24 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        # 列表接口的 keyset 分页游标，浏览器端需显式暴露才能读取
+        expose_headers=["X-Next-Cursor"],
     )
+    # 文章/生词列表等大响应压缩；小响应不压缩，省去 CPU
+    if app_settings.gzip_min_bytes > 0:
+        app.add_middleware(GZipMiddleware, minimum_size=app_settings.gzip_min_bytes, compresslevel=5)
+    if app_settings.profiling_enabled:
+        app.add_middleware(
+            profiling.ProfilingMiddleware,
+            output_dir=app_settings.profile_dir,
+            interval_ms=app_settings.profile_interval_ms,
+        )
+        profiling.arm(app_settings.profile_requests)
+    # 最外层：请求耗时包含其余中间件
+    app.add_middleware(metrics.MetricsMiddleware)
+    metrics.install(engine)
+    if app_settings.slow_sql_ms > 0:
+        profiling.install_slow_sql(engine, app_settings.slow_sql_ms, app_settings.profile_dir)
 
     # 注册路由
     app.include_router(plan.router, prefix="/api/plan", tags=["plan"])
@@ -41,9 +64,23 @@ def create_app() -> FastAPI:
     app.include_router(writing.router, prefix="/api/writing", tags=["writing"])
     app.include_router(stats.router, prefix="/api/stats", tags=["stats"])
     app.include_router(settings.router, prefix="/api/settings", tags=["settings"])
+    app.include_router(search.router, prefix="/api/search", tags=["search"])
+    app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
 
     @app.get("/api/health")
     def health():
         return {"status": "ok"}
 
+    @app.get("/metrics", include_in_schema=False)
+    def prometheus_metrics():
+        """Prometheus 文本格式的进程内指标"""
+        return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+    if app_settings.profiling_enabled:
+        @app.post("/api/debug/profile", include_in_schema=False)
+        def arm_profiler(requests: int = 1):
+            """剖析接下来的 N 个请求"""
+            profiling.arm(requests)
+            return {"armed": profiling.armed()}
+
     return app
@@ -0,0 +1,235 @@
+"""端到端抓取基准 —— 本地夹具服务 + 真实抓取流水线
+
+    python -m benchmarks.bench_ingest --sources 1,5 --entries 10,20 --latency-ms 0,50 --output ingest.json
+    python -m benchmarks.bench_ingest --baseline ingest.json --tolerance 0.2
+
+每组参数（源数 × 每 feed 条目数 × 网页段落数 × 网络延迟）在临时库中完整运行一次
+rss_service.fetch_all_sources，再立即重抓一次（条件请求应全部 304）。报告：
+
+    articles_per_sec        首次抓取的入库速度
+    cpu / wall              各阶段耗时（秒），阶段之间不重复计算：
+                            fetch（feed 下载解析 + 网页下载）、extract（正文提取清洗）、
+                            readability、split（分句）、dedup（MinHash/LSH）、
+                            persist（其余：写库、例句索引、词汇画像、FTS 触发器）
+    db_bytes                库文件增长
+    refetch_seconds         第二次抓取耗时
+
+注意 rss_service 每个源最多处理 20 个条目，超出部分只增加 feed 解析量。
+指定 --baseline 时与同参数的历史结果比较，articles_per_sec 下降超过
+tolerance 则以非零状态退出。
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+from types import SimpleNamespace
+
+import feedparser
+import httpx
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.feed_server import FeedServer
+from models import compression
+from models.database import Base
+from models.tables import Article, ArticleSentence, NewsSource
+from services import rss_service
+from services.search_service import init_search_index
+
+STAGES = ("fetch", "extract", "readability", "split", "dedup", "persist")
+
+
+class StageTimer:
+    """替换 rss_service 模块属性为计时包装；嵌套调用只计入最内层阶段（self time）"""
+
+    def __init__(self):
+        self.cpu: Counter = Counter()
+        self.wall: Counter = Counter()
+        self._stack: list[list[float]] = []
+        self._patched: list[tuple[object, str, object]] = []
+
+    def wrap(self, stage: str, fn):
+        def timed(*args, **kwargs):
+            cpu_start, wall_start = time.thread_time(), time.perf_counter()
+            self._stack.append([0.0, 0.0])
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                child_cpu, child_wall = self._stack.pop()
+                cpu = time.thread_time() - cpu_start
+                wall = time.perf_counter() - wall_start
+                self.cpu[stage] += cpu - child_cpu
+                self.wall[stage] += wall - child_wall
+                if self._stack:
+                    self._stack[-1][0] += cpu
+                    self._stack[-1][1] += wall
+        return timed
+
+    def patch(self, module, name: str, value):
+        self._patched.append((module, name, getattr(module, name)))
+        setattr(module, name, value)
+
+    def install(self):
+        self.patch(rss_service, "feedparser", SimpleNamespace(parse=self.wrap("fetch", feedparser.parse)))
+        self.patch(rss_service, "httpx", SimpleNamespace(get=self.wrap("fetch", httpx.get)))
+        for name, stage in (
+            ("_extract_article_content", "extract"),
+            ("_flesch_reading_ease", "readability"),
+            ("split_sentences", "split"),
+            ("minhash", "dedup"),
+            ("find_duplicate", "dedup"),
+            ("index_fingerprint", "dedup"),
+        ):
+            self.patch(rss_service, name, self.wrap(stage, getattr(rss_service, name)))
+
+    def restore(self):
+        while self._patched:
+            module, name, original = self._patched.pop()
+            setattr(module, name, original)
+
+
+def _db_bytes(path: str) -> int:
+    return sum(os.path.getsize(p) for p in (path, path + "-wal", path + "-journal") if os.path.exists(p))
+
+
+def run_once(sources: int, entries: int, paragraphs: int, latency_ms: float,
+             seed: int = 42, fixtures: str | None = None) -> dict:
+    """在临时库中跑一次完整抓取，返回指标"""
+    with tempfile.TemporaryDirectory() as tmp, FeedServer(
+        sources=sources, entries=entries, paragraphs=paragraphs,
+        latency_ms=latency_ms, seed=seed, fixtures=fixtures,
+    ) as server:
+        path = os.path.join(tmp, "bench.db")
+        engine = create_engine(f"sqlite:///{path}")
+        compression.install(engine)
+        Base.metadata.create_all(bind=engine)
+        init_search_index(engine)
+        db = sessionmaker(bind=engine)()
+        for i, url in enumerate(server.feed_urls):
+            db.add(NewsSource(name=f"Fixture {i}", url=url, category="world"))
+        db.commit()
+        size_before = _db_bytes(path)
+
+        timer = StageTimer()
+        timer.install()
+        try:
+            cpu_start, wall_start = time.thread_time(), time.perf_counter()
+            new_articles = rss_service.fetch_all_sources(db)
+            cpu_total = time.thread_time() - cpu_start
+            wall_total = time.perf_counter() - wall_start
+        finally:
+            timer.restore()
+
+        requests = server.requests
+        start = time.perf_counter()
+        refetched = rss_service.fetch_all_sources(db)
+        refetch_seconds = time.perf_counter() - start
+
+        sentences = db.query(func.count(ArticleSentence.id)).scalar()
+        stored = db.query(func.count(Article.id)).scalar()
+        db.close()
+        engine.dispose()
+        db_bytes = _db_bytes(path) - size_before
+
+    timer.cpu["persist"] = cpu_total - sum(timer.cpu[s] for s in STAGES if s != "persist")
+    timer.wall["persist"] = wall_total - sum(timer.wall[s] for s in STAGES if s != "persist")
+    return {
+        "params": {"sources": sources, "entries": entries, "paragraphs": paragraphs, "latency_ms": latency_ms},
+        "articles": new_articles,
+        "stored_rows": stored,
+        "sentences": sentences,
+        "http_requests": requests,
+        "seconds": round(wall_total, 4),
+        "cpu_seconds": round(cpu_total, 4),
+        "articles_per_sec": round(new_articles / wall_total, 2) if wall_total else 0.0,
+        "cpu": {s: round(timer.cpu[s], 4) for s in STAGES},
+        "wall": {s: round(timer.wall[s], 4) for s in STAGES},
+        "db_bytes": db_bytes,
+        "db_bytes_per_article": db_bytes // new_articles if new_articles else 0,
+        "refetch_new": refetched,
+        "refetch_seconds": round(refetch_seconds, 4),
+    }
+
+
+def compare(results: list[dict], baseline: dict, tolerance: float) -> list[str]:
+    """与基线同参数结果比较，返回退化描述"""
+    previous = {json.dumps(r["params"], sort_keys=True): r for r in baseline.get("runs", [])}
+    regressions = []
+    for run in results:
+        old = previous.get(json.dumps(run["params"], sort_keys=True))
+        if not old or not old["articles_per_sec"]:
+            continue
+        ratio = run["articles_per_sec"] / old["articles_per_sec"]
+        if ratio < 1 - tolerance:
+            regressions.append(
+                f"{run['params']}: {old['articles_per_sec']} -> {run['articles_per_sec']} articles/s ({ratio:.0%})"
+            )
+    return regressions
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def _ints(value: str) -> list[int]:
+    return [int(v) for v in value.split(",")]
+
+
+def _floats(value: str) -> list[float]:
+    return [float(v) for v in value.split(",")]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="端到端抓取基准")
+    parser.add_argument("--sources", type=_ints, default=[1, 5], help="源数量，逗号分隔多组")
+    parser.add_argument("--entries", type=_ints, default=[20], help="每个 feed 的条目数")
+    parser.add_argument("--paragraphs", type=_ints, default=[8], help="每篇网页的段落数（页面大小）")
+    parser.add_argument("--latency-ms", type=_floats, default=[0], help="夹具服务每个请求的延迟")
+    parser.add_argument("--fixtures", help="使用录制的 feed/网页目录（见 benchmarks.feed_server）")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="结果写入该 JSON 文件")
+    parser.add_argument("--baseline", help="与该 JSON 结果比较")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="允许的 articles_per_sec 降幅")
+    args = parser.parse_args(argv)
+
+    runs = [
+        run_once(sources, entries, paragraphs, latency, seed=args.seed, fixtures=args.fixtures)
+        for sources, entries, paragraphs, latency
+        in itertools.product(args.sources, args.entries, args.paragraphs, args.latency_ms)
+    ]
+    report = {
+        "benchmark": "ingest",
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "runs": runs,
+    }
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(runs, json.load(f), args.tolerance)
+        report["regressions"] = regressions
+        exit_code = 1 if regressions else 0
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    return exit_code
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
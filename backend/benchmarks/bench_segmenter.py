@@ -0,0 +1,64 @@
+"""分句器吞吐基准 —— 新扫描器与旧正则拆分的速度与句数对比
+
+    python -m benchmarks.bench_segmenter --repeat 200
+
+语料为黄金测试集的全部文本重复拼接（句子短、缩写密集，属于最坏情况），
+同时报告两者在黄金测试集上的逐例准确率，输出 JSON。
+"""
+import argparse
+import json
+import os
+import re
+import time
+
+from services.segmenter import split_sentences
+
+_GOLDEN = os.path.join(os.path.dirname(__file__), "..", "tests", "fixtures", "segmenter_golden.json")
+_LEGACY = re.compile(r"(?<=[.!?])\s+(?=[A-Z])")
+
+
+def _legacy_split(text: str) -> list[str]:
+    return [s for s in _LEGACY.split(text) if len(s.strip()) > 5]
+
+
+def _measure(fn, text: str, rounds: int = 5) -> tuple[float, int]:
+    best = float("inf")
+    count = 0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        count = len(fn(text))
+        best = min(best, time.perf_counter() - start)
+    return best, count
+
+
+def run(repeat: int) -> dict:
+    with open(_GOLDEN, encoding="utf-8") as f:
+        cases = json.load(f)
+    text = " ".join(c["text"].replace("\n", " ") for c in cases if c["text"]) + " "
+    corpus = text * repeat
+    size_mb = len(corpus.encode("utf-8")) / 1e6
+
+    result = {"corpus_mb": round(size_mb, 3)}
+    for name, fn in (("legacy_regex", _legacy_split), ("segmenter", split_sentences)):
+        elapsed, count = _measure(fn, corpus)
+        correct = sum(
+            [s.strip() for s in fn(c["text"]) if len(s.strip()) > 5] == [s for s in c["sentences"] if len(s) > 5]
+            for c in cases
+        )
+        result[name] = {
+            "sentences": count,
+            "mb_per_s": round(size_mb / elapsed, 2),
+            "golden_accuracy": f"{correct}/{len(cases)}",
+        }
+    return result
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="分句器吞吐基准")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
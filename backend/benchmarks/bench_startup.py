@@ -0,0 +1,194 @@
+"""启动基准 —— 导入耗时与冷/热启动耗时
+
+    python -m benchmarks.bench_startup --repeat 5 --output startup.json
+    python -m benchmarks.bench_startup --baseline startup.json --tolerance 0.3
+
+每次测量都在独立子进程中进行（模块缓存不共享），分两种场景：
+
+    cold    全新数据库：建表、迁移、FTS 索引、默认数据
+    warm    已初始化的数据库重启：只做版本检查
+
+子进程内依次计时 import app、create_app()、lifespan 启动与第一个请求
+（/api/health，直接走 ASGI，不经网络），另记录进程总耗时（含解释器启动）
+以及启动后已导入的重型依赖（openai / feedparser / httpx / alembic 应均未导入）。
+调度器默认关闭（--scheduler 开启，其启动检查会访问真实 RSS 源）。
+
+--importtime 额外输出 python -X importtime 中累计耗时最高的模块。
+指定 --baseline 时 warm 场景的 process_seconds 中位数上升超过 tolerance 则以非零状态退出。
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("openai", "feedparser", "httpx", "alembic", "apscheduler")
+
+_CHILD = r"""
+import asyncio, json, sys, time
+t0 = time.perf_counter()
+import app as app_module
+t1 = time.perf_counter()
+application = app_module.create_app()
+t2 = time.perf_counter()
+
+
+async def boot():
+    async with application.router.lifespan_context(application):
+        t3 = time.perf_counter()
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": "/api/health", "raw_path": b"/api/health", "root_path": "",
+            "query_string": b"", "headers": [], "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 80),
+        }
+        await application(scope, receive, send)
+        t4 = time.perf_counter()
+        assert messages[0]["status"] == 200, messages
+        return t3, t4
+
+t3, t4 = asyncio.run(boot())
+print(json.dumps({
+    "import_seconds": t1 - t0,
+    "create_app_seconds": t2 - t1,
+    "startup_seconds": t3 - t2,
+    "first_request_seconds": t4 - t3,
+    "modules": [m for m in sys.argv[1].split(",") if m in sys.modules],
+}))
+"""
+
+
+def _child_env(database: str, scheduler: bool) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": f"sqlite:///{database}",
+        "SCHEDULER_ENABLED": "true" if scheduler else "false",
+    })
+    return env
+
+
+def measure(database: str, scheduler: bool = False) -> dict:
+    """启动一个子进程完成导入 + 启动 + 首个请求，返回各阶段耗时"""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", _CHILD, ",".join(HEAVY_MODULES)],
+        cwd=BACKEND_DIR, env=_child_env(database, scheduler), capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"启动失败: {proc.stderr.strip()[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["process_seconds"] = elapsed
+    return result
+
+
+def _summary(samples: list[dict]) -> dict:
+    keys = ("process_seconds", "import_seconds", "create_app_seconds", "startup_seconds", "first_request_seconds")
+    summary = {k: round(statistics.median(s[k] for s in samples), 4) for k in keys}
+    summary["max_process_seconds"] = round(max(s["process_seconds"] for s in samples), 4)
+    summary["heavy_modules_loaded"] = sorted({m for s in samples for m in s["modules"]})
+    summary["samples"] = len(samples)
+    return summary
+
+
+def run(repeat: int, scheduler: bool = False) -> dict:
+    """cold：每次使用新库；warm：同一个已初始化的库反复重启"""
+    cold, warm = [], []
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(repeat):
+            cold.append(measure(os.path.join(tmp, f"cold-{i}.db"), scheduler))
+        database = os.path.join(tmp, "warm.db")
+        measure(database, scheduler)
+        for _ in range(repeat):
+            warm.append(measure(database, scheduler))
+    return {"cold": _summary(cold), "warm": _summary(warm)}
+
+
+def import_profile(top: int) -> list[dict]:
+    """python -X importtime 中累计耗时最高的模块"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=BACKEND_DIR, env=_child_env(os.path.join(tempfile.gettempdir(), "importtime.db"), False),
+        capture_output=True, text=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if not self_us.isdigit():
+            continue
+        rows.append({"module": name, "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000})
+    # 只保留顶层包，避免同一依赖的子模块刷屏
+    top_level = [r for r in rows if "." not in r["module"]]
+    return sorted(top_level, key=lambda r: r["cumulative_ms"], reverse=True)[:top]
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """warm 启动耗时与基线比较，返回退化描述"""
+    old = baseline.get("warm", {}).get("process_seconds")
+    new = report["warm"]["process_seconds"]
+    if old and new > old * (1 + tolerance):
+        return [f"warm: {old}s -> {new}s ({new / old:.0%})"]
+    return []
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="启动耗时基准")
+    parser.add_argument("--repeat", type=int, default=5, help="每个场景的重复次数（取中位数）")
+    parser.add_argument("--scheduler", action="store_true", help="同时启动调度器")
+    parser.add_argument("--importtime", type=int, default=0, metavar="N", help="输出导入耗时最高的 N 个顶层模块")
+    parser.add_argument("--output", help="结果写入该 JSON 文件")
+    parser.add_argument("--baseline", help="与该 JSON 结果比较")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="允许的 warm 启动耗时增幅")
+    args = parser.parse_args(argv)
+
+    report = {
+        "benchmark": "startup",
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        **run(args.repeat, args.scheduler),
+    }
+    if args.importtime:
+        report["imports"] = import_profile(args.importtime)
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        report["regressions"] = regressions
+        exit_code = 1 if regressions else 0
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    return exit_code
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,102 @@
+"""存储布局基准 —— 旧布局（content + 明文句子）与压缩布局的库大小与读取延迟
+
+    python -m benchmarks.bench_storage --articles 500
+
+在临时目录中用合成语料分别建库，输出 JSON。
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from models import compression
+from services.storage_service import TRAINING_SAMPLE_SIZE
+
+_WORDS = (
+    "the government said on monday that it would raise spending on schools and hospitals "
+    "central bank interest rates inflation remained above target for third month in a row "
+    "officials warned economy could slow next year as exports fell while markets rose after "
+    "report showed strong demand for new homes climate scientists researchers study found"
+).split()
+
+
+def _sentence(rng: random.Random) -> str:
+    words = [rng.choice(_WORDS) for _ in range(rng.randint(8, 24))]
+    return " ".join(words).capitalize() + "."
+
+
+def _corpus(articles: int, seed: int = 42) -> list[list[str]]:
+    rng = random.Random(seed)
+    return [[_sentence(rng) for _ in range(rng.randint(15, 40))] for _ in range(articles)]
+
+
+def _build(path: str, corpus: list[list[str]], compressed: bool):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE article (id INTEGER PRIMARY KEY, content TEXT)")
+    conn.execute(
+        "CREATE TABLE article_sentence (id INTEGER PRIMARY KEY, article_id INTEGER, "
+        "\"index\" INTEGER, text_en BLOB, text_zh BLOB)"
+    )
+    conn.execute("CREATE INDEX ix_sentence_article ON article_sentence (article_id, \"index\")")
+    encode = compression.compress_text if compressed else (lambda s: s)
+    for aid, sentences in enumerate(corpus, 1):
+        conn.execute("INSERT INTO article VALUES (?, ?)", (aid, None if compressed else " ".join(sentences)))
+        conn.executemany(
+            "INSERT INTO article_sentence (article_id, \"index\", text_en, text_zh) VALUES (?, ?, ?, ?)",
+            [(aid, i, encode(s), encode(s)) for i, s in enumerate(sentences)],
+        )
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+
+
+def _read_latency(path: str, articles: int, compressed: bool, reads: int = 300) -> float:
+    """随机读取整篇正文的平均耗时（毫秒）"""
+    conn = sqlite3.connect(path)
+    rng = random.Random(7)
+    start = time.perf_counter()
+    for _ in range(reads):
+        aid = rng.randint(1, articles)
+        if compressed:
+            rows = conn.execute(
+                "SELECT text_en FROM article_sentence WHERE article_id = ? ORDER BY \"index\"", (aid,)
+            ).fetchall()
+            " ".join(compression.decompress_text(r[0]) for r in rows)
+        else:
+            conn.execute("SELECT content FROM article WHERE id = ?", (aid,)).fetchone()
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return round(elapsed / reads * 1000, 3)
+
+
+def run(articles: int) -> dict:
+    corpus = _corpus(articles)
+    flat = [s for sentences in corpus for s in sentences]
+    zdict = compression.train_dictionary(random.Random(1).sample(flat, min(TRAINING_SAMPLE_SIZE, len(flat))))
+    compression.register_dictionary(1, zdict)
+
+    result = {"articles": articles, "sentences": len(flat), "dictionary_bytes": len(zdict)}
+    with tempfile.TemporaryDirectory() as tmp:
+        for layout, compressed in (("legacy", False), ("compressed", True)):
+            path = os.path.join(tmp, f"{layout}.db")
+            _build(path, corpus, compressed)
+            result[layout] = {
+                "db_bytes": os.path.getsize(path),
+                "read_ms": _read_latency(path, articles, compressed),
+            }
+    result["size_ratio"] = round(result["compressed"]["db_bytes"] / result["legacy"]["db_bytes"], 3)
+    return result
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="存储布局基准")
+    parser.add_argument("--articles", type=int, default=500)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.articles), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""本地 RSS 夹具服务 —— 为抓取基准/测试提供合成或录制的 feed 与文章网页
+
+    python -m benchmarks.feed_server --sources 5 --entries 20 --latency-ms 50
+
+合成模式下 /feeds/<i>.xml 为第 i 个源的 RSS 2.0 feed，条目链接指向
+/articles/<i>/<j>.html（带导航/页脚噪音的网页，正文在 <article> 中），
+内容由 seed 决定，同参数多次运行完全一致。feed 带 ETag，条件请求返回 304。
+
+录制模式（--fixtures DIR）直接提供目录下的文件：DIR/feeds/*.xml 为各源 feed，
+其余文件按相对路径提供；文件中的 {base_url} 会替换为本服务地址，
+录制的 feed 里把文章链接改写为 {base_url}/pages/... 即可离线回放。
+"""
+import argparse
+import hashlib
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_WORDS = (
+    "the government said on monday that it would raise spending on schools and hospitals "
+    "central bank interest rates inflation remained above target for third month in a row "
+    "officials warned economy could slow next year as exports fell while markets rose after "
+    "report showed strong demand for new homes climate scientists researchers study found "
+    "voters parliament election minister announced policy reform energy prices households "
+    "companies investors shares quarter profits technology artificial intelligence chips "
+    "hospital patients doctors treatment vaccine trial results universities students teachers"
+).split()
+
+_PAGE = """<!DOCTYPE html>
+<html><head><title>{title}</title></head>
+<body>
+<header><nav><a href="/">Home</a> | <a href="/news">News</a> | <a href="/sport">Sport</a> | <a href="/weather">Weather</a></nav></header>
+<main><article>
+<h1>{title}</h1>
+{paragraphs}
+</article></main>
+<aside><h3>Related</h3><ul><li><a href="/a">Markets</a></li><li><a href="/b">Climate</a></li></ul></aside>
+<footer><p>Subscribe</p><p>&copy; Fixture News</p></footer>
+</body></html>
+"""
+
+
+class FeedServer:
+    """可在进程内以 with 语句启动，或通过 main() 独立运行"""
+
+    def __init__(self, sources: int = 3, entries: int = 10, paragraphs: int = 8,
+                 latency_ms: float = 0, seed: int = 42, fixtures: str | None = None,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.sources = sources
+        self.entries = entries
+        self.paragraphs = paragraphs
+        self.latency_ms = latency_ms
+        self.seed = seed
+        self.fixtures = fixtures
+        self.requests = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        self._epoch = datetime(2026, 1, 1)
+
+        self._server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._server.daemon_threads = True
+        self._server.block_on_close = False
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def feed_urls(self) -> list[str]:
+        if self.fixtures:
+            names = sorted(os.listdir(os.path.join(self.fixtures, "feeds")))
+            return [f"{self.base_url}/feeds/{name}" for name in names if name.endswith(".xml")]
+        return [f"{self.base_url}/feeds/{i}.xml" for i in range(self.sources)]
+
+    def start(self) -> "FeedServer":
+        threading.Thread(target=self._server.serve_forever, name="feed-server", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def serve_forever(self):
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def __enter__(self) -> "FeedServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ─── 内容生成 ───
+
+    def _rng(self, *parts: int) -> random.Random:
+        return random.Random(hash((self.seed,) + parts))
+
+    def _title(self, source: int, entry: int) -> str:
+        rng = self._rng(source, entry, 0)
+        return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(5, 9))).capitalize()
+
+    def _paragraph(self, rng: random.Random) -> str:
+        sentences = []
+        for _ in range(rng.randint(3, 6)):
+            words = [rng.choice(_WORDS) for _ in range(rng.randint(8, 22))]
+            sentences.append(" ".join(words).capitalize() + ".")
+        return " ".join(sentences)
+
+    def feed(self, source: int) -> str:
+        items = []
+        for j in range(self.entries):
+            rng = self._rng(source, j, 1)
+            published = self._epoch + timedelta(hours=source + j * 3)
+            items.append(
+                "<item>"
+                f"<title>{escape(self._title(source, j))}</title>"
+                f"<link>{self.base_url}/articles/{source}/{j}.html</link>"
+                f"<guid>{self.base_url}/articles/{source}/{j}.html</guid>"
+                f"<pubDate>{format_datetime(published)}</pubDate>"
+                f"<description>{escape(self._paragraph(rng)[:200])}</description>"
+                "</item>"
+            )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f"<title>Fixture feed {source}</title><link>{self.base_url}/</link>"
+            f"<description>Synthetic feed</description>{''.join(items)}</channel></rss>"
+        )
+
+    def page(self, source: int, entry: int) -> str:
+        rng = self._rng(source, entry, 2)
+        paragraphs = "\n".join(f"<p>{escape(self._paragraph(rng))}</p>" for _ in range(self.paragraphs))
+        return _PAGE.format(title=escape(self._title(source, entry)), paragraphs=paragraphs)
+
+    def resolve(self, path: str) -> tuple[str, str] | None:
+        """路径 -> (内容, Content-Type)，不存在返回 None"""
+        path = path.split("?", 1)[0]
+        if self.fixtures:
+            root = os.path.abspath(self.fixtures)
+            full = os.path.abspath(os.path.join(root, path.lstrip("/")))
+            if not full.startswith(root + os.sep) or not os.path.isfile(full):
+                return None
+            with open(full, encoding="utf-8") as f:
+                body = f.read().replace("{base_url}", self.base_url)
+            return body, "application/rss+xml" if full.endswith(".xml") else "text/html; charset=utf-8"
+
+        parts = path.strip("/").split("/")
+        try:
+            if len(parts) == 2 and parts[0] == "feeds" and parts[1].endswith(".xml"):
+                source = int(parts[1][:-4])
+                if source < self.sources:
+                    return self.feed(source), "application/rss+xml"
+            if len(parts) == 3 and parts[0] == "articles" and parts[2].endswith(".html"):
+                source, entry = int(parts[1]), int(parts[2][:-5])
+                if source < self.sources and entry < self.entries:
+                    return self.page(source, entry), "text/html; charset=utf-8"
+        except ValueError:
+            pass
+        return None
+
+
+def _make_handler(server: FeedServer) -> type[BaseHTTPRequestHandler]:
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            with server._lock:
+                server.requests += 1
+            if server.latency_ms:
+                time.sleep(server.latency_ms / 1000)
+
+            found = server.resolve(self.path)
+            if found is None:
+                self._send(404, b"not found", "text/plain")
+                return
+
+            body, content_type = found
+            payload = body.encode("utf-8")
+            etag = '"' + hashlib.md5(payload).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                with server._lock:
+                    server.not_modified += 1
+                self._send(304, b"", content_type, etag)
+                return
+            self._send(200, payload, content_type, etag)
+
+        def _send(self, status: int, payload: bytes, content_type: str, etag: str | None = None):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            if etag:
+                self.send_header("ETag", etag)
+            self.end_headers()
+            if payload:
+                self.wfile.write(payload)
+
+    return Handler
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="本地 RSS 夹具服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--sources", type=int, default=3)
+    parser.add_argument("--entries", type=int, default=10, help="每个 feed 的条目数")
+    parser.add_argument("--paragraphs", type=int, default=8, help="每篇文章网页的段落数")
+    parser.add_argument("--latency-ms", type=float, default=0, help="每个请求的响应延迟")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--fixtures", help="录制的 feed/网页目录")
+    args = parser.parse_args(argv)
+
+    server = FeedServer(
+        sources=args.sources, entries=args.entries, paragraphs=args.paragraphs,
+        latency_ms=args.latency_ms, seed=args.seed, fixtures=args.fixtures, host=args.host, port=args.port,
+    )
+    print(f"[FeedServer] 监听 {server.base_url}")
+    for url in server.feed_urls:
+        print(f"  {url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+"""OpenAI 兼容的本地 LLM 桩服务 —— 离线压测、基准与测试用
+
+    python -m benchmarks.llm_stub --port 8765 --latency-ms 300 --tokens-per-second 60
+    python -m benchmarks.llm_stub --mode record --cassette ai.jsonl --upstream https://api.openai.com/v1
+    python -m benchmarks.llm_stub --mode replay --cassette ai.jsonl --rate-429 0.05
+
+然后设置 AI_BASE_URL=http://127.0.0.1:8765/v1 启动后端。三种模式：
+
+    synthetic   按提示词识别功能（翻译/释义/计划/口语/写作/逐句翻译），生成确定性的合法回复
+    record      转发到真实上游并把回复追加写入 cassette（JSONL）
+    replay      从 cassette 回放，未录制的请求退回 synthetic 并计入 misses
+
+cassette 以 messages + response_format 的哈希为键，不含模型名与温度，
+路由调整后录制内容仍可回放。延迟 = latency_ms + 输出 token 数 / tokens_per_second，
+stream=true 时按同样速率逐块推送 SSE。故障注入按 seed 固定的随机序列触发，
+也可用请求头 X-Stub-Fault: 429 | 500 | timeout 强制指定；运行中可通过
+POST /stub/config 调整参数，GET /stub/stats 查看计数。
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 可通过 /stub/config 在运行中修改的参数
+TUNABLE = ("latency_ms", "tokens_per_second", "rate_429", "rate_500", "rate_timeout", "hang_seconds", "retry_after")
+
+
+def cassette_key(body: dict) -> str:
+    return hashlib.sha256(json.dumps(
+        [body.get("messages"), body.get("response_format")], ensure_ascii=False, sort_keys=True,
+    ).encode("utf-8")).hexdigest()
+
+
+def count_tokens(text: str) -> int:
+    """粗略 token 数：英文约 4 字符 / token，中文约 1 字 / token"""
+    cjk = len(re.findall(r"[一-鿿]", text))
+    return max(1, cjk + (len(text) - cjk) // 4)
+
+
+def synthetic_reply(messages: list[dict]) -> str:
+    """根据 ai_service 各功能的提示词特征生成确定性的回复"""
+    system = " ".join(m.get("content", "") for m in messages if m.get("role") == "system")
+    prompt = messages[-1].get("content", "") if messages else ""
+
+    def field(name: str) -> str:
+        match = re.search(rf"^{name}:\s*(.*)$", prompt, re.M)
+        return match.group(1).strip() if match else ""
+
+    if '"reply"' in system:
+        said = prompt.strip().rstrip(".!?")
+        return json.dumps({
+            "reply": f"That's interesting! Tell me more about {said.split()[-1] if said else 'that'}.",
+            "correction": None,
+            "suggestion": f"You could also say: \"{said}.\"" if said else None,
+        }, ensure_ascii=False)
+    if '"grammar_issues"' in prompt:
+        words = len(prompt.split("作文内容:", 1)[-1].split())
+        return json.dumps({
+            "score": min(95, 60 + words // 10),
+            "grammar_issues": ["注意主谓一致", "冠词使用不当"],
+            "expression_suggestions": "尝试使用更丰富的连接词。",
+            "structure_feedback": "段落层次清晰。",
+            "overall_comment": "整体表达通顺。",
+            "improved_version": prompt.split("作文内容:", 1)[-1].strip(),
+        }, ensure_ascii=False)
+    if '"tasks"' in prompt or '"duration_minutes"' in prompt:
+        return json.dumps({"tasks": [
+            {"title": "阅读一篇外刊文章", "task_type": "reading", "duration_minutes": 15},
+            {"title": "复习今日生词", "task_type": "vocab_review", "duration_minutes": 10},
+            {"title": "跟读练习", "task_type": "speaking", "duration_minutes": 5},
+        ]}, ensure_ascii=False)
+    if '"lemma"' in prompt:
+        word = field("单词") or "word"
+        return json.dumps({
+            "word": word, "lemma": word.lower(), "pos": "noun",
+            "definition": f"{word} 的释义", "definition_en": f"definition of {word}", "pronunciation": f"/{word}/",
+        }, ensure_ascii=False)
+    if '"translation"' in prompt:
+        return json.dumps({"translation": f"〔译〕{field('待翻译文本')}", "explanation": ""}, ensure_ascii=False)
+    numbered = re.findall(r"^\d+\.\s+(.*)$", prompt, re.M)
+    if numbered:
+        return "\n".join(f"〔译〕{s}" for s in numbered)
+    return f"〔桩回复〕{prompt[:200]}"
+
+
+class LLMStub:
+    """桩服务本体；可在进程内以 with 语句启动（测试），或通过 main() 独立运行"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, mode: str = "synthetic",
+                 cassette: str | None = None, upstream: str | None = None, upstream_key: str = "",
+                 latency_ms: float = 0, tokens_per_second: float = 0,
+                 rate_429: float = 0, rate_500: float = 0, rate_timeout: float = 0,
+                 hang_seconds: float = 30, retry_after: float = 1.0, seed: int = 0):
+        if mode not in ("synthetic", "record", "replay"):
+            raise ValueError(f"Unknown mode: {mode}")
+        if mode == "record" and not (upstream and cassette):
+            raise ValueError("record mode needs upstream and cassette")
+        self.mode = mode
+        self.cassette = cassette
+        self.upstream = upstream.rstrip("/") if upstream else None
+        self.upstream_key = upstream_key
+        self.latency_ms = latency_ms
+        self.tokens_per_second = tokens_per_second
+        self.rate_429 = rate_429
+        self.rate_500 = rate_500
+        self.rate_timeout = rate_timeout
+        self.hang_seconds = hang_seconds
+        self.retry_after = retry_after
+
+        self.stats: Counter = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._recorded: dict[str, dict] = self._load_cassette() if cassette and mode == "replay" else {}
+
+        self._server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._server.daemon_threads = True
+        self._server.block_on_close = False
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "LLMStub":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="llm-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping.set()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "LLMStub":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def serve_forever(self):
+        """在当前线程运行（命令行模式）"""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def configure(self, **params):
+        for name, value in params.items():
+            if name not in TUNABLE:
+                raise ValueError(f"Unknown parameter: {name}")
+            setattr(self, name, float(value))
+
+    # ─── 请求处理 ───
+
+    def pick_fault(self, forced: str | None) -> str | None:
+        if forced:
+            return forced
+        with self._lock:
+            roll = self._rng.random()
+        for fault, rate in (("429", self.rate_429), ("500", self.rate_500), ("timeout", self.rate_timeout)):
+            if roll < rate:
+                return fault
+            roll -= rate
+        return None
+
+    def hang(self):
+        """模拟上游无响应；服务停止时立即返回"""
+        self._stopping.wait(self.hang_seconds)
+
+    def complete(self, body: dict) -> dict:
+        """返回 {content, prompt_tokens, completion_tokens}"""
+        key = cassette_key(body)
+        if self.mode == "replay":
+            entry = self._recorded.get(key)
+            self.count("replay_hits" if entry else "replay_misses")
+            if entry:
+                return entry["response"]
+        elif self.mode == "record":
+            response = self._forward(body)
+            self._append(key, body, response)
+            return response
+
+        content = synthetic_reply(body.get("messages") or [])
+        prompt = " ".join(str(m.get("content", "")) for m in body.get("messages") or [])
+        return {"content": content, "prompt_tokens": count_tokens(prompt), "completion_tokens": count_tokens(content)}
+
+    def generation_delay(self, completion_tokens: int) -> float:
+        delay = self.latency_ms / 1000
+        if self.tokens_per_second > 0:
+            delay += completion_tokens / self.tokens_per_second
+        return delay
+
+    def _forward(self, body: dict) -> dict:
+        import httpx
+
+        resp = httpx.post(
+            f"{self.upstream}/chat/completions",
+            json={**body, "stream": False},
+            headers={"Authorization": f"Bearer {self.upstream_key}"} if self.upstream_key else {},
+            timeout=120,
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        usage = data.get("usage") or {}
+        return {
+            "content": data["choices"][0]["message"].get("content") or "",
+            "prompt_tokens": usage.get("prompt_tokens", 0),
+            "completion_tokens": usage.get("completion_tokens", 0),
+        }
+
+    def _load_cassette(self) -> dict[str, dict]:
+        entries = {}
+        try:
+            with open(self.cassette, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        entries[entry["key"]] = entry
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _append(self, key: str, body: dict, response: dict):
+        entry = {"key": key, "model": body.get("model"), "messages": body.get("messages"), "response": response}
+        with self._lock, open(self.cassette, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.count("recorded")
+
+
+def _make_handler(stub: LLMStub) -> type[BaseHTTPRequestHandler]:
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.rstrip("/") == "/stub/stats":
+                self._json(200, dict(stub.stats))
+            elif self.path.rstrip("/").endswith("/models"):
+                self._json(200, {"object": "list", "data": [{"id": "stub", "object": "model"}]})
+            else:
+                self._json(404, _error("not found", "invalid_request_error"))
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except json.JSONDecodeError:
+                self._json(400, _error("invalid JSON body", "invalid_request_error"))
+                return
+
+            path = self.path.rstrip("/")
+            if path == "/stub/config":
+                try:
+                    stub.configure(**body)
+                except ValueError as e:
+                    self._json(400, _error(str(e), "invalid_request_error"))
+                    return
+                self._json(200, {name: getattr(stub, name) for name in TUNABLE})
+            elif path.endswith("/chat/completions"):
+                self._chat(body)
+            else:
+                self._json(404, _error("not found", "invalid_request_error"))
+
+        def _chat(self, body: dict):
+            stub.count("requests")
+            fault = stub.pick_fault(self.headers.get("X-Stub-Fault"))
+            if fault == "timeout":
+                stub.count("timeouts")
+                stub.hang()
+            elif fault == "429":
+                stub.count("429")
+                self._json(429, _error("Rate limit reached (stub)", "rate_limit_error"), {
+                    "Retry-After": f"{stub.retry_after:g}",
+                    "retry-after-ms": str(int(stub.retry_after * 1000)),
+                })
+                return
+            elif fault == "500":
+                stub.count("500")
+                self._json(500, _error("Internal error (stub)", "server_error"))
+                return
+
+            try:
+                result = stub.complete(body)
+            except Exception as e:
+                stub.count("upstream_errors")
+                self._json(502, _error(f"upstream failed: {e}", "server_error"))
+                return
+
+            model = body.get("model") or "stub"
+            stub.count(f"model:{model}")
+            if body.get("stream"):
+                self._stream(model, result)
+                return
+
+            time.sleep(stub.generation_delay(result["completion_tokens"]))
+            self._json(200, {
+                "id": f"chatcmpl-stub-{time.monotonic_ns()}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": result["content"]},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": result["prompt_tokens"],
+                    "completion_tokens": result["completion_tokens"],
+                    "total_tokens": result["prompt_tokens"] + result["completion_tokens"],
+                },
+            })
+
+        def _stream(self, model: str, result: dict):
+            """按 token 速率分块推送 SSE，首块前等待 latency_ms"""
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+
+            content = result["content"]
+            pieces = [content[i:i + 4] for i in range(0, len(content), 4)] or [""]
+            per_piece = 1 / stub.tokens_per_second if stub.tokens_per_second > 0 else 0
+            time.sleep(stub.latency_ms / 1000)
+            for i, piece in enumerate(pieces):
+                chunk = {
+                    "id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+                }
+                if i == len(pieces) - 1:
+                    chunk["choices"][0]["finish_reason"] = "stop"
+                self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(per_piece)
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+
+        def _json(self, status: int, data: dict, headers: dict | None = None):
+            payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return Handler
+
+
+def _error(message: str, kind: str) -> dict:
+    return {"error": {"message": message, "type": kind, "param": None, "code": None}}
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="OpenAI 兼容的 LLM 桩服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--mode", choices=("synthetic", "record", "replay"), default="synthetic")
+    parser.add_argument("--cassette", help="record/replay 使用的 JSONL 文件")
+    parser.add_argument("--upstream", help="record 模式转发的真实服务地址（含 /v1）")
+    parser.add_argument("--upstream-key", default="", help="上游 API Key（默认读取 AI_API_KEY）")
+    parser.add_argument("--latency-ms", type=float, default=0, help="每次请求的固定延迟")
+    parser.add_argument("--tokens-per-second", type=float, default=0, help="模拟输出速率，0 表示不限")
+    parser.add_argument("--rate-429", type=float, default=0, help="返回 429 的概率")
+    parser.add_argument("--rate-500", type=float, default=0, help="返回 500 的概率")
+    parser.add_argument("--rate-timeout", type=float, default=0, help="挂起不响应的概率")
+    parser.add_argument("--hang-seconds", type=float, default=30, help="超时故障挂起的秒数")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="429 响应的 Retry-After 秒数")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.mode == "record" and not args.upstream_key:
+        import os
+        args.upstream_key = os.getenv("AI_API_KEY", "")
+
+    stub = LLMStub(
+        host=args.host, port=args.port, mode=args.mode, cassette=args.cassette,
+        upstream=args.upstream, upstream_key=args.upstream_key,
+        latency_ms=args.latency_ms, tokens_per_second=args.tokens_per_second,
+        rate_429=args.rate_429, rate_500=args.rate_500, rate_timeout=args.rate_timeout,
+        hang_seconds=args.hang_seconds, retry_after=args.retry_after, seed=args.seed,
+    )
+    print(f"[LLMStub] {args.mode} 模式监听 {stub.base_url}")
+    try:
+        stub.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""API 压测与延迟回归 —— 种子数据集 + 脚本化用户旅程 + 桩 AI 服务
+
+    python -m benchmarks.loadtest --rows 1k --users 8 --duration 30
+    python -m benchmarks.loadtest --rows 100k --output load-100k.json --baseline load-100k.json
+
+流程：生成（或复用 data/loadtest/ 下缓存的）种子库并复制一份工作副本，
+启动 LLM 桩服务与 uvicorn 子进程（SCHEDULER_ENABLED=false，AI_BASE_URL 指向桩服务），
+users 个并发用户按权重循环执行旅程，持续 duration 秒：
+
+    dashboard   今日统计、今日计划、推荐、待复习
+    discover    文章列表按游标翻 3 页（随机难度筛选）
+    reader      文章详情、后续句子、词汇画像、划词翻译（桩 AI）、标记已读
+    review      待复习列表、提交至多 5 个复习结果、生词列表
+    stats       周统计、今日统计、AI 统计
+
+按路由模板报告请求数、错误率、吞吐与 p50/p90/p99/max 延迟（毫秒）。
+阈值（默认见 DEFAULT_THRESHOLDS，可用 --thresholds JSON 按路由覆盖）或
+与 --baseline 相比 p99 退化超过 tolerance 时以非零状态退出。
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+import httpx
+
+from benchmarks.llm_stub import LLMStub
+from benchmarks.seed_dataset import parse_rows
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 路由模板 -> {p99_ms, error_rate}；"*" 为未单独配置路由的默认值
+DEFAULT_THRESHOLDS = {
+    "*": {"p99_ms": 1000, "error_rate": 0.01},
+    "POST /api/translate/selection": {"p99_ms": 3000, "error_rate": 0.01},
+}
+
+JOURNEY_WEIGHTS = {"dashboard": 2, "discover": 3, "reader": 3, "review": 2, "stats": 1}
+
+
+class Recorder:
+    """线程安全地按路由模板收集延迟与状态码"""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.journeys: dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def call(self, client: httpx.Client, method: str, route: str, url: str, **kwargs) -> httpx.Response | None:
+        start = time.perf_counter()
+        try:
+            resp = client.request(method, url, **kwargs)
+            failed = resp.status_code >= 400
+        except httpx.HTTPError:
+            resp, failed = None, True
+        elapsed = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.latencies[f"{method} {route}"].append(elapsed)
+            if failed:
+                self.errors[f"{method} {route}"] += 1
+        return None if failed else resp
+
+
+# ─── 用户旅程 ───
+
+def dashboard(client, rec: Recorder, rng: random.Random, rows: int):
+    rec.call(client, "GET", "/api/stats/today", "/api/stats/today")
+    rec.call(client, "GET", "/api/plan/today", "/api/plan/today")
+    rec.call(client, "GET", "/api/content/recommend", "/api/content/recommend", params={"count": 5})
+    rec.call(client, "GET", "/api/vocab/review/today", "/api/vocab/review/today")
+
+
+def discover(client, rec: Recorder, rng: random.Random, rows: int):
+    params = {"limit": 20}
+    if rng.random() < 0.3:
+        params["difficulty"] = rng.choice(("easy", "medium", "hard"))
+    for _ in range(3):
+        resp = rec.call(client, "GET", "/api/content/articles", "/api/content/articles", params=params)
+        cursor = resp.headers.get("X-Next-Cursor") if resp else None
+        if not cursor:
+            break
+        params = {**params, "cursor": cursor}
+
+
+def reader(client, rec: Recorder, rng: random.Random, rows: int):
+    article_id = rng.randint(1, rows)
+    base = f"/api/content/article/{article_id}"
+    resp = rec.call(client, "GET", "/api/content/article/{id}", base, params={"sentence_limit": 3})
+    if not resp:
+        return
+    rec.call(client, "GET", "/api/content/article/{id}/sentences", f"{base}/sentences", params={"start": 3})
+    rec.call(client, "GET", "/api/content/article/{id}/lexicon", f"{base}/lexicon")
+    sentences = resp.json().get("sentences") or []
+    if sentences:
+        words = sentences[0]["text_en"].split()
+        rec.call(client, "POST", "/api/translate/selection", "/api/translate/selection",
+                 json={"text": " ".join(words[:3]), "context": sentences[0]["text_en"]})
+    rec.call(client, "POST", "/api/content/article/{id}/read", f"{base}/read")
+
+
+def review(client, rec: Recorder, rng: random.Random, rows: int):
+    resp = rec.call(client, "GET", "/api/vocab/review/today", "/api/vocab/review/today")
+    due = resp.json() if resp else []
+    for item in rng.sample(due, min(5, len(due))):
+        rec.call(client, "POST", "/api/vocab/review/{id}", f"/api/vocab/review/{item['id']}",
+                 json={"quality": rng.randint(2, 5)})
+    rec.call(client, "GET", "/api/vocab/list", "/api/vocab/list", params={"limit": 50})
+
+
+def stats(client, rec: Recorder, rng: random.Random, rows: int):
+    rec.call(client, "GET", "/api/stats/weekly", "/api/stats/weekly")
+    rec.call(client, "GET", "/api/stats/today", "/api/stats/today")
+    rec.call(client, "GET", "/api/stats/ai", "/api/stats/ai")
+
+
+JOURNEYS = {"dashboard": dashboard, "discover": discover, "reader": reader, "review": review, "stats": stats}
+
+
+# ─── 运行 ───
+
+def prepare_dataset(rows: int, reseed: bool = False) -> str:
+    """返回缓存的种子库路径，不存在（或 reseed）时以子进程生成"""
+    path = os.path.join(BACKEND_DIR, "data", "loadtest", f"seed-{rows}.db")
+    if reseed or not os.path.exists(path):
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.seed_dataset", "--rows", str(rows), "--path", path],
+            cwd=BACKEND_DIR, check=True,
+        )
+    return path
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(db_path: str, ai_base_url: str, port: int, workers: int = 1) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{db_path}",
+        "AI_BASE_URL": ai_base_url,
+        "AI_API_KEY": "stub",
+        "SCHEDULER_ENABLED": "false",
+    }
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "--factory", "app:create_app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with {proc.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/api/health", timeout=1).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("server did not become healthy in time")
+
+
+def run_users(base_url: str, rows: int, users: int, duration: float, seed: int = 42) -> tuple[Recorder, float]:
+    rec = Recorder()
+    names = list(JOURNEY_WEIGHTS)
+    weights = [JOURNEY_WEIGHTS[n] for n in names]
+    deadline = time.monotonic() + duration
+
+    def user(index: int):
+        rng = random.Random(seed * 1000 + index)
+        with httpx.Client(base_url=base_url, timeout=30) as client:
+            while time.monotonic() < deadline:
+                name = rng.choices(names, weights)[0]
+                JOURNEYS[name](client, rec, rng, rows)
+                with rec._lock:
+                    rec.journeys[name] += 1
+
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(users)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return rec, time.perf_counter() - start
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def summarize(rec: Recorder, elapsed: float) -> dict:
+    routes = {}
+    for route, values in sorted(rec.latencies.items()):
+        values = sorted(values)
+        routes[route] = {
+            "requests": len(values),
+            "errors": rec.errors.get(route, 0),
+            "error_rate": round(rec.errors.get(route, 0) / len(values), 4),
+            "rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(percentile(values, 50), 2),
+            "p90_ms": round(percentile(values, 90), 2),
+            "p99_ms": round(percentile(values, 99), 2),
+            "max_ms": round(values[-1], 2),
+        }
+    total = sum(r["requests"] for r in routes.values())
+    return {
+        "elapsed_seconds": round(elapsed, 2),
+        "requests": total,
+        "rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "journeys": dict(rec.journeys),
+        "routes": routes,
+    }
+
+
+def check(summary: dict, thresholds: dict, baseline: dict | None = None, tolerance: float = 0.25) -> list[str]:
+    """返回违反阈值或相对基线退化的描述"""
+    failures = []
+    default = thresholds.get("*", {})
+    for route, stat in summary["routes"].items():
+        limit = {**default, **thresholds.get(route, {})}
+        if "p99_ms" in limit and stat["p99_ms"] > limit["p99_ms"]:
+            failures.append(f"{route}: p99 {stat['p99_ms']}ms > {limit['p99_ms']}ms")
+        if "error_rate" in limit and stat["error_rate"] > limit["error_rate"]:
+            failures.append(f"{route}: error rate {stat['error_rate']} > {limit['error_rate']}")
+
+        old = (baseline or {}).get("routes", {}).get(route)
+        # 小于 5ms 的波动不计为退化
+        if old and stat["p99_ms"] > old["p99_ms"] * (1 + tolerance) and stat["p99_ms"] - old["p99_ms"] > 5:
+            failures.append(f"{route}: p99 {old['p99_ms']}ms -> {stat['p99_ms']}ms (baseline)")
+    return failures
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="API 压测与延迟回归")
+    parser.add_argument("--rows", type=parse_rows, default=1000, help="数据集规模（1k/100k/1m）")
+    parser.add_argument("--reseed", action="store_true", help="重新生成缓存的种子库")
+    parser.add_argument("--users", type=int, default=8, help="并发用户数")
+    parser.add_argument("--duration", type=float, default=30, help="持续秒数")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn 进程数")
+    parser.add_argument("--ai-latency-ms", type=float, default=200, help="桩 AI 服务的固定延迟")
+    parser.add_argument("--ai-tokens-per-second", type=float, default=0, help="桩 AI 服务的输出速率")
+    parser.add_argument("--thresholds", help="按路由覆盖阈值的 JSON 文件")
+    parser.add_argument("--baseline", help="与该 JSON 结果比较 p99")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="允许的 p99 增幅")
+    parser.add_argument("--output", help="结果写入该 JSON 文件")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    if args.thresholds:
+        with open(args.thresholds, encoding="utf-8") as f:
+            thresholds.update(json.load(f))
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    seed_path = prepare_dataset(args.rows, args.reseed)
+    with tempfile.TemporaryDirectory() as tmp, LLMStub(
+        latency_ms=args.ai_latency_ms, tokens_per_second=args.ai_tokens_per_second,
+    ) as stub:
+        db_path = os.path.join(tmp, "loadtest.db")
+        shutil.copyfile(seed_path, db_path)
+        port = _free_port()
+        server = start_server(db_path, stub.base_url, port, args.workers)
+        try:
+            rec, elapsed = run_users(f"http://127.0.0.1:{port}", args.rows, args.users, args.duration, args.seed)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    summary = summarize(rec, elapsed)
+    failures = check(summary, thresholds, baseline, args.tolerance)
+    report = {
+        "benchmark": "loadtest",
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "params": {"rows": args.rows, "users": args.users, "duration": args.duration, "workers": args.workers,
+                   "ai_latency_ms": args.ai_latency_ms},
+        **summary,
+        "failures": failures,
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,175 @@
+"""压测数据集生成 —— 文章 / 生词 / 复习记录各 N 行
+
+    python -m benchmarks.seed_dataset --rows 100000 --path data/loadtest/seed-100000.db
+
+数据库按应用的 init_db 建表（含迁移标记与默认源），再以原生 executemany 批量写入：
+每篇文章若干压缩句子与词汇画像，生词约 2% 今日到期，复习记录分布在近 30 天。
+为避免逐行触发 FTS 触发器，写入前删除全文索引，写完由 init_search_index 重建。
+未生成例句倒排索引（sentence_lemma），推荐打分中的生词命中项因此为 0。
+
+DATABASE_URL 在导入 models 前设置，因此请以独立进程运行（loadtest 会自动调用）。
+"""
+import argparse
+import json
+import os
+import random
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+BATCH = 10000
+SENTENCES_PER_ARTICLE = 6
+
+_WORDS = (
+    "the government said on monday that it would raise spending on schools and hospitals "
+    "central bank interest rates inflation remained above target for third month in a row "
+    "officials warned economy could slow next year as exports fell while markets rose after "
+    "report showed strong demand for new homes climate scientists researchers study found "
+    "voters parliament election minister announced policy reform energy prices households"
+).split()
+_VOCAB = (
+    "resilience ambiguous mitigate scrutiny volatile unprecedented tariff subsidy austerity "
+    "consensus coalition deficit surge plummet bolster curb erode hamper spur tout"
+).split()
+_CATEGORIES = ("world", "business", "technology", "science", "general")
+_DIFFICULTY = ("easy", "medium", "hard")
+
+
+def _sentence(rng: random.Random) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(8, 22))).capitalize() + "."
+
+
+def seed(path: str, rows: int, seed_value: int = 42, sentences_per_article: int = SENTENCES_PER_ARTICLE) -> dict:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if os.path.exists(path):
+        os.remove(path)
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+
+    from sqlalchemy import text
+
+    from models import compression
+    from models.database import engine, init_db
+    from services.profile_service import pack_freqs, pack_hashes
+    from services.search_service import init_search_index
+
+    started = time.perf_counter()
+    init_db()
+    with engine.begin() as conn:
+        fts_objects = conn.execute(text(
+            "SELECT type, name FROM sqlite_master WHERE name LIKE '%\\_fts%' ESCAPE '\\' "
+            "AND (type = 'trigger' OR sql LIKE 'CREATE VIRTUAL TABLE%')"
+        )).all()
+        for kind, name in sorted(fts_objects, key=lambda o: o[0] != "trigger"):
+            conn.execute(text(f"DROP {kind.upper()} IF EXISTS {name}"))
+        source_ids = [sid for (sid,) in conn.execute(text("SELECT id FROM news_source"))]
+
+    rng = random.Random(seed_value)
+    now = datetime.utcnow()
+    today = date.today()
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        cur.execute("PRAGMA synchronous = OFF")
+
+        for start in range(1, rows + 1, BATCH):
+            ids = range(start, min(start + BATCH, rows + 1))
+            articles, sentences, profiles = [], [], []
+            for aid in ids:
+                published = now - timedelta(minutes=rng.randint(0, 90 * 24 * 60))
+                readability = rng.uniform(20, 90)
+                articles.append((
+                    aid, rng.choice(source_ids), " ".join(rng.choice(_WORDS) for _ in range(7)).capitalize(),
+                    f"https://fixture.example/{aid}", rng.choice(_DIFFICULTY), rng.choice(_CATEGORIES),
+                    rng.randint(300, 1200), readability, rng.random() < 0.1, published, published,
+                ))
+                freqs = Counter()
+                for i in range(sentences_per_article):
+                    sentence = _sentence(rng)
+                    freqs.update(sentence.lower().rstrip(".").split())
+                    sentences.append((aid, i, compression.compress_text(sentence), None))
+                rare = rng.sample(_VOCAB, 5)
+                freqs.update(rare)
+                profiles.append((
+                    aid, max(0.0, min(1.0, (100 - readability) / 100)), len(freqs), len(rare), pack_freqs(freqs),
+                    json.dumps(rare), pack_hashes(rare), json.dumps({"A1": 40, "B1": 30, "C1": 10}), now,
+                ))
+            cur.executemany(
+                "INSERT INTO article (id, source_id, title, url, difficulty, category, word_count, "
+                "readability_score, is_read, published_at, fetched_at) VALUES (?,?,?,?,?,?,?,?,?,?,?)",
+                articles,
+            )
+            cur.executemany(
+                'INSERT INTO article_sentence (article_id, "index", text_en, text_zh) VALUES (?,?,?,?)', sentences,
+            )
+            cur.executemany(
+                "INSERT INTO article_profile (article_id, level, unique_lemmas, rare_count, lemma_freqs, "
+                "rare_words, rare_hashes, cefr_bands, created_at) VALUES (?,?,?,?,?,?,?,?,?)",
+                profiles,
+            )
+
+            vocab, reviews = [], []
+            for vid in ids:
+                word = f"{rng.choice(_VOCAB)}{vid}"
+                due = today - timedelta(days=rng.randint(0, 3)) if rng.random() < 0.02 \
+                    else today + timedelta(days=rng.randint(1, 60))
+                vocab.append((
+                    vid, word, word, "noun", f"{word} 的释义", f"meaning of {word}", _sentence(rng),
+                    rng.randint(1, rows), 2.5, rng.randint(1, 30), rng.randint(0, 6), due, rng.random() < 0.2,
+                    now - timedelta(minutes=rng.randint(0, 180 * 24 * 60)),
+                ))
+                reviews.append((
+                    rng.randint(1, rows), rng.randint(0, 5), now - timedelta(minutes=rng.randint(0, 30 * 24 * 60)),
+                ))
+            cur.executemany(
+                "INSERT INTO vocab_item (id, word, lemma, pos, definition, definition_en, example_sentence, "
+                "article_id, ease_factor, interval_days, repetitions, next_review_date, is_mastered, created_at) "
+                "VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+                vocab,
+            )
+            cur.executemany("INSERT INTO vocab_review (vocab_id, quality, reviewed_at) VALUES (?,?,?)", reviews)
+            raw.commit()
+
+        cur.executemany(
+            "INSERT INTO study_session (session_type, started_at, duration_seconds) VALUES (?,?,?)",
+            [
+                (rng.choice(("reading", "vocab", "speaking", "writing")),
+                 now - timedelta(minutes=rng.randint(0, 30 * 24 * 60)), rng.randint(60, 1800))
+                for _ in range(max(10, rows // 100))
+            ],
+        )
+        raw.commit()
+        cur.execute("ANALYZE")
+    finally:
+        raw.close()
+
+    init_search_index(engine)
+    engine.dispose()
+    return {
+        "path": path,
+        "rows": rows,
+        "seconds": round(time.perf_counter() - started, 1),
+        "bytes": os.path.getsize(path),
+    }
+
+
+def parse_rows(value: str) -> int:
+    """支持 1k / 100k / 1m 写法"""
+    value = value.strip().lower()
+    multiplier = {"k": 1000, "m": 1000000}.get(value[-1:], 1)
+    return int(float(value.rstrip("km")) * multiplier)
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="生成压测数据集")
+    parser.add_argument("--rows", type=parse_rows, default=1000, help="文章/生词/复习记录各多少行（支持 1k/100k/1m）")
+    parser.add_argument("--path", help="输出数据库路径，默认 data/loadtest/seed-<rows>.db")
+    parser.add_argument("--sentences", type=int, default=SENTENCES_PER_ARTICLE, help="每篇文章的句子数")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    path = args.path or os.path.join("data", "loadtest", f"seed-{args.rows}.db")
+    print(json.dumps(seed(path, args.rows, args.seed, args.sentences), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
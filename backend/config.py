@@ -1,20 +1,93 @@
 """应用配置"""
+import json
 import os
+from pydantic import BaseModel, field_validator
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
+class AIRoute(BaseModel):
+    """单个 AI 功能的路由：模型、采样参数、超时与降级策略"""
+    model: str = "default"              # default（AI_MODEL）/ fast（AI_FAST_MODEL）/ 具体模型名
+    temperature: float = 0.7
+    max_tokens: int | None = None
+    timeout: float = 60                 # 单次请求超时（秒）
+    fallback: str | None = None         # 超时、限流或 5xx 时改用的模型
+    hedge_after: float | None = None    # 主模型超过该秒数未返回时，并发请求 fallback，取先返回者
+    json_mode: bool = False             # 请求 response_format=json_object（返回 JSON 的功能）
+
+
+# 交互路径（划词翻译、口语）设置较短超时并对冲到快速模型，保证延迟；
+# max_tokens 需容纳完整回复（写作含修改后的全文），被截断的回复按失败处理
+DEFAULT_AI_ROUTES: dict[str, dict] = {
+    "translate": {"temperature": 0.3, "max_tokens": 1000, "timeout": 8, "fallback": "fast", "hedge_after": 3,
+                  "json_mode": True},
+    "explain": {"temperature": 0.5, "max_tokens": 800, "timeout": 20, "fallback": "fast"},
+    "translate_sentences": {"temperature": 0.3, "max_tokens": 2000, "timeout": 60, "fallback": "fast"},
+    "definition": {"model": "fast", "temperature": 0.3, "max_tokens": 300, "timeout": 8, "fallback": "default",
+                   "json_mode": True},
+    "summary": {"model": "fast", "temperature": 0.5, "max_tokens": 200, "timeout": 30},
+    "plan": {"temperature": 0.7, "max_tokens": 600, "timeout": 30, "fallback": "fast", "json_mode": True},
+    "speaking": {"temperature": 0.8, "max_tokens": 400, "timeout": 10, "fallback": "fast", "hedge_after": 4,
+                 "json_mode": True},
+    "writing": {"temperature": 0.5, "max_tokens": 4000, "timeout": 90, "json_mode": True},
+}
+
+
 class Settings(BaseSettings):
     ai_api_key: str = os.getenv("AI_API_KEY", "")
     ai_base_url: str = os.getenv("AI_BASE_URL", "https://api.openai.com/v1")
     ai_model: str = os.getenv("AI_MODEL", "gpt-4o-mini")
+    ai_fast_model: str = os.getenv("AI_FAST_MODEL", "")       # 为空时与 ai_model 相同
+    # 各功能路由，AI_ROUTES 为 JSON，按功能逐项覆盖默认值，如 {"writing": {"model": "gpt-4o"}}
+    ai_routes: dict[str, AIRoute] = json.loads(os.getenv("AI_ROUTES") or "{}")
+    # 服务商不支持 response_format 时设为 false（遇到拒绝也会在进程内自动关闭）
+    ai_json_mode: bool = os.getenv("AI_JSON_MODE", "true").lower() in ("1", "true", "yes")
     database_url: str = os.getenv("DATABASE_URL", "sqlite:///./data/english_learning.db")
-    rss_fetch_interval: int = int(os.getenv("RSS_FETCH_INTERVAL", "6"))
+    # AI 任务队列限流：每分钟请求数 / 每分钟 token 数
+    ai_requests_per_minute: int = int(os.getenv("AI_REQUESTS_PER_MINUTE", "60"))
+    ai_tokens_per_minute: int = int(os.getenv("AI_TOKENS_PER_MINUTE", "90000"))
+    rss_fetch_interval: int = int(os.getenv("RSS_FETCH_INTERVAL", "6"))   # 新源的初始抓取间隔（小时）
+    rss_tick_minutes: int = int(os.getenv("RSS_TICK_MINUTES", "5"))       # 检查到期源的周期
+    # Web 进程是否运行定时任务（含 AI 任务队列）；设为 false 时必须另行运行 worker.py
+    scheduler_enabled: bool = os.getenv("SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
+    # 未读且未关联生词的文章超过该天数后归档；0 表示不归档
+    retention_days: int = int(os.getenv("RETENTION_DAYS", "30"))
+    archive_dir: str = os.getenv("ARCHIVE_DIR", "./data/archive")
+    # 超过该字节数的响应 gzip 压缩，0 表示关闭
+    gzip_min_bytes: int = int(os.getenv("GZIP_MIN_BYTES", "1024"))
+    # 按需剖析（见 services/profiling.py）：关闭时不安装中间件
+    profiling_enabled: bool = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+    profile_requests: int = int(os.getenv("PROFILE_REQUESTS", "0"))          # 启动后剖析前 N 个请求
+    profile_interval_ms: float = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+    profile_dir: str = os.getenv("PROFILE_DIR", "./data/profiles")
+    # 慢 SQL 阈值（毫秒），0 表示不记录
+    slow_sql_ms: float = float(os.getenv("SLOW_SQL_MS", "0"))
 
     class Config:
         env_file = ".env"
 
+    @field_validator("ai_routes", mode="before")
+    @classmethod
+    def _merge_default_routes(cls, value):
+        overrides = json.loads(value) if isinstance(value, str) else (value or {})
+        routes = {feature: dict(route) for feature, route in DEFAULT_AI_ROUTES.items()}
+        for feature, route in overrides.items():
+            routes.setdefault(feature, {}).update(route if isinstance(route, dict) else dict(route))
+        return routes
+
+    def route(self, feature: str) -> AIRoute:
+        return self.ai_routes.get(feature) or AIRoute()
+
+    def resolve_model(self, name: str | None) -> str | None:
+        """模型别名 -> 实际模型名"""
+        if name in (None, "default"):
+            return self.ai_model if name else None
+        if name == "fast":
+            return self.ai_fast_model or self.ai_model
+        return name
+
 
 settings = Settings()
@@ -8,7 +8,16 @@ from models.tables import (
     NewsSource,
     Article,
     ArticleSentence,
+    SentenceLemma,
+    ArticleProfile,
+    CompressionDict,
+    ArchivedArticle,
+    ArticleLSH,
+    JobLease,
+    AIJob,
+    AICallStat,
     VocabItem,
+    DictionaryEntry,
     VocabReview,
     SpeakingSession,
     SpeakingTurn,
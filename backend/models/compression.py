@@ -0,0 +1,196 @@
+"""文本压缩存储 —— zlib raw deflate + 训练得到的预置字典
+
+句子级短文本单独压缩效果很差，预置字典（语料中的高频片段）能让几十字节的
+句子也获得可观压缩率。每个压缩值带 1 字节格式头：
+
+    0x00 + UTF-8 原文            压缩无收益时原样存储
+    0x01 + deflate               无字典压缩
+    0x02 + uint16 字典 id + deflate   使用预置字典压缩
+
+字典保存在 compression_dict 表中。字典 id 只在所属数据库内有意义，因此缓存按
+引擎隔离（DictionaryStore，以引擎的 Dialect 实例为键）：同一进程打开多个数据库
+（测试、基准、迁移命令）不会用错字典。读取遇到未缓存的 id 时从该引擎的
+compression_dict 表按需加载。不经引擎直接调用 compress_text / decompress_text
+时使用进程级默认缓存。
+"""
+import struct
+import weakref
+import zlib
+from collections import Counter
+from typing import Callable
+
+from sqlalchemy import LargeBinary, event, text
+from sqlalchemy.engine import Connection, Dialect, Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.types import TypeDecorator
+
+_RAW = 0x00
+_DEFLATE = 0x01
+_DEFLATE_DICT = 0x02
+_DICT_ID = struct.Struct("<H")
+
+# 预置字典上限（zlib 窗口大小）
+MAX_DICT_SIZE = 32 * 1024
+
+
+class DictionaryStore:
+    """单个数据库的字典缓存：id -> 字典内容，以及当前写入使用的字典"""
+
+    def __init__(self, loader: Callable[[int], bytes | None] | None = None):
+        self.dictionaries: dict[int, bytes] = {}
+        self.active_id: int | None = None
+        self.loader = loader
+
+    def register(self, dict_id: int, data: bytes, active: bool = True):
+        self.dictionaries[dict_id] = data
+        if active and (self.active_id is None or dict_id >= self.active_id):
+            self.active_id = dict_id
+
+    def get(self, dict_id: int) -> bytes:
+        if dict_id not in self.dictionaries and self.loader is not None:
+            data = self.loader(dict_id)
+            if data is not None:
+                self.register(dict_id, data, active=False)
+        if dict_id not in self.dictionaries:
+            raise ValueError(f"Compression dictionary {dict_id} not available")
+        return self.dictionaries[dict_id]
+
+    def compress(self, text: str | None) -> bytes | None:
+        if text is None:
+            return None
+        raw = text.encode("utf-8")
+        best = bytes([_RAW]) + raw
+
+        if self.active_id is not None:
+            zdict = self.dictionaries[self.active_id]
+            packed = bytes([_DEFLATE_DICT]) + _DICT_ID.pack(self.active_id) + _deflate(raw, zdict)
+        else:
+            packed = bytes([_DEFLATE]) + _deflate(raw, None)
+        return packed if len(packed) < len(best) else best
+
+    def decompress(self, value: bytes | str | None) -> str | None:
+        """解压；兼容迁移前的明文 str 值"""
+        if value is None or isinstance(value, str):
+            return value
+        value = bytes(value)
+        if not value:
+            return ""
+
+        tag = value[0]
+        if tag == _RAW:
+            return value[1:].decode("utf-8")
+        if tag == _DEFLATE:
+            return _inflate(value[1:], None).decode("utf-8")
+        if tag == _DEFLATE_DICT:
+            (dict_id,) = _DICT_ID.unpack_from(value, 1)
+            return _inflate(value[1 + _DICT_ID.size:], self.get(dict_id)).decode("utf-8")
+        raise ValueError(f"Unknown compression tag: {tag}")
+
+
+_default_store = DictionaryStore()
+_stores: "weakref.WeakKeyDictionary[Dialect, DictionaryStore]" = weakref.WeakKeyDictionary()
+
+
+def store_for(bind: Engine | Connection | Session | Dialect | None) -> DictionaryStore:
+    """取引擎（或其连接、会话、Dialect）对应的字典缓存；None 为进程级默认缓存"""
+    if bind is None:
+        return _default_store
+    if isinstance(bind, Session):
+        bind = bind.get_bind()
+    dialect = bind if isinstance(bind, Dialect) else bind.dialect
+    store = _stores.get(dialect)
+    if store is None:
+        store = _stores[dialect] = DictionaryStore()
+    return store
+
+
+def register_dictionary(dict_id: int, data: bytes, active: bool = True, bind=None):
+    """缓存字典；active=True 时后续写入使用该字典"""
+    store_for(bind).register(dict_id, data, active)
+
+
+def compress_text(text: str | None, store: DictionaryStore | None = None) -> bytes | None:
+    return (store or _default_store).compress(text)
+
+
+def decompress_text(value: bytes | str | None, store: DictionaryStore | None = None) -> str | None:
+    """解压；兼容迁移前的明文 str 值"""
+    return (store or _default_store).decompress(value)
+
+
+def train_dictionary(samples: list[str], size: int = MAX_DICT_SIZE) -> bytes:
+    """从样本文本训练预置字典：选取"出现次数 × 长度"收益最高的 1-3 词片段
+
+    zlib 对距离越近的字典内容编码越短，因此收益最高的片段放在字典末尾。
+    """
+    grams: Counter = Counter()
+    for text in samples:
+        words = text.split()
+        for n in (1, 2, 3):
+            for i in range(len(words) - n + 1):
+                grams[" ".join(words[i:i + n]) + " "] += 1
+
+    scored = sorted(
+        ((count * len(gram), gram) for gram, count in grams.items() if count > 1),
+        reverse=True,
+    )
+    picked, total = [], 0
+    for _, gram in scored:
+        encoded = gram.encode("utf-8")
+        if total + len(encoded) > size:
+            continue
+        picked.append(encoded)
+        total += len(encoded)
+    return b"".join(reversed(picked))
+
+
+class CompressedText(TypeDecorator):
+    """透明压缩的文本列：Python 侧为 str，库中为压缩 BLOB"""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return store_for(dialect).compress(value)
+
+    def process_result_value(self, value, dialect):
+        return store_for(dialect).decompress(value)
+
+
+def install(engine: Engine) -> DictionaryStore:
+    """为引擎建立字典缓存（缺失的字典从该库按需加载），并为每个 SQLite 连接
+    注册 unz() 函数，供 FTS 触发器/视图在 SQL 中解压；重复调用无副作用"""
+    store = store_for(engine)
+    if store.loader is not None:
+        return store
+    # 弱引用：缓存挂在 Dialect 上，不应反过来让引擎无法回收
+    engine_ref = weakref.ref(engine)
+    store.loader = lambda dict_id: _load_dictionary(engine_ref(), dict_id)
+
+    if engine.dialect.name == "sqlite":
+        @event.listens_for(engine, "connect")
+        def _register(dbapi_connection, _):
+            dbapi_connection.create_function("unz", 1, store.decompress, deterministic=True)
+    return store
+
+
+def _load_dictionary(engine: Engine | None, dict_id: int) -> bytes | None:
+    if engine is None:
+        return None
+    with engine.connect() as conn:
+        return conn.execute(
+            text("SELECT data FROM compression_dict WHERE id = :id"), {"id": dict_id}
+        ).scalar()
+
+
+def _deflate(raw: bytes, zdict: bytes | None) -> bytes:
+    if zdict:
+        c = zlib.compressobj(9, zlib.DEFLATED, -15, 9, zlib.Z_DEFAULT_STRATEGY, zdict)
+    else:
+        c = zlib.compressobj(9, zlib.DEFLATED, -15, 9)
+    return c.compress(raw) + c.flush()
+
+
+def _inflate(data: bytes, zdict: bytes | None) -> bytes:
+    d = zlib.decompressobj(-15, zdict) if zdict else zlib.decompressobj(-15)
+    return d.decompress(data) + d.flush()
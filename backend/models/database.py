@@ -1,9 +1,12 @@
 """数据库引擎与会话管理"""
+import functools
 import os
-from sqlalchemy import create_engine
+import re
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 
 from config import settings
+from models import compression
 
 # 确保 data 目录存在
 os.makedirs("data", exist_ok=True)
@@ -14,6 +17,9 @@ engine = create_engine(
     echo=False,
 )
 
+# SQL 中可用 unz() 解压压缩列（FTS 触发器依赖）
+compression.install(engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -22,17 +28,77 @@ class Base(DeclarativeBase):
 
 
 def init_db():
-    """创建所有表"""
+    """建表、迁移并填充默认数据
+
+    结构已是最新（迁移版本为 head 且模型的表都存在）时跳过 create_all 与 alembic，
+    启动只需两次元数据查询；默认数据只在首次建库时写入。
+    """
     from models.tables import (  # noqa: F401 确保模型被导入
         UserProfile, DailyPlan, PlanTask, StudySession,
-        NewsSource, Article, ArticleSentence,
-        VocabItem, VocabReview,
+        NewsSource, Article, ArticleSentence, SentenceLemma, ArticleProfile, CompressionDict, ArchivedArticle, ArticleLSH, JobLease, AIJob, AICallStat,
+        VocabItem, VocabReview, DictionaryEntry,
         SpeakingSession, SpeakingTurn,
         WritingSubmission, WritingFeedback,
     )
-    Base.metadata.create_all(bind=engine)
-    # 初始化默认用户 profile 和 RSS 源
-    _seed_defaults()
+    with engine.connect() as conn:
+        tables = set(inspect(conn).get_table_names())
+        version = conn.execute(text("SELECT version_num FROM alembic_version")).scalar() \
+            if "alembic_version" in tables else None
+    first_run = UserProfile.__tablename__ not in tables
+
+    if version != head_revision() or not tables.issuperset(Base.metadata.tables):
+        Base.metadata.create_all(bind=engine)
+        # 已有数据库的结构变更（索引、新增列等）
+        _run_migrations()
+    _load_compression_dicts()
+    # 全文检索索引（FTS5 虚拟表 + 同步触发器），定义未变时只读取 sqlite_master
+    from services.search_service import init_search_index
+    init_search_index(engine)
+    if first_run:
+        # 初始化默认用户 profile 和 RSS 源
+        _seed_defaults()
+
+
+@functools.cache
+def head_revision() -> str | None:
+    """从迁移脚本读取 head 版本号（不导入 alembic，约 0.5 秒）"""
+    versions = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic", "versions")
+    revisions, parents = set(), set()
+    for name in os.listdir(versions):
+        if not name.endswith(".py"):
+            continue
+        with open(os.path.join(versions, name), encoding="utf-8") as f:
+            source = f.read()
+        revision = re.search(r"^revision\b[^=]*=\s*['\"]([^'\"]+)['\"]", source, re.M)
+        parent = re.search(r"^down_revision\b[^=]*=\s*['\"]([^'\"]+)['\"]", source, re.M)
+        if revision:
+            revisions.add(revision.group(1))
+        if parent:
+            parents.add(parent.group(1))
+    heads = revisions - parents
+    return heads.pop() if len(heads) == 1 else None
+
+
+def _run_migrations():
+    """执行 alembic 迁移到最新版本（迁移脚本均为幂等）"""
+    from alembic import command
+    from alembic.config import Config
+
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    cfg = Config(os.path.join(base_dir, "alembic.ini"))
+    cfg.set_main_option("script_location", os.path.join(base_dir, "alembic"))
+    cfg.set_main_option("sqlalchemy.url", settings.database_url)
+    cfg.attributes["configure_logger"] = False
+    with engine.begin() as connection:
+        cfg.attributes["connection"] = connection
+        command.upgrade(cfg, "head")
+
+
+def _load_compression_dicts():
+    """预先缓存本库全部压缩字典（最新的用于写入）"""
+    with engine.connect() as conn:
+        for dict_id, data in conn.execute(text("SELECT id, data FROM compression_dict ORDER BY id")):
+            compression.register_dictionary(dict_id, data, bind=engine)
 
 
 def _seed_defaults():
@@ -2,10 +2,11 @@
 from datetime import datetime, date
 from sqlalchemy import (
     Column, Integer, String, Text, Float, Boolean,
-    DateTime, Date, ForeignKey, Enum,
+    DateTime, Date, ForeignKey, Enum, LargeBinary, Index,
 )
 from sqlalchemy.orm import relationship
 from models.database import Base
+from models.compression import CompressedText
 
 
 class UserProfile(Base):
@@ -70,6 +71,17 @@ class NewsSource(Base):
     is_active = Column(Boolean, default=True)
     last_fetched = Column(DateTime, nullable=True)
 
+    # 自适应抓取计划（见 services.fetch_policy）
+    fetch_interval_minutes = Column(Integer, nullable=True)   # 按发布频率学习的抓取间隔
+    next_fetch_at = Column(DateTime, nullable=True, index=True)
+    etag = Column(String(200), nullable=True)                 # 条件请求缓存校验
+    last_modified = Column(String(100), nullable=True)
+    # 健康状态
+    health = Column(String(20), default="ok")                 # ok / degraded / failing
+    failure_count = Column(Integer, default=0)                # 连续失败次数
+    last_error = Column(Text, nullable=True)
+    last_success_at = Column(DateTime, nullable=True)
+
     articles = relationship("Article", back_populates="source")
 
 
@@ -81,7 +93,7 @@ class Article(Base):
     source_id = Column(Integer, ForeignKey("news_source.id"))
     title = Column(String(500), nullable=False)
     url = Column(String(1000), unique=True)
-    content = Column(Text)
+    content = Column(Text)               # 旧版正文；现由句子重建，新数据不再写入
     summary = Column(Text)
     difficulty = Column(String(20), default="medium")   # easy / medium / hard
     category = Column(String(50))
@@ -91,10 +103,16 @@ class Article(Base):
     is_read = Column(Boolean, default=False)
     published_at = Column(DateTime, nullable=True)
     fetched_at = Column(DateTime, default=datetime.utcnow)
+    canonical_id = Column(Integer, ForeignKey("article.id"), nullable=True)  # 近重复文章指向的原文
+    fingerprint = Column(LargeBinary, nullable=True)     # MinHash 签名
 
     source = relationship("NewsSource", back_populates="articles")
     sentences = relationship("ArticleSentence", back_populates="article", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_article_published_id", "published_at", "id"),  # keyset 分页
+    )
+
 
 class ArticleSentence(Base):
     """文章逐句拆分（用于对照翻译）"""
@@ -103,11 +121,124 @@ class ArticleSentence(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     article_id = Column(Integer, ForeignKey("article.id"), nullable=False)
     index = Column(Integer)              # 句子在文章中的顺序
-    text_en = Column(Text, nullable=False)
-    text_zh = Column(Text, nullable=True)
+    paragraph = Column(Integer, nullable=True)         # 所在段落序号，重建正文时据此分段
+    text_en = Column(CompressedText, nullable=False)   # 正文的唯一存储（压缩）
+    text_zh = Column(CompressedText, nullable=True)
 
     article = relationship("Article", back_populates="sentences")
 
+    __table_args__ = (
+        Index("ix_article_sentence_article_index", "article_id", "index"),  # 阅读器按句序分页
+    )
+
+
+class ArticleProfile(Base):
+    """文章词汇画像与推荐特征（入库时预计算）"""
+    __tablename__ = "article_profile"
+
+    article_id = Column(Integer, ForeignKey("article.id"), primary_key=True)
+    level = Column(Float, default=0.5)                 # 0(易)-1(难)，由可读性换算
+    unique_lemmas = Column(Integer, default=0)         # 实词 lemma 种数
+    rare_count = Column(Integer, default=0)            # 低频 lemma 种数
+    lemma_freqs = Column(LargeBinary, nullable=True)   # 打包的 lemma 词频向量
+    rare_words = Column(Text, nullable=True)           # JSON 低频词列表
+    rare_hashes = Column(LargeBinary, nullable=True)   # 打包的低频词 crc32（推荐打分用，免 JSON 解析）
+    cefr_bands = Column(String(200), nullable=True)    # JSON 各 CEFR 等级的词数
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ArchivedArticle(Base):
+    """已归档文章的索引行（正文转入冷存储文件，保留 url 供抓取去重）"""
+    __tablename__ = "archived_article"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    article_id = Column(Integer, nullable=True, index=True)  # 原 article.id（删除后可能被新文章复用）
+    url = Column(String(1000), unique=True)
+    title = Column(String(500))
+    source_id = Column(Integer, nullable=True)
+    archive_file = Column(String(300))                 # 所在归档文件名
+    published_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ArticleLSH(Base):
+    """MinHash 签名的 LSH 分桶索引（近重复检测）"""
+    __tablename__ = "article_lsh"
+
+    band = Column(Integer, primary_key=True)
+    bucket = Column(Integer, primary_key=True)         # 该 band 签名片段的哈希
+    article_id = Column(Integer, ForeignKey("article.id"), primary_key=True, index=True)
+
+
+class SentenceLemma(Base):
+    """lemma -> 句子倒排索引（用于"更多例句"）"""
+    __tablename__ = "sentence_lemma"
+
+    lemma = Column(String(100), primary_key=True)
+    sentence_id = Column(Integer, ForeignKey("article_sentence.id"), primary_key=True)
+    article_id = Column(Integer, ForeignKey("article.id"), nullable=False, index=True)
+
+
+class AIJob(Base):
+    """AI 任务队列（摘要、翻译、释义等），由 worker 异步执行"""
+    __tablename__ = "ai_job"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String(50), nullable=False)              # summary / translate / translate_sentences / definition
+    idempotency_key = Column(String(100), nullable=False, unique=True)
+    payload = Column(Text, nullable=False)                 # JSON 参数
+    status = Column(String(20), default="queued")          # queued / running / done / failed
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=5)
+    next_run_at = Column(DateTime, default=datetime.utcnow)
+    locked_until = Column(DateTime, nullable=True)         # running 状态的超时回收时间
+    result = Column(Text, nullable=True)                   # JSON 结果
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_ai_job_status_next_run", "status", "next_run_at"),  # 取待执行任务
+    )
+
+
+class AICallStat(Base):
+    """AI 调用遥测（按时间窗口 × 功能 × 模型聚合）"""
+    __tablename__ = "ai_call_stat"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    window_start = Column(DateTime, nullable=False, index=True)
+    feature = Column(String(50), nullable=False)           # translate / explain / summary / plan / speaking / writing ...
+    model = Column(String(100), nullable=False)
+    calls = Column(Integer, default=0)
+    errors = Column(Integer, default=0)
+    cache_hits = Column(Integer, default=0)                # 合并到其他在途请求的调用
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    latency_ms_total = Column(Float, default=0)
+    latency_hist = Column(Text)                            # JSON 延迟直方图计数（桶见 ai_telemetry）
+    error_classes = Column(Text)                           # JSON {异常类名: 次数}
+
+
+class JobLease(Base):
+    """定时任务租约：多进程部署时保证只有一个实例执行抓取等任务"""
+    __tablename__ = "job_lease"
+
+    name = Column(String(50), primary_key=True)
+    owner = Column(String(200), nullable=False)         # host:pid:随机后缀
+    acquired_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+
+
+class CompressionDict(Base):
+    """文本压缩预置字典（见 models.compression）"""
+    __tablename__ = "compression_dict"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    data = Column(LargeBinary, nullable=False)
+    sample_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
 
 class VocabItem(Base):
     """生词条目"""
@@ -134,6 +265,25 @@ class VocabItem(Base):
 
     reviews = relationship("VocabReview", back_populates="vocab", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_vocab_item_created_id", "created_at", "id"),  # keyset 分页
+    )
+
+
+class DictionaryEntry(Base):
+    """离线词典条目（由开源词表导入，用于免 AI 查词）"""
+    __tablename__ = "dictionary_entry"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    word = Column(String(200), nullable=False, unique=True, index=True)  # 小写词头
+    lemma = Column(String(200))          # 原形（变形词指向原形）
+    pos = Column(String(50))             # 主词性
+    pronunciation = Column(String(200), nullable=True)
+    definition = Column(Text)            # 中文释义
+    definition_en = Column(Text)         # 英文释义
+    frequency_rank = Column(Integer, nullable=True)    # 词频排名（越小越常用）
+    tags = Column(String(200), nullable=True)          # 考试标签 cet4/ielts...
+
 
 class VocabReview(Base):
     """单词复习记录"""
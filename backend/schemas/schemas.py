@@ -51,13 +51,49 @@ class ArticleDetailOut(BaseModel):
     id: int
     title: str
     url: Optional[str] = None
-    content: Optional[str] = None
+    content: Optional[str] = None      # 仅 include_content=true 时返回
     summary: Optional[str] = None
     difficulty: str
     category: Optional[str] = None
     word_count: int
     is_read: bool
-    sentences: list[dict] = []
+    published_at: Optional[datetime] = None
+    source_name: Optional[str] = None
+    sentence_count: int = 0
+    sentences: list[dict] = []         # 首批句子
+    next_index: Optional[int] = None   # 还有更多句子时，下一页的起始序号
+
+    class Config:
+        from_attributes = True
+
+class SentencePageOut(BaseModel):
+    article_id: int
+    sentences: list[dict]
+    next_index: Optional[int] = None
+
+
+class ArticleLexiconOut(BaseModel):
+    article_id: int
+    mastered: list[str]            # 已掌握的 lemma
+    learning: list[str]            # 生词本中学习中的 lemma
+    unknown: list[str]             # 不在生词本中的低频 lemma（按出现次数排序）
+    cefr_bands: dict[str, int]
+    unique_lemmas: int
+
+
+class NewsSourceOut(BaseModel):
+    id: int
+    name: str
+    url: str
+    category: Optional[str] = None
+    is_active: bool
+    health: Optional[str] = None            # ok / degraded / failing
+    failure_count: int = 0
+    last_error: Optional[str] = None
+    fetch_interval_minutes: Optional[int] = None
+    last_fetched: Optional[datetime] = None
+    last_success_at: Optional[datetime] = None
+    next_fetch_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -86,6 +122,7 @@ class VocabMarkRequest(BaseModel):
     definition_en: Optional[str] = None
     example_sentence: Optional[str] = None
     article_id: Optional[int] = None
+    use_context: bool = False  # 跳过离线词典，由 AI 给出语境释义
 
 class VocabItemOut(BaseModel):
     id: int
@@ -105,6 +142,15 @@ class VocabItemOut(BaseModel):
     class Config:
         from_attributes = True
 
+class ExampleSentenceOut(BaseModel):
+    sentence_id: int
+    article_id: int
+    article_title: Optional[str] = None
+    difficulty: Optional[str] = None
+    text_en: str
+    text_zh: Optional[str] = None
+    score: float
+
 class VocabReviewRequest(BaseModel):
     quality: int  # 0-5
 
@@ -155,6 +201,59 @@ class WeeklyStatsOut(BaseModel):
     daily_breakdown: list[dict]
 
 
+class AIFeatureStatsOut(BaseModel):
+    models: list[str]
+    calls: int
+    errors: int
+    error_classes: dict[str, int]
+    cache_hits: int                # 合并到在途请求、未单独调用上游的次数
+    prompt_tokens: int
+    completion_tokens: int
+    avg_ms: Optional[float] = None
+    p50_ms: Optional[float] = None
+    p95_ms: Optional[float] = None
+    p99_ms: Optional[float] = None
+
+class AIMetricsOut(BaseModel):
+    hours: int
+    features: dict[str, AIFeatureStatsOut]
+
+
+# ─── Search ───
+class SearchHitOut(BaseModel):
+    type: str                      # articles / sentences / vocab
+    id: int
+    article_id: Optional[int] = None
+    title: Optional[str] = None
+    difficulty: Optional[str] = None
+    snippet: str                   # 命中片段，关键词以 <mark> 包裹
+    score: float
+
+class SearchResultOut(BaseModel):
+    query: str
+    scope: str
+    total: int
+    items: list[SearchHitOut]
+
+
+# ─── Jobs ───
+class JobCreateRequest(BaseModel):
+    kind: str                      # summary / translate / translate_sentences / definition
+    payload: dict
+    idempotency_key: Optional[str] = None
+
+class JobOut(BaseModel):
+    id: int
+    kind: str
+    status: str                    # queued / running / done / failed
+    attempts: int
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    next_run_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
 # ─── Settings ───
 class SettingsUpdate(BaseModel):
     goal: Optional[str] = None
@@ -1,22 +1,258 @@
 """AI 服务统一封装 —— 支持对话、翻译、写作批改、讲解"""
+import hashlib
 import json
-from openai import OpenAI
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, as_completed
+from typing import Callable
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+
 from config import settings
+from services import ai_telemetry, structured_output
+from services.lazy import lazy_module
+from services.structured_output import StructuredOutputError
+
+# SDK 导入约 0.5 秒，推迟到第一次调用
+openai = lazy_module("openai")
+
+
+class TruncatedOutputError(RuntimeError):
+    """回复达到 max_tokens 被截断（finish_reason == "length"）"""
+
+
+class SingleFlight:
+    """合并相同 key 的并发调用：只有第一个调用者真正执行，其余等待并共享结果（或异常）"""
+
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error: BaseException | None = None
+
+    def __init__(self):
+        self._calls: dict[str, SingleFlight._Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], str]) -> tuple[str, bool]:
+        """返回 (结果, 是否共享了其他调用者的结果)"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = SingleFlight._Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # 先移除再唤醒：之后到达的调用发起新请求，不会拿到旧结果
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+
+_flight = SingleFlight()
+
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ai-hedge")
+
+# 服务商拒绝 response_format 后在本进程内不再发送
+_json_mode_supported = True
+
+
+def _get_client() -> "openai.OpenAI":
+    # SDK 默认失败重试 2 次（带退避），会推迟降级与对冲；重试交给 fallback 与任务队列
+    return openai.OpenAI(api_key=settings.ai_api_key, base_url=settings.ai_base_url, max_retries=0)
+
+
+def _chat(messages: list[dict], temperature: float | None = None, feature: str = "chat") -> str:
+    """通用聊天补全
+
+    按 feature 查路由表（config.DEFAULT_AI_ROUTES）选择模型与参数；主模型超时、
+    限流或 5xx 时降级到 fallback 模型，配置 hedge_after 的交互路径在主模型
+    迟迟未返回时并发请求 fallback，取先返回者；json_mode 路由请求 JSON 输出。
+    相同请求的并发调用合并为一次上游调用；每次上游调用按 feature 记录遥测。
+    """
+    route = settings.route(feature)
+    primary = settings.resolve_model(route.model)
+    fallback = settings.resolve_model(route.fallback)
+    if fallback == primary:
+        fallback = None
+    temperature = route.temperature if temperature is None else temperature
+    json_mode = route.json_mode and settings.ai_json_mode and _json_mode_supported
+
+    key = hashlib.sha256(json.dumps(
+        [feature, primary, fallback, temperature, route.max_tokens, json_mode, messages],
+        ensure_ascii=False, sort_keys=True,
+    ).encode("utf-8")).hexdigest()
+
+    def attempt(model: str) -> Callable[[], str]:
+        return lambda: _complete(feature, model, messages, temperature, route.max_tokens, route.timeout, json_mode)
+
+    def call() -> str:
+        if not fallback:
+            return attempt(primary)()
+        if route.hedge_after:
+            return _hedged(attempt(primary), attempt(fallback), route.hedge_after)
+        try:
+            return attempt(primary)()
+        except Exception as e:
+            if not _should_fallback(e):
+                raise
+            print(f"[AI] {feature} 主模型 {primary} 失败（{type(e).__name__}），降级到 {fallback}")
+            return attempt(fallback)()
+
+    start = time.perf_counter()
+    content, shared = _flight.do(key, call)
+    if shared:
+        ai_telemetry.record(feature, primary, (time.perf_counter() - start) * 1000, cache_hit=True)
+    return content
+
+
+def _complete(feature: str, model: str, messages: list[dict], temperature: float,
+              max_tokens: int | None, timeout: float, json_mode: bool = False) -> str:
+    """单次上游调用，记录遥测"""
+    global _json_mode_supported
+    params = {"model": model, "messages": messages, "temperature": temperature, "timeout": timeout}
+    if max_tokens:
+        params["max_tokens"] = max_tokens
+    if json_mode and _json_mode_supported:
+        params["response_format"] = {"type": "json_object"}
+
+    start = time.perf_counter()
+    try:
+        response = _get_client().chat.completions.create(**params)
+    except Exception as e:
+        ai_telemetry.record(feature, model, (time.perf_counter() - start) * 1000, error=type(e).__name__)
+        if "response_format" in params and _rejects_json_mode(e):
+            print(f"[AI] 模型 {model} 不支持 response_format，改用提示词约束 JSON 输出")
+            _json_mode_supported = False
+            return _complete(feature, model, messages, temperature, max_tokens, timeout)
+        raise
+
+    usage = getattr(response, "usage", None)
+    # 截断的回复可能被宽松的 JSON 修复当作完整结果接受，按失败处理
+    truncated = getattr(response.choices[0], "finish_reason", None) == "length"
+    ai_telemetry.record(
+        feature, model, (time.perf_counter() - start) * 1000,
+        prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+        completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+        error=TruncatedOutputError.__name__ if truncated else None,
+    )
+    if truncated:
+        raise TruncatedOutputError(f"{feature} 回复超过 max_tokens={max_tokens} 被截断")
+    return response.choices[0].message.content or ""
 
 
-def _get_client() -> OpenAI:
-    return OpenAI(api_key=settings.ai_api_key, base_url=settings.ai_base_url)
+def _hedged(primary: Callable[[], str], fallback: Callable[[], str], hedge_after: float) -> str:
+    """先请求主模型，hedge_after 秒未返回则并发请求 fallback，取先成功者"""
+    first = _executor.submit(primary)
+    try:
+        return first.result(timeout=hedge_after)
+    except FutureTimeout:
+        pass
+    except Exception as e:
+        if not _should_fallback(e):
+            raise
+        return fallback()
+
+    second = _executor.submit(fallback)
+    error = None
+    for future in as_completed([first, second]):
+        try:
+            return future.result()
+        except Exception as e:
+            error = e
+    raise error
+
+
+def _should_fallback(error: Exception) -> bool:
+    """超时、连接错误、限流与服务端错误可降级；请求本身的错误（4xx）不降级"""
+    if isinstance(error, (TimeoutError, openai.APITimeoutError, openai.APIConnectionError, openai.RateLimitError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def _rejects_json_mode(error: Exception) -> bool:
+    return isinstance(error, openai.BadRequestError) and "response_format" in str(error)
+
+
+def _chat_json(messages: list[dict], feature: str, schema: type[BaseModel]) -> tuple[dict | None, str]:
+    """请求 JSON 输出并按 schema 校验，返回 (校验后的 dict 或 None, 原始输出)
+
+    截断、代码块包裹、多余逗号等由 structured_output 修复，仍无法解析或
+    不符合 schema 时返回 None，由调用方决定降级结果。
+    """
+    result = _chat(messages, feature=feature)
+    try:
+        return structured_output.parse(result, schema), result
+    except StructuredOutputError as e:
+        print(f"[AI] {feature} 输出不符合预期格式: {e}")
+        return None, result
 
 
-def _chat(messages: list[dict], temperature: float = 0.7) -> str:
-    """通用聊天补全"""
-    client = _get_client()
-    response = client.chat.completions.create(
-        model=settings.ai_model,
-        messages=messages,
-        temperature=temperature,
-    )
-    return response.choices[0].message.content or ""
+# ─── 各功能输出 schema ───
+
+class _Translation(BaseModel):
+    translation: str
+    explanation: str = ""
+
+
+class _WordDefinition(BaseModel):
+    word: str = ""
+    lemma: str = ""
+    pos: str = ""
+    definition: str = ""
+    definition_en: str = ""
+    pronunciation: str = ""
+
+
+class _PlanTask(BaseModel):
+    title: str
+    task_type: str = "reading"
+    duration_minutes: int = Field(default=10, ge=1)
+
+
+class _Plan(BaseModel):
+    tasks: list[_PlanTask] = Field(min_length=1)
+
+    @model_validator(mode="before")
+    @classmethod
+    def _accept_bare_list(cls, value):
+        return {"tasks": value} if isinstance(value, list) else value
+
+
+class _SpeakingReply(BaseModel):
+    reply: str
+    correction: str | None = None
+    suggestion: str | None = None
+
+
+class _WritingEvaluation(BaseModel):
+    score: float | None = Field(default=None, ge=0, le=100)
+    grammar_issues: str = ""
+    expression_suggestions: str = ""
+    structure_feedback: str = ""
+    overall_comment: str = ""
+    improved_version: str = ""
+
+    @field_validator("grammar_issues", "expression_suggestions", "structure_feedback", mode="before")
+    @classmethod
+    def _list_to_text(cls, value):
+        # 模型常以数组返回问题列表，按 JSON 文本存储
+        if isinstance(value, (list, dict)):
+            return json.dumps(value, ensure_ascii=False)
+        return "" if value is None else value
 
 
 def translate_text(text: str, context: str = "") -> dict:
@@ -27,11 +263,8 @@ def translate_text(text: str, context: str = "") -> dict:
 上下文: {context}
 待翻译文本: {text}"""
 
-    result = _chat([{"role": "user", "content": prompt}], temperature=0.3)
-    try:
-        return json.loads(result.strip().removeprefix("```json").removesuffix("```").strip())
-    except json.JSONDecodeError:
-        return {"translation": result, "explanation": ""}
+    parsed, result = _chat_json([{"role": "user", "content": prompt}], "translate", _Translation)
+    return parsed or {"translation": result, "explanation": ""}
 
 
 def explain_text(text: str, context: str = "") -> str:
@@ -42,11 +275,11 @@ def explain_text(text: str, context: str = "") -> str:
 上下文: {context}
 待讲解文本: {text}"""
 
-    return _chat([{"role": "user", "content": prompt}], temperature=0.5)
+    return _chat([{"role": "user", "content": prompt}], feature="explain")
 
 
-def translate_sentences(sentences: list[str]) -> list[str]:
-    """批量翻译句子列表"""
+def translate_sentences(sentences: list[str]) -> list[str | None]:
+    """批量翻译句子列表；回复缺行或被截断时，未返回的句子为 None"""
     if not sentences:
         return []
 
@@ -55,13 +288,11 @@ def translate_sentences(sentences: list[str]) -> list[str]:
 
 {chr(10).join(f'{i+1}. {s}' for i, s in enumerate(sentences))}"""
 
-    result = _chat([{"role": "user", "content": prompt}], temperature=0.3)
+    result = _chat([{"role": "user", "content": prompt}], feature="translate_sentences")
     translations = [line.strip() for line in result.strip().split("\n") if line.strip()]
 
-    # 补齐缺失翻译
-    while len(translations) < len(sentences):
-        translations.append("")
-    return translations[:len(sentences)]
+    # 缺失的翻译以 None 补齐，由调用方决定是否重试
+    return (translations + [None] * len(sentences))[:len(sentences)]
 
 
 def get_word_definition(word: str, sentence: str = "") -> dict:
@@ -79,14 +310,15 @@ def get_word_definition(word: str, sentence: str = "") -> dict:
 单词: {word}
 来源句子: {sentence}"""
 
-    result = _chat([{"role": "user", "content": prompt}], temperature=0.3)
-    try:
-        return json.loads(result.strip().removeprefix("```json").removesuffix("```").strip())
-    except json.JSONDecodeError:
+    parsed, _ = _chat_json([{"role": "user", "content": prompt}], "definition", _WordDefinition)
+    if parsed is None:
         return {
             "word": word, "lemma": word, "pos": "",
             "definition": "", "definition_en": "", "pronunciation": ""
         }
+    parsed["word"] = parsed["word"] or word
+    parsed["lemma"] = parsed["lemma"] or word
+    return parsed
 
 
 def generate_summary(text: str) -> str:
@@ -94,13 +326,13 @@ def generate_summary(text: str) -> str:
     prompt = f"""请用1-2句中文概括以下英文文章的核心内容：
 
 {text[:3000]}"""
-    return _chat([{"role": "user", "content": prompt}], temperature=0.5)
+    return _chat([{"role": "user", "content": prompt}], feature="summary")
 
 
 def generate_plan_tasks(goal: str, daily_minutes: int) -> list[dict]:
     """根据学习目标生成今日任务列表"""
     prompt = f"""作为英语学习规划师，为以下学习者生成今日学习任务列表。
-返回 JSON 数组格式: [{{"title": "任务名称", "task_type": "类型", "duration_minutes": 分钟数}}]
+返回 JSON 格式: {{"tasks": [{{"title": "任务名称", "task_type": "类型", "duration_minutes": 分钟数}}]}}
 
 task_type 可选: reading, vocab_review, speaking, writing, listening, grammar
 
@@ -113,16 +345,15 @@ task_type 可选: reading, vocab_review, speaking, writing, listening, grammar
 - 包含至少1个阅读任务和1个复习任务
 - 任务名称用中文"""
 
-    result = _chat([{"role": "user", "content": prompt}], temperature=0.7)
-    try:
-        return json.loads(result.strip().removeprefix("```json").removesuffix("```").strip())
-    except json.JSONDecodeError:
-        # 返回默认计划
-        return [
-            {"title": "阅读一篇外刊文章", "task_type": "reading", "duration_minutes": 15},
-            {"title": "复习今日生词", "task_type": "vocab_review", "duration_minutes": 10},
-            {"title": "口语对话练习", "task_type": "speaking", "duration_minutes": 5},
-        ]
+    parsed, _ = _chat_json([{"role": "user", "content": prompt}], "plan", _Plan)
+    if parsed is not None:
+        return parsed["tasks"]
+    # 返回默认计划
+    return [
+        {"title": "阅读一篇外刊文章", "task_type": "reading", "duration_minutes": 15},
+        {"title": "复习今日生词", "task_type": "vocab_review", "duration_minutes": 10},
+        {"title": "口语对话练习", "task_type": "speaking", "duration_minutes": 5},
+    ]
 
 
 def speaking_reply(conversation: list[dict], scenario: str = "daily") -> dict:
@@ -139,11 +370,8 @@ def speaking_reply(conversation: list[dict], scenario: str = "daily") -> dict:
 }}"""
 
     messages = [{"role": "system", "content": system}] + conversation
-    result = _chat(messages, temperature=0.8)
-    try:
-        return json.loads(result.strip().removeprefix("```json").removesuffix("```").strip())
-    except json.JSONDecodeError:
-        return {"reply": result, "correction": None, "suggestion": None}
+    parsed, result = _chat_json(messages, "speaking", _SpeakingReply)
+    return parsed or {"reply": result, "correction": None, "suggestion": None}
 
 
 def evaluate_writing(title: str, content: str) -> dict:
@@ -162,15 +390,12 @@ def evaluate_writing(title: str, content: str) -> dict:
 作文内容:
 {content}"""
 
-    result = _chat([{"role": "user", "content": prompt}], temperature=0.5)
-    try:
-        return json.loads(result.strip().removeprefix("```json").removesuffix("```").strip())
-    except json.JSONDecodeError:
-        return {
-            "score": None,
-            "grammar_issues": result,
-            "expression_suggestions": "",
-            "structure_feedback": "",
-            "overall_comment": "",
-            "improved_version": "",
-        }
+    parsed, result = _chat_json([{"role": "user", "content": prompt}], "writing", _WritingEvaluation)
+    return parsed or {
+        "score": None,
+        "grammar_issues": result,
+        "expression_suggestions": "",
+        "structure_feedback": "",
+        "overall_comment": "",
+        "improved_version": "",
+    }
@@ -0,0 +1,229 @@
+"""AI 调用遥测 —— 每次调用的 token、延迟、合并命中与错误类型
+
+调用数据先在内存中按 (功能, 模型) 聚合，由后台定时线程每 FLUSH_INTERVAL 秒
+写入 ai_call_stat 表（每个窗口一行；写库失败时聚合并回内存，下次重试）。延迟以固定分桶直方图记录，
+不同窗口、进程的直方图可直接相加，因此能跨窗口计算 p50/p95/p99。
+"""
+import json
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from models.tables import AICallStat
+
+FLUSH_INTERVAL = 60  # 秒
+
+# 延迟直方图桶上界（毫秒），最后一桶为溢出桶
+LATENCY_BUCKETS = (
+    50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000, 7500, 10000, 15000, 20000, 30000, 60000,
+)
+
+
+class _Aggregate:
+    __slots__ = ("calls", "errors", "cache_hits", "prompt_tokens", "completion_tokens",
+                 "latency_ms_total", "hist", "error_classes")
+
+    def __init__(self):
+        self.calls = self.errors = self.cache_hits = 0
+        self.prompt_tokens = self.completion_tokens = 0
+        self.latency_ms_total = 0.0
+        self.hist = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.error_classes: Counter = Counter()
+
+    def merge(self, other: "_Aggregate"):
+        self.calls += other.calls
+        self.errors += other.errors
+        self.cache_hits += other.cache_hits
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.latency_ms_total += other.latency_ms_total
+        for i, n in enumerate(other.hist):
+            self.hist[i] += n
+        self.error_classes.update(other.error_classes)
+
+
+_lock = threading.Lock()
+_pending: dict[tuple[str, str], _Aggregate] = {}
+_window_start = datetime.utcnow()
+_flusher: threading.Thread | None = None
+_flusher_stop = threading.Event()
+
+
+def record(
+    feature: str,
+    model: str,
+    latency_ms: float,
+    prompt_tokens: int = 0,
+    completion_tokens: int = 0,
+    cache_hit: bool = False,
+    error: str | None = None,
+):
+    """记录一次调用（首次调用时启动定时写库线程）"""
+    with _lock:
+        agg = _pending.setdefault((feature, model), _Aggregate())
+        agg.calls += 1
+        agg.cache_hits += int(cache_hit)
+        agg.prompt_tokens += prompt_tokens or 0
+        agg.completion_tokens += completion_tokens or 0
+        agg.latency_ms_total += latency_ms
+        agg.hist[_bucket(latency_ms)] += 1
+        if error:
+            agg.errors += 1
+            agg.error_classes[error] += 1
+
+        if _flusher is None:
+            _start_flusher()
+
+
+def flush(db: Session) -> int:
+    """把内存中的聚合写入数据库，返回写入行数；失败时聚合并回内存后抛出"""
+    global _pending, _window_start
+    with _lock:
+        pending, window_start = _pending, _window_start
+        _pending, _window_start = {}, datetime.utcnow()
+    if not pending:
+        return 0
+
+    try:
+        _write(db, window_start, pending)
+    except Exception:
+        db.rollback()
+        with _lock:
+            for key, agg in pending.items():
+                _pending.setdefault(key, _Aggregate()).merge(agg)
+            _window_start = window_start
+        raise
+    return len(pending)
+
+
+def _write(db: Session, window_start: datetime, pending: dict[tuple[str, str], _Aggregate]):
+    db.add_all([
+        AICallStat(
+            window_start=window_start,
+            feature=feature,
+            model=model,
+            calls=agg.calls,
+            errors=agg.errors,
+            cache_hits=agg.cache_hits,
+            prompt_tokens=agg.prompt_tokens,
+            completion_tokens=agg.completion_tokens,
+            latency_ms_total=agg.latency_ms_total,
+            latency_hist=json.dumps(agg.hist),
+            error_classes=json.dumps(dict(agg.error_classes)),
+        )
+        for (feature, model), agg in pending.items()
+    ])
+    db.commit()
+
+
+def summarize(db: Session, hours: int = 24) -> dict:
+    """各功能的调用量、token 与延迟分位数（含尚未写库的内存数据）"""
+    since = datetime.utcnow() - timedelta(hours=hours)
+    merged: dict[str, _Aggregate] = {}
+    models: dict[str, set] = {}
+
+    def merge(feature, model, calls, errors, cache_hits, prompt, completion, latency_total, hist, error_classes):
+        agg = merged.setdefault(feature, _Aggregate())
+        agg.calls += calls
+        agg.errors += errors
+        agg.cache_hits += cache_hits
+        agg.prompt_tokens += prompt
+        agg.completion_tokens += completion
+        agg.latency_ms_total += latency_total
+        for i, n in enumerate(hist[:len(agg.hist)]):
+            agg.hist[i] += n
+        agg.error_classes.update(error_classes)
+        models.setdefault(feature, set()).add(model)
+
+    for row in db.query(AICallStat).filter(AICallStat.window_start >= since).all():
+        merge(row.feature, row.model, row.calls or 0, row.errors or 0, row.cache_hits or 0,
+              row.prompt_tokens or 0, row.completion_tokens or 0, row.latency_ms_total or 0,
+              json.loads(row.latency_hist or "[]"), json.loads(row.error_classes or "{}"))
+    with _lock:
+        for (feature, model), agg in _pending.items():
+            merge(feature, model, agg.calls, agg.errors, agg.cache_hits, agg.prompt_tokens,
+                  agg.completion_tokens, agg.latency_ms_total, list(agg.hist), Counter(agg.error_classes))
+
+    features = {}
+    for feature, agg in sorted(merged.items()):
+        features[feature] = {
+            "models": sorted(models[feature]),
+            "calls": agg.calls,
+            "errors": agg.errors,
+            "error_classes": dict(agg.error_classes),
+            "cache_hits": agg.cache_hits,
+            "prompt_tokens": agg.prompt_tokens,
+            "completion_tokens": agg.completion_tokens,
+            "avg_ms": round(agg.latency_ms_total / agg.calls, 1) if agg.calls else None,
+            "p50_ms": percentile(agg.hist, 0.50),
+            "p95_ms": percentile(agg.hist, 0.95),
+            "p99_ms": percentile(agg.hist, 0.99),
+        }
+    return {"hours": hours, "features": features}
+
+
+def percentile(hist: list[int], q: float) -> float | None:
+    """由直方图估计分位数：在命中桶内线性插值"""
+    total = sum(hist)
+    if not total:
+        return None
+    target = q * total
+    seen = 0
+    for i, n in enumerate(hist):
+        if n and seen + n >= target:
+            low = LATENCY_BUCKETS[i - 1] if i > 0 else 0
+            high = LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else LATENCY_BUCKETS[-1] * 2
+            return round(low + (high - low) * (target - seen) / n, 1)
+        seen += n
+    return float(LATENCY_BUCKETS[-1])
+
+
+def _bucket(latency_ms: float) -> int:
+    for i, bound in enumerate(LATENCY_BUCKETS):
+        if latency_ms <= bound:
+            return i
+    return len(LATENCY_BUCKETS)
+
+
+def flush_now():
+    """使用独立会话写库"""
+    from models.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        flush(db)
+    except Exception as e:
+        print(f"[Telemetry] 写入失败: {e}")
+    finally:
+        db.close()
+
+
+def shutdown():
+    """停止定时写库线程并写入剩余数据（进程退出前调用）"""
+    stop_flusher()
+    flush_now()
+
+
+def stop_flusher():
+    """停止定时写库线程并等待其退出；之后的 record() 会重新启动"""
+    global _flusher
+    with _lock:
+        thread, _flusher = _flusher, None
+        _flusher_stop.set()
+    if thread is not None:
+        thread.join()
+
+
+def _start_flusher():
+    """调用方持有 _lock"""
+    global _flusher, _flusher_stop
+    _flusher_stop = threading.Event()
+    _flusher = threading.Thread(target=_flush_periodically, args=(_flusher_stop,), name="telemetry-flush", daemon=True)
+    _flusher.start()
+
+
+def _flush_periodically(stop: threading.Event):
+    while not stop.wait(FLUSH_INTERVAL):
+        flush_now()
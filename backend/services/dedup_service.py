@@ -0,0 +1,169 @@
+"""近重复文章检测 —— 词级 shingle + MinHash + LSH 分桶
+
+通讯社稿件常以不同 URL 在多个源出现，正文几乎相同。入库时为正文计算
+MinHash 签名，按 band 分桶写入 article_lsh；新文章只需查询同桶的近期文章，
+再以签名估计 Jaccard 相似度确认。命中者不拆句、不建索引、不做 AI 处理，
+仅保存一条指向原文（canonical_id）的记录。
+
+历史文章可用以下命令回填签名::
+
+    python -m services.dedup_service rebuild
+"""
+import argparse
+import hashlib
+import re
+import struct
+import zlib
+from datetime import datetime, timedelta
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+
+from models.tables import Article, ArticleLSH
+
+# 签名长度 = BANDS × ROWS；阈值约 (1/BANDS)^(1/ROWS) ≈ 0.5 的候选进入精确比对
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+# 估计 Jaccard 相似度不低于该值视为重复
+DUPLICATE_THRESHOLD = 0.7
+# 只与该天数内发布的文章比对
+WINDOW_DAYS = 14
+SHINGLE_SIZE = 5
+
+_PRIME = (1 << 61) - 1
+_MASK = 0xFFFFFFFF
+_SIGNATURE = struct.Struct(f"<{NUM_PERM}I")
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _permutations() -> list[tuple[int, int]]:
+    """固定种子的 (a, b) 哈希参数，保证签名跨进程稳定"""
+    params = []
+    for i in range(NUM_PERM):
+        digest = hashlib.blake2b(f"minhash-{i}".encode(), digest_size=16).digest()
+        a = int.from_bytes(digest[:8], "little") % (_PRIME - 1) + 1
+        b = int.from_bytes(digest[8:], "little") % _PRIME
+        params.append((a, b))
+    return params
+
+
+_PERMS = _permutations()
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set[int]:
+    """小写词序列的 size 词 shingle，哈希为 32 位整数"""
+    words = _WORD.findall(text.lower())
+    if len(words) < size:
+        return {zlib.crc32(" ".join(words).encode())} if words else set()
+    return {zlib.crc32(" ".join(words[i:i + size]).encode()) for i in range(len(words) - size + 1)}
+
+
+def minhash(text: str) -> bytes | None:
+    """正文的 MinHash 签名（NUM_PERM 个 uint32 打包），无有效词时返回 None"""
+    hashes = shingles(text)
+    if not hashes:
+        return None
+    signature = [
+        min(((a * h + b) % _PRIME) & _MASK for h in hashes)
+        for a, b in _PERMS
+    ]
+    return _SIGNATURE.pack(*signature)
+
+
+def similarity(sig_a: bytes, sig_b: bytes) -> float:
+    """两个签名的 Jaccard 相似度估计"""
+    a, b = _SIGNATURE.unpack(sig_a), _SIGNATURE.unpack(sig_b)
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def band_buckets(signature: bytes) -> list[tuple[int, int]]:
+    """签名切分为 BANDS 段，每段哈希为 (band, bucket)"""
+    width = ROWS * 4
+    return [
+        (band, int.from_bytes(
+            hashlib.blake2b(signature[band * width:(band + 1) * width], digest_size=8).digest(),
+            "little", signed=True,
+        ))
+        for band in range(BANDS)
+    ]
+
+
+def find_duplicate(db: Session, signature: bytes) -> int | None:
+    """在近期文章中查找近重复原文，返回其 id"""
+    buckets = band_buckets(signature)
+    cutoff = datetime.utcnow() - timedelta(days=WINDOW_DAYS)
+    candidates = (
+        db.query(Article.id, Article.fingerprint)
+        .join(ArticleLSH, ArticleLSH.article_id == Article.id)
+        .filter(
+            tuple_(ArticleLSH.band, ArticleLSH.bucket).in_(buckets),
+            Article.canonical_id.is_(None),
+            Article.published_at >= cutoff,
+        )
+        .distinct()
+        .all()
+    )
+    best_id, best_score = None, DUPLICATE_THRESHOLD
+    for article_id, fingerprint in candidates:
+        if not fingerprint:
+            continue
+        score = similarity(signature, fingerprint)
+        if score >= best_score:
+            best_id, best_score = article_id, score
+    return best_id
+
+
+def index_fingerprint(db: Session, article: Article, signature: bytes):
+    """保存签名并写入 LSH 分桶（需已 flush 获得 article.id）"""
+    article.fingerprint = signature
+    db.add_all([
+        ArticleLSH(band=band, bucket=bucket, article_id=article.id)
+        for band, bucket in band_buckets(signature)
+    ])
+
+
+def rebuild_fingerprints(db: Session, batch_size: int = 200) -> int:
+    """为缺少签名的原文文章回填签名与分桶"""
+    from services.storage_service import article_text
+
+    total = 0
+    last_id = 0
+    while True:
+        batch = (
+            db.query(Article)
+            .filter(Article.id > last_id, Article.canonical_id.is_(None), Article.fingerprint.is_(None))
+            .order_by(Article.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+        for article in batch:
+            signature = minhash(article_text(db, article.id))
+            if signature:
+                index_fingerprint(db, article, signature)
+                total += 1
+        last_id = batch[-1].id
+        db.commit()
+    return total
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="近重复检测索引管理")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("rebuild", help="为缺少签名的文章回填 MinHash 签名")
+    parser.parse_args(argv)
+
+    from models.database import SessionLocal, init_db
+    init_db()
+    db = SessionLocal()
+    try:
+        count = rebuild_fingerprints(db)
+        print(f"[Dedup] 已为 {count} 篇文章生成签名")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
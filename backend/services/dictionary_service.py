@@ -0,0 +1,240 @@
+"""离线词典服务 —— 常用词本地查询，AI 只处理未命中和语境释义
+
+词库从开源词表导入（默认兼容 ECDICT 的 CSV 格式）::
+
+    python -m services.dictionary_service import ecdict.csv --max-rank 30000
+"""
+import argparse
+import csv
+import re
+import time
+import weakref
+from collections import OrderedDict
+
+from sqlalchemy import delete, insert
+from sqlalchemy.engine import Dialect
+from sqlalchemy.orm import Session
+
+from models.tables import DictionaryEntry
+
+# 进程内 LRU 缓存：word -> (过期时间, 词条 dict)，按引擎隔离（以引擎的 Dialect 实例为键），
+# 同一进程打开的多个数据库互不干扰。词库可能由另一个进程重新导入：
+# 只缓存命中，且命中在 _CACHE_TTL 秒后过期，导入后的释义最迟在该时间后生效
+_CACHE_SIZE = 50000
+_CACHE_TTL = 600
+_caches: "weakref.WeakKeyDictionary[Dialect, OrderedDict[str, tuple[float, dict]]]" = weakref.WeakKeyDictionary()
+
+# 释义行前缀 -> 标准词性
+_POS_PREFIXES = {
+    "n": "noun", "v": "verb", "vt": "verb", "vi": "verb", "aux": "verb",
+    "a": "adj", "adj": "adj", "ad": "adv", "adv": "adv",
+    "prep": "prep", "conj": "conj", "pron": "pron",
+    "art": "det", "det": "det", "num": "num", "int": "interj", "interj": "interj",
+}
+
+
+def lookup_word(db: Session, word: str) -> dict | None:
+    """查询单词，返回与 get_word_definition 相同结构的 dict；未收录返回 None"""
+    key = _normalize(word)
+    if not key:
+        return None
+
+    cache = _cache_for(db)
+    cached = cache.get(key)
+    if cached is not None:
+        expires_at, entry = cached
+        if expires_at > time.monotonic():
+            cache.move_to_end(key)
+            return {**entry, "word": word}
+        del cache[key]
+
+    entry = None
+    for candidate in [key] + _inflection_candidates(key):
+        row = db.query(DictionaryEntry).filter(DictionaryEntry.word == candidate).first()
+        if row and (row.definition or row.definition_en):
+            entry = _entry_to_dict(row)
+            if candidate != key:
+                # 变形词：原形即命中的词头
+                entry["lemma"] = row.lemma or row.word
+            break
+
+    if entry is None:
+        return None
+    cache[key] = (time.monotonic() + _CACHE_TTL, entry)
+    if len(cache) > _CACHE_SIZE:
+        cache.popitem(last=False)
+    return {**entry, "word": word}
+
+
+def _cache_for(db: Session) -> "OrderedDict[str, tuple[float, dict]]":
+    dialect = db.get_bind().dialect
+    cache = _caches.get(dialect)
+    if cache is None:
+        cache = _caches[dialect] = OrderedDict()
+    return cache
+
+
+def frequency_ranks(db: Session, words: list[str]) -> dict[str, int]:
+    """批量查询词频排名，未收录或无排名的词不在返回结果中"""
+    ranks: dict[str, int] = {}
+    unique = list(set(words))
+    for i in range(0, len(unique), 500):
+        rows = (
+            db.query(DictionaryEntry.word, DictionaryEntry.frequency_rank)
+            .filter(DictionaryEntry.word.in_(unique[i:i + 500]), DictionaryEntry.frequency_rank.isnot(None))
+            .all()
+        )
+        ranks.update({w: r for w, r in rows})
+    return ranks
+
+
+def has_entries(db: Session) -> bool:
+    """词库是否已导入"""
+    return db.query(DictionaryEntry.id).first() is not None
+
+
+def import_wordlist(db: Session, path: str, max_rank: int | None = None, batch_size: int = 5000) -> int:
+    """从 CSV 词表导入词典（全量替换），返回导入条数
+
+    max_rank: 仅保留词频排名在此范围内的词（无排名的词会被跳过），用于控制词库体积
+    """
+    rows: dict[str, dict] = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for raw in csv.DictReader(f):
+            row = _parse_row(raw)
+            if not row:
+                continue
+            if max_rank is not None and (row["frequency_rank"] is None or row["frequency_rank"] > max_rank):
+                continue
+            # 同一小写词头只保留一条，优先原本就是小写的词条
+            word = row["word"]
+            if word in rows and raw.get("word", "") != word:
+                continue
+            rows[word] = row
+
+    db.execute(delete(DictionaryEntry))
+    batch = list(rows.values())
+    for i in range(0, len(batch), batch_size):
+        db.execute(insert(DictionaryEntry), batch[i:i + batch_size])
+    db.commit()
+    _cache_for(db).clear()
+    return len(batch)
+
+
+def _parse_row(raw: dict) -> dict | None:
+    """将 ECDICT 风格的一行转换为 DictionaryEntry 字段"""
+    word = _normalize(raw.get("word", ""))
+    if not word or " " in word:
+        return None
+
+    translation = _unescape_lines(raw.get("translation", ""))
+    definition_en = _unescape_lines(raw.get("definition", ""))
+    if not translation and not definition_en:
+        return None
+
+    phonetic = (raw.get("phonetic") or "").strip()
+    return {
+        "word": word,
+        "lemma": _lemma_from_exchange(raw.get("exchange", "")) or word,
+        "pos": _main_pos(translation or definition_en),
+        "pronunciation": f"/{phonetic}/" if phonetic else "",
+        "definition": translation,
+        "definition_en": definition_en,
+        "frequency_rank": _parse_rank(raw.get("frq")) or _parse_rank(raw.get("bnc")),
+        "tags": (raw.get("tag") or "").strip() or None,
+    }
+
+
+def _entry_to_dict(row: DictionaryEntry) -> dict:
+    return {
+        "word": row.word,
+        "lemma": row.lemma or row.word,
+        "pos": row.pos or "",
+        "definition": row.definition or "",
+        "definition_en": row.definition_en or "",
+        "pronunciation": row.pronunciation or "",
+    }
+
+
+def _normalize(word: str) -> str:
+    return word.strip().strip(".,!?;:\"'()[]").lower()
+
+
+def _unescape_lines(text: str) -> str:
+    """ECDICT 多行字段用字面量 \\n 分隔"""
+    lines = (text or "").replace("\\r", "").replace("\\n", "\n").splitlines()
+    return "\n".join(line.strip() for line in lines if line.strip())
+
+
+def _main_pos(definition: str) -> str:
+    """从首行释义的词性前缀推断主词性，如 "vt. 感知" -> verb"""
+    match = re.match(r"([a-z]+)\.", definition.strip())
+    if not match:
+        return ""
+    return _POS_PREFIXES.get(match.group(1), "")
+
+
+def _lemma_from_exchange(exchange: str) -> str:
+    """exchange 字段中 "0:" 指向原形，如 "0:perceive/1:p" """
+    for part in (exchange or "").split("/"):
+        if part.startswith("0:"):
+            return part[2:].strip().lower()
+    return ""
+
+
+def _parse_rank(value) -> int | None:
+    try:
+        rank = int(value)
+    except (TypeError, ValueError):
+        return None
+    return rank if rank > 0 else None
+
+
+def _inflection_candidates(word: str) -> list[str]:
+    """词库未直接收录时尝试的原形候选（按可能性排序）"""
+    candidates = []
+    if word.endswith("ies") and len(word) > 4:
+        candidates.append(word[:-3] + "y")
+    if word.endswith("es") and len(word) > 3:
+        candidates.append(word[:-2])
+    if word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+        candidates.append(word[:-1])
+    if word.endswith("ied") and len(word) > 4:
+        candidates.append(word[:-3] + "y")
+    if word.endswith("ed") and len(word) > 4:
+        stem = word[:-2]
+        candidates += [stem, stem + "e"]
+        if len(stem) > 2 and stem[-1] == stem[-2]:
+            candidates.append(stem[:-1])
+    if word.endswith("ing") and len(word) > 5:
+        stem = word[:-3]
+        candidates += [stem, stem + "e"]
+        if len(stem) > 2 and stem[-1] == stem[-2]:
+            candidates.append(stem[:-1])
+    if word.endswith("er") and len(word) > 4:
+        candidates.append(word[:-2])
+    if word.endswith("est") and len(word) > 5:
+        candidates.append(word[:-3])
+    return list(dict.fromkeys(c for c in candidates if c != word))
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="离线词典管理")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="从 CSV 词表导入词典")
+    imp.add_argument("path", help="ECDICT 格式 CSV 文件路径")
+    imp.add_argument("--max-rank", type=int, default=None, help="仅导入词频排名前 N 的词")
+    args = parser.parse_args(argv)
+
+    from models.database import SessionLocal, init_db
+    init_db()
+    db = SessionLocal()
+    try:
+        count = import_wordlist(db, args.path, max_rank=args.max_rank)
+        print(f"[Dictionary] 已导入 {count} 个词条")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""例句服务 —— 基于 lemma 倒排索引，从已抓取文章中检索生词的更多例句
+
+索引在抓取入库时增量维护；历史数据可用以下命令回填::
+
+    python -m services.example_service rebuild
+"""
+import argparse
+from collections import Counter
+
+from sqlalchemy import delete, func, insert
+from sqlalchemy.orm import Session
+
+from models.tables import Article, ArticleSentence, SentenceLemma, VocabItem
+from services.lexicon import content_lemmas
+
+# 每次排序最多考察的候选句（按最新优先）
+_MAX_CANDIDATES = 200
+# 同一篇文章最多返回的例句数，保证语境多样
+_PER_ARTICLE = 2
+
+_DIFFICULTY_LEVEL = {"easy": 0, "medium": 1, "hard": 2}
+
+
+def index_sentences(db: Session, sentences: list[ArticleSentence]) -> int:
+    """为已 flush 的句子写入倒排索引，返回写入的 (lemma, sentence) 对数"""
+    rows = []
+    for sent in sentences:
+        for lemma in set(content_lemmas(sent.text_en or "")):
+            rows.append({"lemma": lemma[:100], "sentence_id": sent.id, "article_id": sent.article_id})
+    if rows:
+        db.execute(insert(SentenceLemma), rows)
+    return len(rows)
+
+
+def rebuild_example_index(db: Session, batch_size: int = 2000) -> int:
+    """全量重建倒排索引"""
+    db.execute(delete(SentenceLemma))
+    total = 0
+    last_id = 0
+    while True:
+        batch = (
+            db.query(ArticleSentence)
+            .filter(ArticleSentence.id > last_id)
+            .order_by(ArticleSentence.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+        total += index_sentences(db, batch)
+        last_id = batch[-1].id
+        db.commit()
+    return total
+
+
+def learner_difficulty(db: Session) -> str:
+    """根据最近已读文章推断学习者适合的难度"""
+    recent = (
+        db.query(Article.difficulty)
+        .filter(Article.is_read == True)
+        .order_by(Article.fetched_at.desc())
+        .limit(20)
+        .all()
+    )
+    counts = Counter(d for (d,) in recent if d)
+    return counts.most_common(1)[0][0] if counts else "medium"
+
+
+class UnsupportedWordError(ValueError):
+    """停用词与过短的词不进入倒排索引，无法检索例句"""
+
+
+def find_examples(db: Session, vocab: VocabItem, limit: int = 5) -> list[dict]:
+    """为生词查找更多例句，按难度匹配度和句长排序
+
+    查询与建索引使用相同的 content_lemmas 规则；停用词与少于 3 个字母的词
+    从不入索引，直接抛出 UnsupportedWordError，而不是返回永远为空的列表。
+    """
+    lemmas = sorted(set(content_lemmas(vocab.lemma or vocab.word)))
+    if not lemmas:
+        raise UnsupportedWordError(f"'{vocab.word}' 为停用词或过短，不提供例句检索")
+
+    candidates = (
+        db.query(
+            ArticleSentence.id, ArticleSentence.article_id, ArticleSentence.text_en,
+            ArticleSentence.text_zh, Article.title, Article.difficulty,
+        )
+        .join(SentenceLemma, SentenceLemma.sentence_id == ArticleSentence.id)
+        .join(Article, Article.id == ArticleSentence.article_id)
+        .filter(SentenceLemma.lemma.in_(lemmas))
+        .group_by(ArticleSentence.id)
+        .having(func.count() == len(lemmas))
+        .order_by(ArticleSentence.id.desc())
+        .limit(_MAX_CANDIDATES)
+        .all()
+    )
+
+    target = _DIFFICULTY_LEVEL.get(learner_difficulty(db), 1)
+    source = (vocab.example_sentence or "").strip()
+
+    scored = []
+    for c in candidates:
+        if c.text_en.strip() == source:
+            continue
+        level = _DIFFICULTY_LEVEL.get(c.difficulty, 1)
+        score = 1.0 - 0.5 * abs(level - target) + _length_score(len(c.text_en.split()))
+        scored.append((score, c))
+    scored.sort(key=lambda x: x[0], reverse=True)
+
+    result, seen_text, per_article = [], set(), Counter()
+    for score, c in scored:
+        if c.text_en in seen_text or per_article[c.article_id] >= _PER_ARTICLE:
+            continue
+        seen_text.add(c.text_en)
+        per_article[c.article_id] += 1
+        result.append({
+            "sentence_id": c.id,
+            "article_id": c.article_id,
+            "article_title": c.title,
+            "difficulty": c.difficulty,
+            "text_en": c.text_en,
+            "text_zh": c.text_zh or "",
+            "score": round(score, 3),
+        })
+        if len(result) >= limit:
+            break
+    return result
+
+
+def _length_score(words: int) -> float:
+    """8-25 词的句子最适合作例句，过短/过长逐渐降分"""
+    if 8 <= words <= 25:
+        return 1.0
+    if words < 8:
+        return max(0.0, words / 8)
+    return max(0.0, 1.0 - (words - 25) / 25)
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="例句倒排索引管理")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("rebuild", help="从全部已存句子重建索引")
+    parser.parse_args(argv)
+
+    from models.database import SessionLocal, init_db
+    init_db()
+    db = SessionLocal()
+    try:
+        count = rebuild_example_index(db)
+        print(f"[Examples] 已索引 {count} 条 lemma-句子记录")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
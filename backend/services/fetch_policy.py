@@ -0,0 +1,93 @@
+"""RSS 源自适应抓取计划
+
+每个源独立安排下次抓取时间，而不是全局固定间隔：
+
+    - 间隔由 feed 中条目的发布时间学习：取相邻条目间隔的中位数的一半，
+      与旧值做指数平滑，限制在 [MIN_INTERVAL, MAX_INTERVAL]
+    - 无新文章（含 304 未修改）时间隔逐次放大
+    - 失败时按连续失败次数指数退避，并更新健康状态
+    - 所有计划时间加随机抖动，避免各源同时到期形成抓取高峰
+"""
+import random
+from datetime import datetime, timedelta
+from statistics import median
+
+from sqlalchemy.orm import Session
+
+from config import settings
+from models.tables import NewsSource
+
+MIN_INTERVAL = 15                # 分钟
+MAX_INTERVAL = 24 * 60
+# 失败重试的基础间隔与上限（分钟）
+RETRY_BASE = 15
+MAX_BACKOFF = 24 * 60
+# 无新内容时的间隔放大倍数
+UNCHANGED_BACKOFF = 1.5
+# 新观测间隔的平滑权重
+SMOOTHING = 0.5
+# 抖动比例（±）
+JITTER = 0.1
+# 连续失败达到该次数视为 failing
+FAILING_AFTER = 3
+
+
+def current_interval(source: NewsSource) -> float:
+    return float(source.fetch_interval_minutes or settings.rss_fetch_interval * 60)
+
+
+def learn_interval(current: float, entry_times: list[datetime]) -> float:
+    """由条目发布时间估计抓取间隔：约每半个发布周期抓取一次"""
+    times = sorted({t for t in entry_times if t}, reverse=True)[:20]
+    if len(times) < 2:
+        return current
+    gaps = [(a - b).total_seconds() / 60 for a, b in zip(times, times[1:])]
+    observed = median(gaps) / 2
+    return SMOOTHING * observed + (1 - SMOOTHING) * current
+
+
+def record_success(source: NewsSource, new_count: int, entry_times: list[datetime], now: datetime | None = None):
+    """抓取成功：学习间隔，无新内容时放大，安排下次抓取"""
+    now = now or datetime.utcnow()
+    interval = learn_interval(current_interval(source), entry_times)
+    if new_count == 0:
+        interval *= UNCHANGED_BACKOFF
+    interval = min(MAX_INTERVAL, max(MIN_INTERVAL, interval))
+
+    source.fetch_interval_minutes = round(interval)
+    source.next_fetch_at = now + _jittered(interval)
+    source.last_fetched = now
+    source.last_success_at = now
+    source.failure_count = 0
+    source.last_error = None
+    source.health = "ok"
+
+
+def record_failure(source: NewsSource, error: str, now: datetime | None = None):
+    """抓取失败：指数退避，更新健康状态（学习到的间隔保持不变）"""
+    now = now or datetime.utcnow()
+    source.failure_count = (source.failure_count or 0) + 1
+    delay = min(MAX_BACKOFF, RETRY_BASE * 2 ** (source.failure_count - 1))
+    source.next_fetch_at = now + _jittered(delay)
+    source.last_fetched = now
+    source.last_error = error[:500]
+    source.health = "failing" if source.failure_count >= FAILING_AFTER else "degraded"
+
+
+def due_sources(db: Session, now: datetime | None = None, limit: int = 3) -> list[NewsSource]:
+    """到期待抓取的活跃源，从未抓取过的优先"""
+    now = now or datetime.utcnow()
+    return (
+        db.query(NewsSource)
+        .filter(
+            NewsSource.is_active == True,
+            (NewsSource.next_fetch_at.is_(None)) | (NewsSource.next_fetch_at <= now),
+        )
+        .order_by(NewsSource.next_fetch_at.is_not(None), NewsSource.next_fetch_at, NewsSource.id)
+        .limit(limit)
+        .all()
+    )
+
+
+def _jittered(minutes: float) -> timedelta:
+    return timedelta(minutes=minutes * random.uniform(1 - JITTER, 1 + JITTER))
@@ -0,0 +1,305 @@
+"""AI 任务队列 —— 持久化、可重试、限流的异步 AI 调用
+
+请求方 enqueue 后立即拿到任务 id，轮询 /api/jobs/{id} 获取结果；
+调度器（见 scheduler）周期性调用 process_jobs 执行到期任务：
+
+    - 幂等键：相同 kind + payload（或调用方提供的键）只会生成一个任务
+    - 令牌桶：按每分钟请求数与估算 token 数双重限流，超限的任务留待下次
+    - 重试：可重试错误（429、超时、5xx）按指数退避重新排队，
+      429 优先采用服务端的 Retry-After 并暂停整个队列
+    - 超时回收：running 状态超过 RUNNING_TIMEOUT 的任务视为 worker 崩溃，重新排队
+
+任务只由调度器执行：Web 进程设置 SCHEDULER_ENABLED=false 时必须另行运行
+worker.py，否则任务会一直停留在 queued 状态（enqueue 时会提示一次）。
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from config import settings
+from models.tables import AIJob, Article, ArticleSentence
+from services import ai_service
+from services.lazy import lazy_module
+from services.rss_service import generate_article_summary
+
+openai = lazy_module("openai")
+
+BACKOFF_BASE = 10          # 秒
+MAX_BACKOFF = 30 * 60
+RUNNING_TIMEOUT = 10 * 60
+# 每次 process_jobs 最多执行的任务数
+BATCH_SIZE = 10
+# 逐句翻译任务每次调用翻译的句子数
+SENTENCE_BATCH = 20
+
+
+class RetryableError(Exception):
+    """可重试的错误；retry_after 为服务端建议的等待秒数"""
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """双维度令牌桶：每分钟请求数 + 每分钟 token 数（进程内共享）"""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.capacity = (float(requests_per_minute), float(tokens_per_minute))
+        self.available = list(self.capacity)
+        self.paused_until = 0.0
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens: int) -> bool:
+        """尝试取 1 个请求额度与 tokens 个 token 额度，不足时不扣减"""
+        with self._lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return False
+            elapsed = now - self.updated
+            self.updated = now
+            for i, capacity in enumerate(self.capacity):
+                self.available[i] = min(capacity, self.available[i] + elapsed * capacity / 60)
+            # 单个大任务超过桶容量时，满桶即可放行
+            tokens = min(tokens, self.capacity[1])
+            if self.available[0] < 1 or self.available[1] < tokens:
+                return False
+            self.available[0] -= 1
+            self.available[1] -= tokens
+            return True
+
+    def pause(self, seconds: float):
+        """服务端限流时暂停发放额度"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+bucket = TokenBucket(settings.ai_requests_per_minute, settings.ai_tokens_per_minute)
+_warned_no_scheduler = False
+
+
+# ─── 任务处理函数：kind -> handler(db, payload) -> result ───
+
+def _summary(db: Session, payload: dict) -> dict:
+    generate_article_summary(db, payload["article_id"])
+    return {"summary": db.query(Article.summary).filter(Article.id == payload["article_id"]).scalar()}
+
+
+def _translate(db: Session, payload: dict) -> dict:
+    return ai_service.translate_text(payload["text"], payload.get("context", ""))
+
+
+def _definition(db: Session, payload: dict) -> dict:
+    return ai_service.get_word_definition(payload["word"], payload.get("sentence", ""))
+
+
+def _translate_sentences(db: Session, payload: dict) -> dict:
+    """为文章中尚未翻译的句子补全中文（分批调用，已完成的批次会保存）
+
+    回复缺行或被截断时，未拿到译文的句子保持 NULL，任务按可重试错误重新排队，
+    重试只请求这些句子；超过 max_attempts 后任务失败。
+    """
+    pending = (
+        db.query(ArticleSentence)
+        .filter(ArticleSentence.article_id == payload["article_id"], ArticleSentence.text_zh.is_(None))
+        .order_by(ArticleSentence.index)
+        .all()
+    )
+    translated = 0
+    for i in range(0, len(pending), SENTENCE_BATCH):
+        batch = pending[i:i + SENTENCE_BATCH]
+        for sentence, zh in zip(batch, ai_service.translate_sentences([s.text_en for s in batch])):
+            if zh:
+                sentence.text_zh = zh
+                translated += 1
+        db.commit()
+    if translated < len(pending):
+        raise RetryableError(f"{len(pending) - translated} 句未返回译文")
+    return {"translated": translated}
+
+
+HANDLERS: dict[str, Callable[[Session, dict], dict]] = {
+    "summary": _summary,
+    "translate": _translate,
+    "definition": _definition,
+    "translate_sentences": _translate_sentences,
+}
+
+
+def make_key(kind: str, payload: dict) -> str:
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return f"{kind}:" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:40]
+
+
+def enqueue(db: Session, kind: str, payload: dict, idempotency_key: str | None = None) -> AIJob:
+    """提交任务；幂等键已存在时返回原任务（失败的任务会重新排队）"""
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    key = idempotency_key or make_key(kind, payload)
+    _warn_if_no_scheduler()
+
+    existing = db.query(AIJob).filter(AIJob.idempotency_key == key).first()
+    if existing:
+        if existing.status == "failed":
+            _requeue(existing, delay=0)
+            existing.attempts = 0
+            db.commit()
+        return existing
+
+    job = AIJob(kind=kind, idempotency_key=key, payload=json.dumps(payload, ensure_ascii=False))
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        # 并发提交了相同的幂等键
+        db.rollback()
+        return db.query(AIJob).filter(AIJob.idempotency_key == key).one()
+    return job
+
+
+def _warn_if_no_scheduler():
+    global _warned_no_scheduler
+    if not settings.scheduler_enabled and not _warned_no_scheduler:
+        _warned_no_scheduler = True
+        print("[Jobs] 本进程未启用调度器（SCHEDULER_ENABLED=false），任务需由 worker.py 执行")
+
+
+def process_jobs(db: Session, limit: int = BATCH_SIZE) -> int:
+    """执行到期任务，返回本次执行（成功或失败）的任务数"""
+    now = datetime.utcnow()
+    # 回收崩溃 worker 遗留的任务
+    db.query(AIJob).filter(AIJob.status == "running", AIJob.locked_until < now).update(
+        {AIJob.status: "queued", AIJob.locked_until: None}, synchronize_session=False,
+    )
+    db.commit()
+
+    candidates = (
+        db.query(AIJob)
+        .filter(AIJob.status == "queued", AIJob.next_run_at <= now)
+        .order_by(AIJob.next_run_at, AIJob.id)
+        .limit(limit)
+        .all()
+    )
+    processed = 0
+    for job in candidates:
+        # 先抢占再取额度：被其他 worker 抢走的任务不消耗令牌
+        if not _claim(db, job):
+            continue
+        if not bucket.try_acquire(_estimate_tokens(job)):
+            _release(db, job)
+            break
+        _run(db, job)
+        processed += 1
+    return processed
+
+
+def _claim(db: Session, job: AIJob) -> bool:
+    """条件 UPDATE 抢占任务，避免多个 worker 重复执行"""
+    claimed = (
+        db.query(AIJob)
+        .filter(AIJob.id == job.id, AIJob.status == "queued")
+        .update(
+            {
+                AIJob.status: "running",
+                AIJob.attempts: AIJob.attempts + 1,
+                AIJob.locked_until: datetime.utcnow() + timedelta(seconds=RUNNING_TIMEOUT),
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    if claimed:
+        db.refresh(job)
+    return bool(claimed)
+
+
+def _release(db: Session, job: AIJob):
+    """限流时归还已抢占的任务，不计入尝试次数"""
+    job.status = "queued"
+    job.attempts -= 1
+    job.locked_until = None
+    db.commit()
+
+
+def _run(db: Session, job: AIJob):
+    try:
+        result = HANDLERS[job.kind](db, json.loads(job.payload))
+    except Exception as e:
+        db.rollback()
+        retry, retry_after = _classify(e)
+        job.error = str(e)[:1000]
+        if retry and job.attempts < job.max_attempts:
+            if retry_after:
+                bucket.pause(retry_after)
+            _requeue(job, delay=retry_after or _backoff(job.attempts))
+        else:
+            job.status = "failed"
+            job.locked_until = None
+            print(f"[Jobs] 任务 #{job.id} ({job.kind}) 失败: {e}")
+        db.commit()
+        return
+
+    job.status = "done"
+    job.result = json.dumps(result, ensure_ascii=False)
+    job.error = None
+    job.locked_until = None
+    db.commit()
+
+
+def _requeue(job: AIJob, delay: float):
+    job.status = "queued"
+    job.locked_until = None
+    job.next_run_at = datetime.utcnow() + timedelta(seconds=delay)
+
+
+def _backoff(attempts: int) -> float:
+    """指数退避加抖动"""
+    delay = min(MAX_BACKOFF, BACKOFF_BASE * 2 ** (attempts - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _classify(error: Exception) -> tuple[bool, float | None]:
+    """(是否可重试, 服务端建议的等待秒数)"""
+    if isinstance(error, RetryableError):
+        return True, error.retry_after
+    if isinstance(error, openai.RateLimitError):
+        return True, _retry_after(error)
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+        return True, None
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in (408, 409) or error.status_code >= 500, _retry_after(error)
+    return False, None
+
+
+def _retry_after(error: "openai.APIStatusError") -> float | None:
+    try:
+        return float(error.response.headers.get("retry-after"))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def _estimate_tokens(job: AIJob) -> int:
+    """粗略估算：约 4 字符 / token，加上提示词与回复的固定开销"""
+    return len(job.payload) // 4 + 500
+
+
+def job_to_dict(job: AIJob) -> dict:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "attempts": job.attempts,
+        "result": json.loads(job.result) if job.result else None,
+        "error": job.error,
+        "next_run_at": job.next_run_at,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+    }
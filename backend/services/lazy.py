@@ -0,0 +1,31 @@
+"""重型依赖的延迟导入
+
+    openai = lazy_module("openai")      # 首次访问属性时才真正 import
+
+代理对象只转发属性访问，用法与模块一致（openai.RateLimitError、feedparser.parse）；
+测试中 monkeypatch.setattr(proxy, "parse", ...) 同样有效。
+"""
+import importlib
+
+
+class LazyModule:
+    def __init__(self, name: str):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            module = self.__dict__["_module"] = importlib.import_module(self._name)
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_module(name: str) -> LazyModule:
+    return LazyModule(name)
@@ -0,0 +1,59 @@
+"""数据库租约 —— 跨进程的互斥锁
+
+多个 uvicorn worker 或独立 worker 进程可能同时运行调度器，
+租约保证同一时刻只有一个持有者执行任务。持有者需在到期前续约，
+进程崩溃后租约自然过期，由其他实例接管。
+"""
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import case
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models.tables import JobLease
+
+
+def make_owner() -> str:
+    """当前进程的唯一持有者标识"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def acquire_lease(db: Session, name: str, owner: str, ttl_seconds: int) -> bool:
+    """获取或续约租约：无人持有、已过期或本就由 owner 持有时成功"""
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=ttl_seconds)
+
+    # 条件 UPDATE 原子地完成续约/接管
+    updated = (
+        db.query(JobLease)
+        .filter(JobLease.name == name, (JobLease.owner == owner) | (JobLease.expires_at < now))
+        .update(
+            {
+                JobLease.acquired_at: case((JobLease.owner == owner, JobLease.acquired_at), else_=now),
+                JobLease.owner: owner,
+                JobLease.expires_at: expires_at,
+            },
+            synchronize_session=False,
+        )
+    )
+    if updated:
+        db.commit()
+        return True
+
+    try:
+        db.add(JobLease(name=name, owner=owner, acquired_at=now, expires_at=expires_at))
+        db.commit()
+        return True
+    except IntegrityError:
+        # 其他实例持有且未过期
+        db.rollback()
+        return False
+
+
+def release_lease(db: Session, name: str, owner: str):
+    """主动释放租约（仅限持有者）"""
+    db.query(JobLease).filter(JobLease.name == name, JobLease.owner == owner).delete(synchronize_session=False)
+    db.commit()
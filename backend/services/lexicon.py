@@ -0,0 +1,120 @@
+"""轻量英文分词与词形还原（无外部依赖）
+
+规则 + 不规则词表实现，保证同一单词的各种变形归到同一个 lemma，
+原形输入保持不变，用于倒排索引与词汇画像的键。
+"""
+import re
+
+_WORD_RE = re.compile(r"[A-Za-z]+(?:['’][A-Za-z]+)?")
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers herself him himself his how i if in into is it its itself just me more most
+my myself no nor not now of off on once only or other our ours ourselves out over own same she should
+so some such than that the their theirs them themselves then there these they this those through to
+too under until up very was we were what when where which while who whom why will with would you your
+yours yourself yourselves also said says mr mrs ms may might must shall
+""".split())
+
+_IRREGULAR = {
+    "am": "be", "is": "be", "are": "be", "was": "be", "were": "be", "been": "be", "being": "be",
+    "has": "have", "had": "have", "having": "have", "does": "do", "did": "do", "done": "do",
+    "goes": "go", "went": "go", "gone": "go", "made": "make", "said": "say", "says": "say",
+    "took": "take", "taken": "take", "came": "come", "saw": "see", "seen": "see", "knew": "know",
+    "known": "know", "got": "get", "gotten": "get", "gave": "give", "given": "give", "found": "find",
+    "thought": "think", "told": "tell", "became": "become", "left": "leave", "felt": "feel",
+    "brought": "bring", "began": "begin", "begun": "begin", "kept": "keep", "held": "hold",
+    "wrote": "write", "written": "write", "stood": "stand", "heard": "hear", "meant": "mean",
+    "met": "meet", "ran": "run", "paid": "pay", "sat": "sit", "spoke": "speak", "spoken": "speak",
+    "led": "lead", "grew": "grow", "grown": "grow", "lost": "lose", "fell": "fall", "fallen": "fall",
+    "sent": "send", "built": "build", "understood": "understand", "drew": "draw", "drawn": "draw",
+    "broke": "break", "broken": "break", "spent": "spend", "rose": "rise", "risen": "rise",
+    "drove": "drive", "driven": "drive", "bought": "buy", "wore": "wear", "worn": "wear",
+    "chose": "choose", "chosen": "choose", "sold": "sell", "fought": "fight", "caught": "catch",
+    "taught": "teach", "won": "win", "ate": "eat", "eaten": "eat", "flew": "fly", "flown": "fly",
+    "children": "child", "men": "man", "women": "woman", "people": "person", "feet": "foot",
+    "teeth": "tooth", "mice": "mouse", "lives": "life", "wives": "wife", "knives": "knife",
+    "leaves": "leaf", "halves": "half", "better": "good", "best": "good", "worse": "bad", "worst": "bad",
+    "used": "use", "changed": "change", "changing": "change", "focused": "focus", "focusing": "focus",
+    "needed": "need", "needing": "need", "created": "create", "creating": "create",
+}
+
+# 以 s 结尾但不是复数/三单的常见词
+_S_ENDINGS = ("ss", "us", "is", "ous", "ics")
+_S_WORDS = frozenset({"news", "series", "species", "always", "perhaps", "whereas", "across", "various", "yes", "gas", "bus", "lens", "this", "thus"})
+
+_VOWELS = set("aeiou")
+
+
+def tokenize(text: str) -> list[str]:
+    """提取英文单词（小写），保留 don't 之类的缩约词"""
+    return [m.group(0).lower().replace("’", "'") for m in _WORD_RE.finditer(text)]
+
+
+def lemmatize(word: str) -> str:
+    """将单词还原为原形（启发式），原形词原样返回"""
+    word = word.lower().replace("’", "'")
+    if "'" in word:
+        word = word.split("'", 1)[0]
+    if word in _IRREGULAR:
+        return _IRREGULAR[word]
+    if len(word) <= 3:
+        return word
+
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith("ied") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith("s"):
+        if word in _S_WORDS or word.endswith(_S_ENDINGS):
+            return word
+        if word.endswith(("sses", "xes", "zes", "ches", "shes")):
+            return word[:-2]
+        return word[:-1]
+    if word.endswith("ing") and len(word) > 5:
+        return _restore_stem(word[:-3])
+    if word.endswith("ed") and len(word) > 4:
+        if word.endswith("eed") and len(word) > 5:
+            return word[:-1]
+        return _restore_stem(word[:-2])
+    return word
+
+
+def content_lemmas(text: str) -> list[str]:
+    """提取文本中的实词 lemma 序列（去停用词、去过短词）"""
+    lemmas = []
+    for token in tokenize(text):
+        if token in STOPWORDS or len(token) < 3:
+            continue
+        lemma = lemmatize(token)
+        if lemma not in STOPWORDS:
+            lemmas.append(lemma)
+    return lemmas
+
+
+def _restore_stem(stem: str) -> str:
+    """去掉 -ing/-ed 后修复词干：双写辅音还原、补回词尾 e"""
+    if len(stem) >= 3 and stem[-1] == stem[-2] and stem[-1] not in _VOWELS and stem[-1] not in "lsz":
+        return stem[:-1]
+    if stem.endswith(("bl", "iz")) or (stem.endswith("at") and stem[-3] not in _VOWELS):
+        return stem + "e"
+    if _is_short_cvc(stem):
+        return stem + "e"
+    # change/dance/cause/serve 之类：软音结尾补 e
+    if stem[-1] in "cv" or (stem[-1] == "g" and stem[-2] != "n" and stem[-2] not in _VOWELS):
+        return stem + "e"
+    if stem[-1] in "sz" and stem[-2] in _VOWELS:
+        return stem + "e"
+    return stem
+
+
+def _is_short_cvc(stem: str) -> bool:
+    """单音节 辅-元-辅 结构（make/hope/rate），末尾非 w/x/y"""
+    if len(stem) < 3:
+        return False
+    c1, v, c2 = stem[-3], stem[-2], stem[-1]
+    if c1 in _VOWELS or v not in _VOWELS or c2 in _VOWELS or c2 in "wxy":
+        return False
+    vowel_groups = len(re.findall(r"[aeiouy]+", stem))
+    return vowel_groups == 1
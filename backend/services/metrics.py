@@ -0,0 +1,235 @@
+"""请求级指标 —— ASGI 中间件 + SQLAlchemy 事件，/metrics 以 Prometheus 文本格式导出
+
+    http_requests_total                  {method, route, status}
+    http_requests_in_flight
+    http_request_duration_seconds        {method, route}    直方图
+    http_response_size_bytes             {method, route}    直方图
+    http_request_db_statements           {method, route}    每请求 SQL 条数直方图
+    http_request_db_seconds              {method, route}    每请求 SQL 耗时直方图
+    db_statements_total / db_statement_seconds_total       全部 SQL（含后台任务）
+    scheduler_job_runs_total             {job, outcome}     outcome: ok / error / skipped
+    scheduler_job_duration_seconds       {job}              直方图
+
+route 为路由模板（如 /api/content/article/{article_id}），未匹配的请求记为 <unmatched>，
+避免标签基数随 URL 增长。热路径只做字典查找、二分定桶与加锁累加；
+每个请求的 SQL 统计经 contextvar 归属到当前请求（线程池中执行的同步端点同样适用）。
+指标为进程内数据，多 worker 部署时由 Prometheus 分别抓取各进程。
+"""
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+JOB_BUCKETS = (0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0)
+
+
+class _Metric:
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._lock = threading.Lock()
+
+    def _label_text(self, values: tuple, extra: str = "") -> str:
+        pairs = [f'{k}="{_escape(str(v))}"' for k, v in zip(self.labels, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{self._label_text(labels)} {_number(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: tuple = (), amount: float = 1):
+        self.inc(labels, -amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = buckets
+        # labels -> [各桶计数（非累计，末位为 +Inf）, 总和]
+        self._values: dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def samples(self):
+        with self._lock:
+            items = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._values.items())
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{self._label_text(labels, le)} {cumulative}"
+            yield f"{self.name}_sum{self._label_text(labels)} {_number(total)}"
+            yield f"{self.name}_count{self._label_text(labels)} {cumulative}"
+
+
+REGISTRY: list[_Metric] = []
+
+
+def _register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+requests_total = _register(Counter("http_requests_total", "HTTP 请求数", ("method", "route", "status")))
+in_flight = _register(Gauge("http_requests_in_flight", "正在处理的 HTTP 请求数"))
+request_duration = _register(Histogram(
+    "http_request_duration_seconds", "HTTP 请求耗时", ("method", "route"), LATENCY_BUCKETS))
+response_size = _register(Histogram(
+    "http_response_size_bytes", "响应体大小", ("method", "route"), SIZE_BUCKETS))
+request_db_statements = _register(Histogram(
+    "http_request_db_statements", "每个请求执行的 SQL 条数", ("method", "route"), STATEMENT_BUCKETS))
+request_db_seconds = _register(Histogram(
+    "http_request_db_seconds", "每个请求的 SQL 总耗时", ("method", "route"), LATENCY_BUCKETS))
+db_statements = _register(Counter("db_statements_total", "执行的 SQL 条数（含后台任务）"))
+db_seconds = _register(Counter("db_statement_seconds_total", "SQL 总耗时（含后台任务）"))
+job_runs = _register(Counter("scheduler_job_runs_total", "定时任务执行次数", ("job", "outcome")))
+job_duration = _register(Histogram(
+    "scheduler_job_duration_seconds", "定时任务耗时", ("job",), JOB_BUCKETS))
+
+# 当前请求的 [SQL 条数, SQL 耗时]；请求之外为 None
+_request_db: contextvars.ContextVar[list | None] = contextvars.ContextVar("request_db", default=None)
+
+
+class MetricsMiddleware:
+    """纯 ASGI 中间件（不经 BaseHTTPMiddleware，避免额外的任务与流包装）"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+        size = 0
+        db = [0, 0.0]
+        token = _request_db.set(db)
+        in_flight.inc()
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            _request_db.reset(token)
+            route = route_template(scope)
+            labels = (scope["method"], route)
+            requests_total.inc((scope["method"], route, str(status)))
+            request_duration.observe(labels, time.perf_counter() - start)
+            response_size.observe(labels, size)
+            request_db_statements.observe(labels, db[0])
+            request_db_seconds.observe(labels, db[1])
+
+
+def route_template(scope) -> str:
+    """还原请求匹配到的路由模板：把路径中的参数值替换回 {参数名}
+
+    不依赖 scope["route"]：包含进来的子路由上它只是去掉前缀的相对路径。
+    """
+    if scope.get("endpoint") is None:
+        return "<unmatched>"
+    params = scope.get("path_params") or {}
+    if not params:
+        return scope["path"]
+    names = {str(value): name for name, value in params.items()}
+    return "/".join(
+        "{" + names[segment] + "}" if segment in names else segment for segment in scope["path"].split("/")
+    )
+
+
+def install(engine: Engine):
+    """为引擎注册 SQL 计时事件（重复调用无副作用）"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # 起始时间记在本次执行的 context 上：语句出错时随 context 丢弃，不会在连接上累积
+    if context is not None:
+        context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_metrics_start", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    db_statements.inc()
+    db_seconds.inc(amount=elapsed)
+    current = _request_db.get()
+    if current is not None:
+        current[0] += 1
+        current[1] += elapsed
+
+
+def observe_job(job: str, seconds: float, outcome: str):
+    job_runs.inc((job, outcome))
+    if outcome != "skipped":
+        job_duration.observe((job,), seconds)
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
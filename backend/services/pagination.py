@@ -0,0 +1,32 @@
+"""Keyset（游标）分页工具
+
+游标是排序键 (时间, id) 的 base64 编码，对客户端不透明；
+翻页条件 (时间, id) < (游标时间, 游标 id) 直接命中复合索引，深翻页不退化。
+"""
+import base64
+from datetime import datetime
+
+from sqlalchemy import tuple_
+
+
+def encode_cursor(sort_value: datetime, row_id: int) -> str:
+    raw = f"{sort_value.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """解析游标，格式错误抛 ValueError"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, row_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(value), int(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def apply_keyset(query, sort_column, id_column, cursor: str | None):
+    """按 (sort_column, id) 倒序排列，并从游标之后开始"""
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(sort_column, id_column) < tuple_(sort_value, row_id))
+    return query.order_by(sort_column.desc(), id_column.desc())
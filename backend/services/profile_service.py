@@ -0,0 +1,229 @@
+"""文章词汇画像 —— 入库时一次性计算，请求时不再处理正文
+
+画像包括 lemma 词频向量（二进制打包）、低频词列表、CEFR 等级分布，
+阅读器据此高亮已掌握/学习中/陌生词，推荐引擎据此打分。
+历史文章可用以下命令回填::
+
+    python -m services.profile_service rebuild
+"""
+import argparse
+import json
+import struct
+import threading
+import weakref
+import zlib
+from collections import Counter
+from typing import NamedTuple
+
+from sqlalchemy import event, func
+from sqlalchemy.engine import Dialect
+from sqlalchemy.orm import Session
+
+from models.tables import Article, ArticleProfile, VocabItem
+from services.dictionary_service import frequency_ranks, has_entries
+from services.lexicon import content_lemmas, lemmatize
+from services.storage_service import article_text
+
+# 词频排名在此之内视为常见词
+COMMON_RANK = 5000
+
+# 词频排名 -> CEFR 等级（近似映射）
+_CEFR_BANDS = ((500, "A1"), (1000, "A2"), (2000, "B1"), (4000, "B2"), (8000, "C1"))
+
+_COUNT = struct.Struct("<H")
+
+
+class LearnerLemmas(NamedTuple):
+    """生词本的 lemma 视图：lemma -> 掌握状态（已掌握优先），及推荐打分用的集合"""
+    status: dict[str, str]
+    mastered: frozenset[str]
+    learning: frozenset[str]
+    known_hashes: frozenset[int]
+
+
+# 生词本 lemma 缓存，按引擎隔离（以 Dialect 实例为键）：(签名, LearnerLemmas)。
+# 本进程内的 VocabItem 写入经 ORM 事件直接失效缓存；其他进程（worker）的写入
+# 由签名 (行数, 最大 id, 已掌握数) 发现，每次请求只多一条聚合查询
+_learner_cache: "weakref.WeakKeyDictionary[Dialect, tuple[tuple, LearnerLemmas]]" = weakref.WeakKeyDictionary()
+_learner_lock = threading.Lock()
+
+
+def build_article_profile(db: Session, article: Article, content: str) -> ArticleProfile:
+    """入库时计算文章词汇画像（需已 flush 获得 article.id）"""
+    freqs = Counter(content_lemmas(content))
+    dictionary_ready = has_entries(db)
+    ranks = frequency_ranks(db, list(freqs)) if dictionary_ready else {}
+
+    rare = sorted(
+        (lemma for lemma in freqs if _is_rare(lemma, ranks, dictionary_ready)),
+        key=lambda lemma: (-freqs[lemma], lemma),
+    )
+    bands = Counter(_cefr_band(ranks.get(lemma)) if dictionary_ready else "?" for lemma in freqs)
+
+    profile = ArticleProfile(
+        article_id=article.id,
+        level=readability_to_level(article.readability_score),
+        unique_lemmas=len(freqs),
+        rare_count=len(rare),
+        lemma_freqs=pack_freqs(freqs),
+        rare_words=json.dumps(rare, ensure_ascii=False),
+        rare_hashes=pack_hashes(rare),
+        cefr_bands=json.dumps(dict(sorted(bands.items()))),
+    )
+    db.add(profile)
+    return profile
+
+
+def article_lexicon(db: Session, article_id: int) -> dict | None:
+    """阅读器用：文章 lemma 对照生词本的掌握状态，无画像时返回 None"""
+    profile = db.get(ArticleProfile, article_id)
+    if not profile or profile.lemma_freqs is None:
+        return None
+
+    status = learner_lemmas(db).status
+    freqs = unpack_freqs(profile.lemma_freqs)
+    rare_words = json.loads(profile.rare_words or "[]")
+    return {
+        "article_id": article_id,
+        "mastered": sorted(lemma for lemma in freqs if status.get(lemma) == "mastered"),
+        "learning": sorted(lemma for lemma in freqs if status.get(lemma) == "learning"),
+        "unknown": [lemma for lemma in rare_words if lemma not in status],
+        "cefr_bands": json.loads(profile.cefr_bands or "{}"),
+        "unique_lemmas": profile.unique_lemmas,
+    }
+
+
+def learner_lemmas(db: Session) -> LearnerLemmas:
+    """生词本 lemma 视图（带缓存，生词本未变化时不重新读取与词形还原）"""
+    dialect = db.get_bind().dialect
+    signature = tuple(db.query(
+        func.count(VocabItem.id), func.max(VocabItem.id), func.sum(VocabItem.is_mastered),
+    ).one())
+    with _learner_lock:
+        cached = _learner_cache.get(dialect)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    status: dict[str, str] = {}
+    mastered, learning = set(), set()
+    for word, lemma, is_mastered in db.query(VocabItem.word, VocabItem.lemma, VocabItem.is_mastered).all():
+        key = lemmatize(lemma or word)
+        (mastered if is_mastered else learning).add(key)
+        if status.get(key) != "mastered":
+            status[key] = "mastered" if is_mastered else "learning"
+    lemmas = LearnerLemmas(
+        status, frozenset(mastered), frozenset(learning), frozenset(lemma_hash(k) for k in status),
+    )
+    with _learner_lock:
+        _learner_cache[dialect] = (signature, lemmas)
+    return lemmas
+
+
+@event.listens_for(VocabItem, "after_insert")
+@event.listens_for(VocabItem, "after_update")
+@event.listens_for(VocabItem, "after_delete")
+def _invalidate_learner_lemmas(mapper, connection, target):
+    with _learner_lock:
+        _learner_cache.pop(connection.dialect, None)
+
+
+def readability_to_level(score: float | None) -> float:
+    """Flesch Reading Ease (100 易 - 0 难) -> 0-1 难度"""
+    if score is None:
+        return 0.5
+    return max(0.0, min(1.0, (100 - score) / 100))
+
+
+def pack_freqs(freqs: Counter) -> bytes:
+    """lemma 词频向量打包：按 lemma 排序，每项 uint16 次数 + UTF-8 lemma + NUL"""
+    parts = []
+    for lemma in sorted(freqs):
+        parts.append(_COUNT.pack(min(freqs[lemma], 0xFFFF)))
+        parts.append(lemma.encode("utf-8") + b"\0")
+    return b"".join(parts)
+
+
+def unpack_freqs(data: bytes) -> dict[str, int]:
+    freqs = {}
+    pos = 0
+    while pos < len(data):
+        (count,) = _COUNT.unpack_from(data, pos)
+        end = data.index(b"\0", pos + _COUNT.size)
+        freqs[data[pos + _COUNT.size:end].decode("utf-8")] = count
+        pos = end + 1
+    return freqs
+
+
+def lemma_hash(lemma: str) -> int:
+    """lemma 的 32 位哈希（crc32），用于免解析地比对生词本与文章低频词"""
+    return zlib.crc32(lemma.encode("utf-8"))
+
+
+def pack_hashes(lemmas) -> bytes:
+    """低频词哈希打包：每项小端 uint32"""
+    hashes = [lemma_hash(lemma) for lemma in lemmas]
+    return struct.pack(f"<{len(hashes)}I", *hashes)
+
+
+def unpack_hashes(data: bytes) -> tuple[int, ...]:
+    return struct.unpack(f"<{len(data) // 4}I", data)
+
+
+def rebuild_profiles(db: Session, batch_size: int = 200) -> int:
+    """为历史文章重建词汇画像"""
+    total = 0
+    last_id = 0
+    while True:
+        batch = (
+            db.query(Article)
+            .filter(Article.id > last_id)
+            .order_by(Article.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+        ids = [a.id for a in batch]
+        db.query(ArticleProfile).filter(ArticleProfile.article_id.in_(ids)).delete(synchronize_session=False)
+        for article in batch:
+            build_article_profile(db, article, article_text(db, article.id))
+        total += len(batch)
+        last_id = batch[-1].id
+        db.commit()
+    return total
+
+
+def _is_rare(lemma: str, ranks: dict[str, int], dictionary_ready: bool) -> bool:
+    """低频词：词库排名超出 COMMON_RANK 或未收录；未导入词库时以词长近似"""
+    if not dictionary_ready:
+        return len(lemma) >= 8
+    return ranks.get(lemma, COMMON_RANK + 1) > COMMON_RANK
+
+
+def _cefr_band(rank: int | None) -> str:
+    if rank is None:
+        return "C2"
+    for limit, band in _CEFR_BANDS:
+        if rank <= limit:
+            return band
+    return "C2"
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="文章词汇画像管理")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("rebuild", help="为全部已存文章重建画像")
+    parser.parse_args(argv)
+
+    from models.database import SessionLocal, init_db
+    init_db()
+    db = SessionLocal()
+    try:
+        count = rebuild_profiles(db)
+        print(f"[Profile] 已重建 {count} 篇文章的词汇画像")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
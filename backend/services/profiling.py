@@ -0,0 +1,236 @@
+"""按需性能剖析 —— 采样剖析器与慢 SQL 日志
+
+采样剖析（PROFILING_ENABLED=true 时才安装中间件）：
+    - 请求带 X-Profile: 1 头，或通过 POST /api/debug/profile?requests=N
+      （及启动时的 PROFILE_REQUESTS）预约接下来的 N 个请求
+    - 请求期间后台线程每 PROFILE_INTERVAL_MS 毫秒抓取一次所有线程的调用栈，
+      结果以折叠栈格式（每行 "线程;外层帧;...;内层帧 次数"）写入
+      PROFILE_DIR/<时间>-<方法>-<路径>.folded，响应头 X-Profile-File 给出文件名；
+      可直接交给 flamegraph.pl / inferno / speedscope 生成火焰图
+    - 采样的是整个进程：同步端点在线程池中执行，无法只挑出本请求的线程；
+      处于空闲等待（事件循环 select、线程池取任务）且不含应用代码的栈会被丢弃
+
+慢 SQL 日志（SLOW_SQL_MS > 0 时才注册事件）：
+    超过阈值的语句以 JSON 行追加到 PROFILE_DIR/slow-sql.jsonl，
+    记录语句、参数形状（只记类型，不记值）与 SQLite 的 EXPLAIN QUERY PLAN。
+
+两者关闭时不安装任何中间件或事件监听，没有额外开销。
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+PROFILE_HEADER = b"x-profile"
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 叶子帧为这些函数、且栈中没有应用代码时视为空闲线程
+_IDLE_LEAVES = {("selectors.py", "select"), ("threading.py", "wait"), ("queue.py", "get")}
+
+_lock = threading.Lock()
+_armed = 0
+
+
+def arm(requests: int):
+    """预约接下来的 N 个请求进行剖析"""
+    global _armed
+    with _lock:
+        _armed = max(0, requests)
+
+
+def armed() -> int:
+    return _armed
+
+
+def _take_armed() -> bool:
+    global _armed
+    if not _armed:
+        return False
+    with _lock:
+        if _armed:
+            _armed -= 1
+            return True
+    return False
+
+
+class Sampler:
+    """后台线程定时抓取 sys._current_frames()，按折叠栈计数"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "Sampler":
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = _stack(frame)
+                if stack:
+                    stack.append(names.get(ident, str(ident)).replace(";", ":").replace(" ", "_"))
+                    self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _stack(frame) -> list[str] | None:
+    """内层到外层的帧标签；空闲线程返回 None"""
+    leaf = frame.f_code
+    idle = (os.path.basename(leaf.co_filename), leaf.co_name) in _IDLE_LEAVES
+    labels = []
+    in_app = False
+    while frame is not None:
+        code = frame.f_code
+        filename = code.co_filename
+        if filename.startswith(_APP_ROOT):
+            in_app = True
+            filename = os.path.relpath(filename, _APP_ROOT)
+        else:
+            filename = os.path.basename(filename)
+        labels.append(f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":"))
+        frame = frame.f_back
+    if idle and not in_app:
+        return None
+    return labels
+
+
+def profile_path(output_dir: str, method: str, path: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_")[:80] or "root"
+    return os.path.join(output_dir, f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{method}-{slug}.folded")
+
+
+class ProfilingMiddleware:
+    """纯 ASGI 中间件：命中请求头或预约名额时对该请求采样"""
+
+    def __init__(self, app, output_dir: str = "./data/profiles", interval_ms: float = 5):
+        self.app = app
+        self.output_dir = output_dir
+        self.interval = interval_ms / 1000
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (_requested(scope) or _take_armed()):
+            await self.app(scope, receive, send)
+            return
+
+        path = profile_path(self.output_dir, scope["method"], scope["path"])
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-file", os.path.basename(path).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        sampler = Sampler(self.interval).start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(sampler.folded())
+
+
+def _requested(scope) -> bool:
+    for name, value in scope.get("headers", ()):
+        if name == PROFILE_HEADER:
+            return value.strip().lower() in (b"1", b"true", b"yes")
+    return False
+
+
+# ─── 慢 SQL ───
+
+_slow_sql = {"threshold": 0.0, "path": None}
+_log_lock = threading.Lock()
+
+
+def install_slow_sql(engine: Engine, threshold_ms: float, output_dir: str = "./data/profiles"):
+    """为引擎注册慢 SQL 记录（重复调用只更新阈值与输出位置）"""
+    _slow_sql["threshold"] = threshold_ms / 1000
+    _slow_sql["path"] = os.path.join(output_dir, "slow-sql.jsonl")
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # 与 metrics 相同，起始时间记在 context 上，出错的语句不会在连接上遗留记录
+    if context is not None:
+        context._slow_sql_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_slow_sql_start", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    if elapsed < _slow_sql["threshold"]:
+        return
+
+    plan = None
+    if conn.dialect.name == "sqlite" and not executemany:
+        plan = _explain(cursor, statement, parameters)
+    record = {
+        "at": datetime.utcnow().isoformat(timespec="milliseconds"),
+        "ms": round(elapsed * 1000, 2),
+        "statement": statement,
+        "params": parameter_shape(parameters, executemany),
+        "plan": plan,
+    }
+    path = _slow_sql["path"]
+    with _log_lock:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    print(f"[SlowSQL] {record['ms']:.0f}ms {' '.join(statement.split())[:160]}")
+
+
+def _explain(cursor, statement: str, parameters) -> list[str] | None:
+    """在同一 DBAPI 连接上执行 EXPLAIN QUERY PLAN（不经引擎，避免再次触发事件）"""
+    if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    try:
+        explain = cursor.connection.cursor()
+        try:
+            explain.execute("EXPLAIN QUERY PLAN " + statement, parameters or ())
+            return [row[-1] for row in explain.fetchall()]
+        finally:
+            explain.close()
+    except Exception as e:
+        return [f"EXPLAIN 失败: {e}"]
+
+
+def parameter_shape(parameters, executemany: bool = False) -> str:
+    """参数形状：只保留类型，如 (int, str) / 100 × (int, str) / {id: int}"""
+    if executemany:
+        parameters = list(parameters)
+        return f"{len(parameters)} × {parameter_shape(parameters[0])}" if parameters else "0 × ()"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(v).__name__ for v in parameters) + ")"
+    return type(parameters).__name__
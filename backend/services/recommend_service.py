@@ -0,0 +1,135 @@
+"""个性化文章推荐 —— 基于入库时预计算的文章特征打分排序
+
+每篇文章入库时写入 ArticleProfile（见 profile_service）；
+推荐时只读取候选文章的特征行，结合学习者的生词本、阅读历史做线性打分，
+GET 请求不产生任何写操作。
+"""
+import math
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
+
+from models.tables import Article, ArticleProfile, SentenceLemma
+from services.profile_service import learner_lemmas, readability_to_level, unpack_hashes
+
+# 每次排序最多考察的未读候选数
+MAX_CANDIDATES = 2000
+# 理想的陌生词比例（i+1 输入）
+TARGET_UNKNOWN_RATIO = 0.05
+
+# 特征权重：难度匹配 / 陌生词比例 / 复现生词 / 分类偏好 / 新鲜度
+WEIGHTS = (1.0, 1.2, 0.6, 0.5, 0.8)
+# 无画像文章（升级后尚未回填）的陌生词比例得分：取中性值，不让其压过有画像的文章
+NEUTRAL_UNKNOWN_SCORE = 0.5
+
+
+def recommend_articles(db: Session, count: int = 5) -> list[Article]:
+    """推荐今日可学文章：对未读候选按学习者匹配度排序"""
+    candidates = (
+        db.query(
+            Article.id, Article.category, Article.readability_score,
+            Article.published_at, Article.fetched_at,
+            ArticleProfile.level, ArticleProfile.unique_lemmas, ArticleProfile.rare_count,
+            ArticleProfile.rare_hashes,
+        )
+        .outerjoin(ArticleProfile, ArticleProfile.article_id == Article.id)
+        .filter(Article.is_read == False, Article.canonical_id.is_(None))
+        .order_by(Article.id.desc())
+        .limit(MAX_CANDIDATES)
+        .all()
+    )
+    if not candidates:
+        return []
+
+    ids = [c.id for c in candidates]
+    target_level, category_pref = _reading_history(db)
+    learner = learner_lemmas(db)
+    learning_hits = _lemma_hits(db, learner.learning, ids)
+    now = datetime.utcnow()
+
+    scored = []
+    for c in candidates:
+        level = c.level if c.level is not None else readability_to_level(c.readability_score)
+        if c.unique_lemmas:
+            unknown_ratio = _unknown_count(c.rare_hashes, c.rare_count, learner.known_hashes) / c.unique_lemmas
+            unknown_score = 1.0 - min(1.0, abs(unknown_ratio - TARGET_UNKNOWN_RATIO) / TARGET_UNKNOWN_RATIO)
+        else:
+            unknown_score = NEUTRAL_UNKNOWN_SCORE
+        age_hours = (now - (c.published_at or c.fetched_at or now)).total_seconds() / 3600
+
+        features = (
+            1.0 - min(1.0, abs(level - target_level) * 2),
+            unknown_score,
+            min(1.0, learning_hits.get(c.id, 0) / 5),
+            category_pref.get(c.category, 0.0),
+            math.exp(-max(age_hours, 0) / 48),
+        )
+        scored.append((sum(w * f for w, f in zip(WEIGHTS, features)), c))
+    scored.sort(key=lambda x: x[0], reverse=True)
+
+    # 同一分类最多占一半，避免推荐过于单一
+    per_category = max(1, math.ceil(count / 2))
+    picked, used = [], Counter()
+    for _, c in scored:
+        if used[c.category] >= per_category:
+            continue
+        picked.append(c.id)
+        used[c.category] += 1
+        if len(picked) >= count:
+            break
+    for _, c in scored:
+        if len(picked) >= count:
+            break
+        if c.id not in picked:
+            picked.append(c.id)
+
+    articles = (
+        db.query(Article)
+        .options(joinedload(Article.source))
+        .filter(Article.id.in_(picked))
+        .all()
+    )
+    order = {aid: i for i, aid in enumerate(picked)}
+    return sorted(articles, key=lambda a: order[a.id])
+
+
+def _unknown_count(rare_hashes: bytes | None, rare_count: int | None, known_hashes: frozenset[int]) -> int:
+    """文章低频词中不在生词本里的个数（生词本里的常用词不影响陌生词比例）"""
+    if not known_hashes or not rare_hashes:
+        return rare_count or 0
+    return (rare_count or 0) - len(known_hashes.intersection(unpack_hashes(rare_hashes)))
+
+
+def _reading_history(db: Session) -> tuple[float, dict[str, float]]:
+    """从最近已读文章推断目标难度与分类偏好"""
+    recent = (
+        db.query(Article.readability_score, Article.category)
+        .filter(Article.is_read == True)
+        .order_by(Article.fetched_at.desc())
+        .limit(30)
+        .all()
+    )
+    if not recent:
+        return 0.5, {}
+
+    levels = [readability_to_level(score) for score, _ in recent]
+    # 略高于舒适区，推动进步
+    target = min(1.0, sum(levels) / len(levels) + 0.05)
+    categories = Counter(cat for _, cat in recent if cat)
+    top = max(categories.values()) if categories else 1
+    return target, {cat: n / top for cat, n in categories.items()}
+
+
+def _lemma_hits(db: Session, lemmas: frozenset[str], article_ids: list[int]) -> dict[int, int]:
+    """借助例句倒排索引统计每篇候选文章包含多少个给定 lemma"""
+    if not lemmas or not article_ids:
+        return {}
+    rows = (
+        db.query(SentenceLemma.article_id, func.count(func.distinct(SentenceLemma.lemma)))
+        .filter(SentenceLemma.lemma.in_(list(lemmas)), SentenceLemma.article_id.in_(article_ids))
+        .group_by(SentenceLemma.article_id)
+        .all()
+    )
+    return dict(rows)
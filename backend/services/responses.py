@@ -0,0 +1,41 @@
+"""大列表响应的快速序列化
+
+端点声明 response_model 时，FastAPI 会把返回值按模型重新校验一遍（同步端点还要
+再进一次线程池）再序列化。列表/阅读器接口的数据本来就是按模型字段投影出来的
+行字典，这一步纯属重复。这里的函数直接返回已渲染好的 Response，FastAPI 不再处理：
+
+    rows_response(rows)                     行字典 -> JSON（orjson，未安装时用 pydantic-core）
+    model_response(adapter, objects)        ORM 对象 -> 经 TypeAdapter 校验一次后输出 JSON
+
+response_model 仍保留在路由上，OpenAPI 文档不变。压缩由 app 中的 GZipMiddleware 统一处理。
+"""
+from typing import Any
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson 为可选依赖
+    orjson = None
+
+MEDIA_TYPE = "application/json"
+
+
+def dumps(content: Any) -> bytes:
+    """datetime/date 输出 ISO 格式，与 pydantic 序列化结果一致"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return to_json(content)
+
+
+def rows_response(rows: Any, headers: dict[str, str] | None = None, status_code: int = 200) -> Response:
+    """已按 response_model 字段投影好的数据（dict / list[dict]），跳过再次校验"""
+    return Response(dumps(rows), status_code=status_code, headers=headers, media_type=MEDIA_TYPE)
+
+
+def model_response(adapter: TypeAdapter, value: Any, headers: dict[str, str] | None = None) -> Response:
+    """ORM 对象等需要转换的数据：TypeAdapter 校验一次，由 pydantic-core 直接输出 JSON"""
+    body = adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+    return Response(body, headers=headers, media_type=MEDIA_TYPE)
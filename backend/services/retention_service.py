@@ -0,0 +1,171 @@
+"""文章保留与归档 —— 让热数据只覆盖近期文章
+
+未读、未关联生词且发布超过 retention_days 天的文章被归档：
+正文句子（[英文, 中文, 段落序号]）写入 gzip 压缩的 JSONL 冷存储文件（每日一个，追加写入），
+随后删除文章及其句子、例句索引与词汇画像，只在 archived_article 中保留
+url/标题供抓取去重（原 article.id 记在 article_id 列，SQLite 会复用已删除的 id）。
+已读或生词本引用的文章永久保留。
+
+指向被归档文章的近重复记录（canonical_id）随原文一并归档；其中已读或被
+生词本引用的保留下来并清空 canonical_id，不留下指向已删除（或被复用）id 的链接。
+
+按批次增量执行，每批独立提交；单次运行有批次上限，剩余部分留给下次调度。
+
+    python -m services.retention_service run [--days 30]
+"""
+import argparse
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import exists
+from sqlalchemy.orm import Session
+
+from config import settings
+from models.tables import (
+    ArchivedArticle, Article, ArticleLSH, ArticleProfile, ArticleSentence, SentenceLemma, VocabItem,
+)
+from services.storage_service import vacuum
+
+# 每批归档的文章数
+BATCH_SIZE = 200
+# 单次运行最多处理的批次数
+MAX_BATCHES = 50
+
+
+def _unprotected():
+    """未读且未被生词本引用"""
+    return (Article.is_read == False) & ~exists().where(VocabItem.article_id == Article.id)
+
+
+def archive_candidates(db: Session, days: int, limit: int) -> list[int]:
+    """超过保留期、未读且未被生词本引用的文章 id"""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    rows = (
+        db.query(Article.id)
+        .filter(Article.published_at < cutoff, _unprotected())
+        .order_by(Article.id)
+        .limit(limit)
+        .all()
+    )
+    return [r.id for r in rows]
+
+
+def apply_retention(
+    db: Session,
+    days: int | None = None,
+    archive_dir: str | None = None,
+    batch_size: int = BATCH_SIZE,
+    max_batches: int = MAX_BATCHES,
+    vacuum_after: bool = True,
+) -> dict:
+    """执行一轮归档，返回 {archived, file}"""
+    days = settings.retention_days if days is None else days
+    result = {"archived": 0, "file": None}
+    if days <= 0:
+        return result
+
+    archive_dir = archive_dir or settings.archive_dir
+    os.makedirs(archive_dir, exist_ok=True)
+    filename = f"articles-{datetime.utcnow():%Y%m%d}.jsonl.gz"
+    path = os.path.join(archive_dir, filename)
+
+    for _ in range(max_batches):
+        ids = archive_candidates(db, days, batch_size)
+        if not ids:
+            break
+        result["archived"] += _archive_batch(db, ids, path, filename)
+        db.commit()
+        result["file"] = path
+
+    if result["archived"] and vacuum_after:
+        vacuum(db)
+    return result
+
+
+def _archive_batch(db: Session, ids: list[int], path: str, filename: str) -> int:
+    """归档一批文章（连同其近重复记录），返回归档篇数"""
+    duplicates = [
+        r.id for r in db.query(Article.id).filter(
+            Article.canonical_id.in_(ids), Article.id.notin_(ids), _unprotected(),
+        )
+    ]
+    ids = ids + duplicates
+    articles = db.query(Article).filter(Article.id.in_(ids)).order_by(Article.id).all()
+    sentences: dict[int, list] = {}
+    for article_id, en, zh, paragraph in (
+        db.query(
+            ArticleSentence.article_id, ArticleSentence.text_en, ArticleSentence.text_zh, ArticleSentence.paragraph,
+        )
+        .filter(ArticleSentence.article_id.in_(ids))
+        .order_by(ArticleSentence.article_id, ArticleSentence.index)
+    ):
+        sentences.setdefault(article_id, []).append([en, zh, paragraph])
+
+    # 先写冷存储再删除；中途失败时重跑只会产生重复归档记录，不会丢数据
+    with gzip.open(path, "at", encoding="utf-8") as f:
+        for a in articles:
+            f.write(json.dumps({
+                "id": a.id,
+                "source_id": a.source_id,
+                "title": a.title,
+                "url": a.url,
+                "summary": a.summary,
+                "difficulty": a.difficulty,
+                "category": a.category,
+                "word_count": a.word_count,
+                "readability_score": a.readability_score,
+                "published_at": a.published_at.isoformat() if a.published_at else None,
+                "fetched_at": a.fetched_at.isoformat() if a.fetched_at else None,
+                "canonical_id": a.canonical_id,
+                "content": a.content,
+                "sentences": sentences.get(a.id, []),
+            }, ensure_ascii=False) + "\n")
+
+    db.add_all([
+        ArchivedArticle(
+            article_id=a.id, url=a.url, title=a.title, source_id=a.source_id,
+            archive_file=filename, published_at=a.published_at,
+        )
+        for a in articles
+    ])
+    db.query(SentenceLemma).filter(SentenceLemma.article_id.in_(ids)).delete(synchronize_session=False)
+    db.query(ArticleProfile).filter(ArticleProfile.article_id.in_(ids)).delete(synchronize_session=False)
+    db.query(ArticleLSH).filter(ArticleLSH.article_id.in_(ids)).delete(synchronize_session=False)
+    db.query(ArticleSentence).filter(ArticleSentence.article_id.in_(ids)).delete(synchronize_session=False)
+    db.query(Article).filter(Article.id.in_(ids)).delete(synchronize_session=False)
+    # 保留下来的近重复记录成为独立文章
+    db.query(Article).filter(Article.canonical_id.in_(ids)).update(
+        {Article.canonical_id: None}, synchronize_session=False,
+    )
+    return len(articles)
+
+
+def read_archive(path: str):
+    """逐条读取归档文件中的文章记录"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="文章保留与归档")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="归档超过保留期的文章")
+    run.add_argument("--days", type=int, default=None, help="保留天数（默认取配置 RETENTION_DAYS）")
+    args = parser.parse_args(argv)
+
+    from models.database import SessionLocal, init_db
+    init_db()
+    db = SessionLocal()
+    try:
+        result = apply_retention(db, days=args.days)
+        print(f"[Retention] 已归档 {result['archived']} 篇文章" + (f" -> {result['file']}" if result["file"] else ""))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
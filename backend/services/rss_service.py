@@ -3,33 +3,71 @@ import json
 import re
 from html import unescape
 
-import feedparser
-import httpx
 from datetime import datetime
 from sqlalchemy.orm import Session
 
-from models.tables import NewsSource, Article, ArticleSentence
+from models.tables import NewsSource, Article, ArticleSentence, ArchivedArticle
 from services.ai_service import generate_summary
+from services.dedup_service import find_duplicate, index_fingerprint, minhash
+from services.example_service import index_sentences
+from services.fetch_policy import due_sources, record_failure, record_success
+from services.profile_service import build_article_profile
+from services.segmenter import split_paragraphs, split_sentences
+from services.storage_service import article_text, ensure_compression_dictionary
+from services.lazy import lazy_module
+
+# 仅抓取时需要，延迟导入以缩短 Web 进程启动时间
+feedparser = lazy_module("feedparser")
+httpx = lazy_module("httpx")
 
 
 def fetch_all_sources(db: Session):
-    """抓取所有活跃 RSS 源的文章"""
+    """抓取所有活跃 RSS 源的文章（手动刷新，忽略抓取计划）"""
     sources = db.query(NewsSource).filter(NewsSource.is_active == True).all()
+    return _fetch_sources(db, sources)
+
+
+def fetch_due_sources(db: Session, limit: int = 3):
+    """只抓取已到期的源（调度器周期调用），每次最多 limit 个"""
+    return _fetch_sources(db, due_sources(db, limit=limit))
+
+
+def _fetch_sources(db: Session, sources: list[NewsSource]) -> int:
     total_new = 0
     for source in sources:
-        try:
-            count = _fetch_source(db, source)
-            total_new += count
-            source.last_fetched = datetime.utcnow()
-        except Exception as e:
-            print(f"[RSS] 抓取 {source.name} 失败: {e}")
+        total_new += fetch_source(db, source)
     db.commit()
+    # 语料足够后训练压缩字典，之后入库的句子压缩率更高
+    ensure_compression_dictionary(db)
     return total_new
 
 
+def fetch_source(db: Session, source: NewsSource) -> int:
+    """抓取单个源并更新其抓取计划；失败只回滚该源的写入"""
+    try:
+        with db.begin_nested():
+            return _fetch_source(db, source)
+    except Exception as e:
+        print(f"[RSS] 抓取 {source.name} 失败: {e}")
+        record_failure(source, str(e))
+        return 0
+
+
 def _fetch_source(db: Session, source: NewsSource) -> int:
-    """抓取单个 RSS 源"""
-    feed = feedparser.parse(source.url)
+    """抓取单个 RSS 源（条件请求：未修改时服务端返回 304）"""
+    feed = feedparser.parse(source.url, etag=source.etag, modified=source.last_modified)
+    status = getattr(feed, "status", None)
+    if status == 304:
+        record_success(source, 0, [])
+        return 0
+    if status and status >= 400:
+        raise RuntimeError(f"HTTP {status}")
+    if getattr(feed, "bozo", False) and not feed.entries:
+        raise RuntimeError(f"无法解析 feed: {getattr(feed, 'bozo_exception', '')}")
+
+    source.etag = getattr(feed, "etag", None)
+    source.last_modified = getattr(feed, "modified", None)
+    entry_times = [_parse_date(entry) for entry in feed.entries]
     new_count = 0
 
     for entry in feed.entries[:20]:  # 每个源最多20篇
@@ -37,9 +75,9 @@ def _fetch_source(db: Session, source: NewsSource) -> int:
         if not url:
             continue
 
-        # 去重
-        existing = db.query(Article).filter(Article.url == url).first()
-        if existing:
+        # 去重（含已归档文章）
+        existing = db.query(Article.id).filter(Article.url == url).first()
+        if existing or db.query(ArchivedArticle.id).filter(ArchivedArticle.url == url).first():
             continue
 
         title = entry.get("title", "Untitled")
@@ -48,89 +86,92 @@ def _fetch_source(db: Session, source: NewsSource) -> int:
         if len(content) < 100:
             continue
 
+        published_at = _parse_date(entry) or datetime.utcnow()
+
+        # 近重复（同一通稿的不同 URL）只记录指向原文的链接，跳过后续处理
+        signature = minhash(content)
+        canonical_id = find_duplicate(db, signature) if signature else None
+        if canonical_id:
+            db.add(Article(
+                source_id=source.id,
+                title=title,
+                url=url,
+                category=source.category,
+                published_at=published_at,
+                canonical_id=canonical_id,
+            ))
+            continue
+
         # 计算可读性和难度
         word_count = len(content.split())
         readability = _flesch_reading_ease(content)
         difficulty = _score_to_difficulty(readability)
 
-        # 拆分句子
-        sentences = _split_sentences(content)
+        # 拆分句子（句子即正文的唯一存储，Article.content 不再重复保存），记录所在段落
+        sentences = [
+            (paragraph, s)
+            for paragraph, block in enumerate(split_paragraphs(content))
+            for s in block if len(s) > 5
+        ]
 
         article = Article(
             source_id=source.id,
             title=title,
             url=url,
-            content=content,
             difficulty=difficulty,
             category=source.category,
             word_count=word_count,
             readability_score=readability,
-            published_at=_parse_date(entry),
+            published_at=published_at,
         )
         db.add(article)
         db.flush()  # 获取 article.id
+        if signature:
+            index_fingerprint(db, article, signature)
 
         # 保存句子
-        for i, sent in enumerate(sentences):
-            if sent.strip():
-                db.add(ArticleSentence(
-                    article_id=article.id,
-                    index=i,
-                    text_en=sent.strip(),
-                ))
+        sentence_rows = [
+            ArticleSentence(article_id=article.id, index=i, paragraph=paragraph, text_en=sent)
+            for i, (paragraph, sent) in enumerate(sentences)
+        ]
+        db.add_all(sentence_rows)
+        db.flush()  # 获取 sentence.id
+
+        # 增量维护例句倒排索引与词汇画像
+        index_sentences(db, sentence_rows)
+        build_article_profile(db, article, content)
 
         new_count += 1
 
+    record_success(source, new_count, entry_times)
     return new_count
 
 
-def recommend_articles(db: Session, count: int = 5) -> list[Article]:
-    """推荐今日可学文章：优先未读、混合难度"""
-    articles = (
+def generate_article_summary(db: Session, article_id: int):
+    """为文章生成 AI 摘要
+
+    并发请求在 ai_service 中合并为一次调用；写入为条件 UPDATE，
+    只有摘要仍为空时才写入，跨进程并发也不会重复覆盖。
+    """
+    summary = db.query(Article.summary).filter(Article.id == article_id).first()
+    if summary is None or summary[0]:
+        return
+    content = article_text(db, article_id)
+    if not content:
+        return
+    generated = generate_summary(content)
+    updated = (
         db.query(Article)
-        .filter(Article.is_read == False)
-        .order_by(Article.published_at.desc())
-        .limit(count * 3)
-        .all()
+        .filter(Article.id == article_id, Article.summary.is_(None) | (Article.summary == ""))
+        .update({Article.summary: generated}, synchronize_session=False)
     )
-
-    if not articles:
-        return []
-
-    # 混合难度：尝试各取一些
-    by_diff = {"easy": [], "medium": [], "hard": []}
-    for a in articles:
-        by_diff.get(a.difficulty, by_diff["medium"]).append(a)
-
-    result = []
-    for diff in ["medium", "easy", "hard"]:
-        for a in by_diff[diff]:
-            if len(result) >= count:
-                break
-            result.append(a)
-        if len(result) >= count:
-            break
-
-    # 标记为推荐
-    for a in result:
-        a.is_recommended = True
-    db.commit()
-
-    return result
-
-
-def generate_article_summary(db: Session, article_id: int):
-    """为文章生成 AI 摘要"""
-    article = db.query(Article).get(article_id)
-    if article and article.content and not article.summary:
-        article.summary = generate_summary(article.content)
+    if updated:
         db.commit()
 
 
 def _flesch_reading_ease(text: str) -> float:
     """内置 Flesch Reading Ease 计算（避免 textstat 依赖）"""
-    sentences = re.split(r'[.!?]+', text)
-    sentences = [s.strip() for s in sentences if s.strip()]
+    sentences = split_sentences(text)
     words = text.split()
     if not sentences or not words:
         return 50.0
@@ -327,13 +368,6 @@ def _clean_extracted_text(text: str) -> str:
     return "\n".join(lines).strip()
 
 
-def _split_sentences(text: str) -> list[str]:
-    """将文本拆分为句子"""
-    # 按照句号、感叹号、问号拆分，保留缩写
-    sentences = re.split(r'(?<=[.!?])\s+(?=[A-Z])', text)
-    return [s for s in sentences if len(s.strip()) > 5]
-
-
 def _to_text(html_snippet: str) -> str:
     """将 HTML 片段转换为较干净的纯文本"""
     snippet = re.sub(r"<script[^>]*>.*?</script>", " ", html_snippet, flags=re.IGNORECASE | re.DOTALL)
@@ -1,45 +1,163 @@
-"""APScheduler 定时任务调度"""
+"""APScheduler 定时任务调度
+
+调度器可运行在 Web 进程内（SCHEDULER_ENABLED=true）或独立的 worker.py 中。
+多个实例同时运行时，通过数据库租约选出唯一的执行者：每个任务执行前
+获取/续约租约，心跳任务在长任务期间保持续约；未持有租约的实例跳过任务，
+并在持有者失联、租约过期后自动接管。
+"""
+import functools
+import time
+from datetime import datetime, timedelta
+
 from apscheduler.schedulers.background import BackgroundScheduler
+from sqlalchemy import func
+
 from models.database import SessionLocal
-from services.rss_service import fetch_all_sources
+from models.tables import NewsSource
+from services.lease_service import acquire_lease, make_owner, release_lease
+from services.job_queue import process_jobs
+from services.rss_service import fetch_due_sources
+from services.retention_service import apply_retention
+from services import metrics
 from config import settings
 
 scheduler = BackgroundScheduler()
 
+LEASE_NAME = "scheduler"
+# 租约有效期（秒），心跳每 1/3 有效期续约一次
+LEASE_TTL = 120
+_owner = make_owner()
 
-def _fetch_rss_job():
-    """定时抓取 RSS 的任务"""
+
+def _holds_lease() -> bool:
+    """获取或续约调度租约"""
     db = SessionLocal()
     try:
-        count = fetch_all_sources(db)
-        print(f"[Scheduler] RSS 抓取完成，新增 {count} 篇文章")
+        return acquire_lease(db, LEASE_NAME, _owner, LEASE_TTL)
     except Exception as e:
-        print(f"[Scheduler] RSS 抓取失败: {e}")
+        print(f"[Scheduler] 租约获取失败: {e}")
+        return False
+    finally:
+        db.close()
+
+
+def _exclusive(label: str):
+    """仅在本实例持有租约时执行任务，记录耗时与结果（ok / error / skipped）"""
+    def decorator(job):
+        name = job.__name__.strip("_").removesuffix("_job")
+
+        @functools.wraps(job)
+        def wrapper():
+            if not _holds_lease():
+                metrics.observe_job(name, 0.0, "skipped")
+                return
+            start = time.perf_counter()
+            outcome = "ok"
+            try:
+                job()
+            except Exception as e:
+                outcome = "error"
+                print(f"[Scheduler] {label}失败: {e}")
+            finally:
+                metrics.observe_job(name, time.perf_counter() - start, outcome)
+        return wrapper
+    return decorator
+
+
+@_exclusive("RSS 抓取")
+def _fetch_rss_job():
+    """定时检查并抓取到期 RSS 源的任务"""
+    db = SessionLocal()
+    try:
+        count = fetch_due_sources(db)
+        if count:
+            print(f"[Scheduler] RSS 抓取完成，新增 {count} 篇文章")
+    finally:
+        db.close()
+
+
+@_exclusive("AI 任务执行")
+def _ai_jobs_job():
+    """执行到期的 AI 队列任务"""
+    db = SessionLocal()
+    try:
+        process_jobs(db)
+    finally:
+        db.close()
+
+
+@_exclusive("归档")
+def _retention_job():
+    """定时归档过期文章的任务"""
+    db = SessionLocal()
+    try:
+        result = apply_retention(db)
+        print(f"[Scheduler] 归档完成，归档 {result['archived']} 篇文章")
+    finally:
+        db.close()
+
+
+def _fetched_recently() -> bool:
+    """最近一个抓取间隔内有源成功抓取过（重启时无需立即检查）"""
+    db = SessionLocal()
+    try:
+        last = db.query(func.max(NewsSource.last_success_at)).scalar()
     finally:
         db.close()
+    return last is not None and datetime.utcnow() - last < timedelta(hours=settings.rss_fetch_interval)
 
 
 def start_scheduler():
     """启动调度器"""
+    scheduler.add_job(
+        _holds_lease,
+        "interval",
+        seconds=LEASE_TTL // 3,
+        id="lease_heartbeat",
+        replace_existing=True,
+    )
     scheduler.add_job(
         _fetch_rss_job,
         "interval",
-        hours=settings.rss_fetch_interval,
+        minutes=settings.rss_tick_minutes,
         id="rss_fetch",
         replace_existing=True,
     )
-    # 启动时立即执行一次
     scheduler.add_job(
-        _fetch_rss_job,
-        "date",
-        id="rss_fetch_initial",
+        _ai_jobs_job,
+        "interval",
+        seconds=5,
+        id="ai_jobs",
+        replace_existing=True,
+    )
+    scheduler.add_job(
+        _retention_job,
+        "interval",
+        hours=24,
+        id="retention",
         replace_existing=True,
     )
+    # 启动时立即检查一次到期源（抓取计划见 fetch_policy，不会全量重抓）；
+    # 近期刚抓取过则交给周期任务，避免频繁重启时每次都发起网络请求
+    if not _fetched_recently():
+        scheduler.add_job(
+            _fetch_rss_job,
+            "date",
+            id="rss_fetch_initial",
+            replace_existing=True,
+        )
     scheduler.start()
-    print(f"[Scheduler] 已启动，RSS 每 {settings.rss_fetch_interval} 小时抓取一次")
+    print(f"[Scheduler] 已启动，每 {settings.rss_tick_minutes} 分钟检查到期的 RSS 源")
 
 
 def shutdown_scheduler():
     """关闭调度器"""
     scheduler.shutdown(wait=False)
+    db = SessionLocal()
+    try:
+        release_lease(db, LEASE_NAME, _owner)
+    except Exception as e:
+        print(f"[Scheduler] 租约释放失败: {e}")
+    finally:
+        db.close()
     print("[Scheduler] 已关闭")
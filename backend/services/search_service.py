@@ -0,0 +1,182 @@
+"""全文检索服务 —— 基于 SQLite FTS5 的文章/句子/生词搜索
+
+索引为 external content 表，由触发器与源表保持同步；
+英文列使用 porter 词干分词，中文列使用 trigram 分词（查询至少 3 个字）。
+句子正文压缩存储，触发器与内容视图通过 unz() 解压（见 models.compression）。
+文章正文不再单独存储，文章检索 = 标题命中 + 句子命中按文章聚合；两个索引的
+bm25 不可直接比较，各自除以本次查询中该索引的最佳分数归一化到 (0, 1] 后再合并。
+"""
+import re
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+_EN_TOKENIZER = "porter unicode61 remove_diacritics 2"
+
+# 解压后的句子视图，作为句子 FTS 的 external content
+_VIEWS = {
+    "article_sentence_text": (
+        "CREATE VIEW article_sentence_text AS "
+        "SELECT id, unz(text_en) AS text_en, unz(text_zh) AS text_zh FROM article_sentence"
+    ),
+}
+
+# FTS 表名 -> (源表, 内容表/视图, 列, 分词器, 压缩列)
+_FTS = {
+    "article_fts": ("article", "article", ["title"], _EN_TOKENIZER, set()),
+    "sentence_fts": ("article_sentence", "article_sentence_text", ["text_en"], _EN_TOKENIZER, {"text_en"}),
+    "sentence_zh_fts": ("article_sentence", "article_sentence_text", ["text_zh"], "trigram", {"text_zh"}),
+    "vocab_fts": ("vocab_item", "vocab_item", ["word", "lemma", "definition_en", "example_sentence"],
+                  _EN_TOKENIZER, set()),
+    "vocab_zh_fts": ("vocab_item", "vocab_item", ["definition"], "trigram", set()),
+}
+
+# scope -> 各语言使用的 FTS 表及 bm25 列权重
+_SCOPES = {
+    "articles": {"en": ("sentence_fts", [1.0]), "zh": ("sentence_zh_fts", [1.0])},
+    "sentences": {"en": ("sentence_fts", [1.0]), "zh": ("sentence_zh_fts", [1.0])},
+    "vocab": {"en": ("vocab_fts", [10.0, 5.0, 1.0, 0.5]), "zh": ("vocab_zh_fts", [1.0])},
+}
+# 标题命中（归一化后）相对句子命中的权重
+_TITLE_WEIGHT = 2.0
+
+SCOPES = tuple(_SCOPES)
+
+_CJK = re.compile(r"[㐀-鿿豈-﫿]")
+_SNIPPET = "'<mark>', '</mark>', '…', 16"
+
+
+def init_search_index(engine: Engine):
+    """创建/更新 FTS5 虚拟表、内容视图与同步触发器
+
+    与 sqlite_master 中已有定义逐一比对，定义变化的对象会被删除重建，
+    新建（或重建）的 FTS 表从内容表全量 rebuild。
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    with engine.begin() as conn:
+        existing = dict(conn.execute(text(
+            "SELECT name, sql FROM sqlite_master WHERE type IN ('table', 'view', 'trigger')"
+        )).all())
+
+        for name, ddl in _VIEWS.items():
+            _ensure(conn, existing, "VIEW", name, ddl)
+
+        for fts, (table, content, columns, tokenizer, compressed) in _FTS.items():
+            ddl = (
+                f"CREATE VIRTUAL TABLE {fts} USING fts5({', '.join(columns)}, content='{content}', "
+                f"content_rowid='id', tokenize='{tokenizer}')"
+            )
+            if _ensure(conn, existing, "TABLE", fts, ddl):
+                conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+            for name, ddl in _trigger_ddl(table, fts, columns, compressed).items():
+                _ensure(conn, existing, "TRIGGER", name, ddl)
+
+
+def _ensure(conn, existing: dict[str, str], kind: str, name: str, ddl: str) -> bool:
+    """对象不存在或定义不同则(重新)创建，返回是否执行了创建"""
+    if existing.get(name) == ddl:
+        return False
+    if name in existing:
+        conn.execute(text(f"DROP {kind} {name}"))
+    conn.execute(text(ddl))
+    return True
+
+
+def _trigger_ddl(table: str, fts: str, columns: list[str], compressed: set[str]) -> dict[str, str]:
+    def values(prefix):
+        return ", ".join(f"unz({prefix}.{c})" if c in compressed else f"{prefix}.{c}" for c in columns)
+
+    cols = ", ".join(columns)
+    delete = f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {values('old')});"
+    insert = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {values('new')});"
+    return {
+        f"{fts}_ai": f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN {insert} END",
+        f"{fts}_ad": f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN {delete} END",
+        f"{fts}_au": f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN {delete} {insert} END",
+    }
+
+
+def search(db: Session, query: str, scope: str = "articles", limit: int = 20, offset: int = 0) -> dict:
+    """BM25 排序的全文检索，返回 {query, scope, total, items}"""
+    is_zh = bool(_CJK.search(query))
+    fts, weights = _SCOPES[scope]["zh" if is_zh else "en"]
+    match = _to_match_query(query, prefix=not is_zh)
+
+    result = {"query": query, "scope": scope, "total": 0, "items": []}
+    if not match:
+        return result
+
+    params = {"match": match, "limit": limit, "offset": offset}
+    bm25 = f"bm25({fts}, {', '.join(str(w) for w in weights)})"
+    snippet = f"snippet({fts}, -1, {_SNIPPET})"
+
+    if scope == "articles":
+        # 标题与句子命中合并，每篇文章取最相关的一处作为片段；
+        # 分数按来源索引归一化（除以该索引的最佳分数），仍保持"越小越相关"
+        title_hits = "" if is_zh else f"""
+            SELECT rowid AS article_id, bm25(article_fts) AS raw, {_TITLE_WEIGHT} AS weight, 'title' AS source,
+                   highlight(article_fts, 0, '<mark>', '</mark>') AS snippet
+            FROM article_fts WHERE article_fts MATCH :match
+            UNION ALL"""
+        hits = f"""
+            WITH raw_hits AS ({title_hits}
+                SELECT s.article_id, {bm25} AS raw, 1.0 AS weight, 'sentence' AS source, {snippet} AS snippet
+                FROM {fts} JOIN article_sentence s ON s.id = {fts}.rowid
+                WHERE {fts} MATCH :match
+            ), hits AS (
+                SELECT article_id, snippet,
+                       -weight * raw / NULLIF(min(raw) OVER (PARTITION BY source), 0) AS score
+                FROM raw_hits
+            )"""
+        count_sql = f"""{hits} SELECT count(DISTINCT h.article_id) FROM hits h
+            JOIN article a ON a.id = h.article_id AND a.canonical_id IS NULL"""
+        sql = f"""{hits}, best AS (
+                SELECT article_id, min(score) AS score, snippet FROM hits GROUP BY article_id
+            )
+            SELECT a.id, a.id AS article_id, a.title, a.difficulty, best.snippet, best.score
+            FROM best JOIN article a ON a.id = best.article_id AND a.canonical_id IS NULL
+            ORDER BY best.score LIMIT :limit OFFSET :offset"""
+    elif scope == "sentences":
+        count_sql = f"SELECT count(*) FROM {fts} WHERE {fts} MATCH :match"
+        sql = f"""
+            SELECT s.id, s.article_id, a.title, a.difficulty, {snippet} AS snippet, {bm25} AS score
+            FROM {fts} JOIN article_sentence s ON s.id = {fts}.rowid
+            JOIN article a ON a.id = s.article_id
+            WHERE {fts} MATCH :match ORDER BY score LIMIT :limit OFFSET :offset"""
+    else:
+        count_sql = f"SELECT count(*) FROM {fts} WHERE {fts} MATCH :match"
+        sql = f"""
+            SELECT v.id, v.article_id, v.word AS title, NULL AS difficulty, {snippet} AS snippet, {bm25} AS score
+            FROM {fts} JOIN vocab_item v ON v.id = {fts}.rowid
+            WHERE {fts} MATCH :match ORDER BY score LIMIT :limit OFFSET :offset"""
+
+    result["total"] = db.execute(text(count_sql), params).scalar() or 0
+    if not result["total"]:
+        return result
+
+    for row in db.execute(text(sql), params).mappings():
+        result["items"].append({
+            "type": scope,
+            "id": row["id"],
+            "article_id": row["article_id"],
+            "title": row["title"],
+            "difficulty": row["difficulty"],
+            "snippet": row["snippet"] or "",
+            # bm25 越小越相关，对外统一为越大越相关
+            "score": round(-row["score"], 4),
+        })
+    return result
+
+
+def _to_match_query(query: str, prefix: bool = True) -> str:
+    """将用户输入转换为安全的 FTS5 查询：各词加引号 AND 连接，末词前缀匹配"""
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        return ""
+    quoted = [f'"{t}"' for t in terms]
+    if prefix:
+        quoted[-1] += "*"
+    return " ".join(quoted)
@@ -0,0 +1,126 @@
+"""英文分句 —— 缩写表 + 引号/括号感知的单遍扫描器
+
+入库拆句与可读性评分共用。扫描器用一个预编译正则依次匹配括号、换行与
+句末标点，在每个候选句末处根据前一个词（缩写、姓名首字母）、后一个词
+（是否大写开头）以及括号嵌套深度判断是否断句：
+
+    - 称谓缩写（Mr. Dr. Sen. …）后从不断句
+    - 其他缩写（U.S. Inc. etc. …）后仅当下一词是常见句首词时断句
+    - 句末标点后紧跟的右引号/右括号归入前一句
+    - 括号内不断句；但本段后续 _BRACKET_SPAN 个字符内没有右括号的左括号视为
+      孤立括号，遇到句末即不再计入，避免一个括号吞掉整段
+    - 换行视为段落边界，总是断句
+"""
+import re
+
+# 其后必接人名/名词，从不作句末
+_TITLES = frozenset(
+    "mr mrs ms dr prof sr jr st sen rep gov gen col lt sgt capt cmdr adm rev hon pres supt det "
+    "messrs mme mlle".split()
+)
+
+# 可能出现在句末的缩写：其后只有常见句首词才断句
+_ABBREVIATIONS = frozenset(
+    "inc ltd co corp plc llc bros dept univ assn est approx etc vs al fig no nos vol vols pp ed eds "
+    "jan feb mar apr jun jul aug sep sept oct nov dec mon tue tues wed thu thur thurs fri sat sun "
+    "ave blvd rd mt ft ph mph km kg lb lbs oz min max cf viz".split()
+)
+
+_SENTENCE_STARTERS = frozenset(
+    "the a an he she it they we i you his her its their our this that these those there here "
+    "but and so yet however meanwhile in on at after before when while if as for mr mrs ms dr "
+    "some many most officials analysts critics".split()
+)
+
+_SCAN = re.compile(
+    r"(?P<open>[(\[{])"
+    r"|(?P<close>[)\]}])"
+    r"|(?P<newline>\n\s*)"
+    r"|(?P<end>(?:[.!?]+|…)[\"'”’)\]}]*)(?=\s|$)"
+)
+_NEXT_WORD = re.compile(r"\s*([\"'“‘(\[]*)(\S*)")
+_DOTTED = re.compile(r"^(?:[a-z]\.)+[a-z]$")
+# 前一词的回看窗口
+_LOOKBEHIND = 24
+# 括号内句末处向后查找右括号的范围
+_BRACKET_SPAN = 300
+_CLOSE = re.compile(r"[)\]}]")
+
+
+def split_sentences(text: str) -> list[str]:
+    """将文本拆分为句子（去除首尾空白，丢弃空句）"""
+    sentences = []
+    append = sentences.append
+    start = 0
+    depth = 0
+    for m in _SCAN.finditer(text):
+        kind = m.lastgroup
+        if kind == "end":
+            if depth:
+                token = m.group()
+                depth = max(0, depth - token.count(")") - token.count("]") - token.count("}"))
+                if depth and _closes_ahead(text, m.end()):
+                    continue
+                depth = 0
+            stop = m.end()
+            if not _is_boundary(text, m.start(), stop):
+                continue
+        elif kind == "open":
+            depth += 1
+            continue
+        elif kind == "close":
+            if depth:
+                depth -= 1
+            continue
+        else:
+            depth = 0
+            stop = m.end()
+
+        sentence = text[start:stop].strip()
+        if sentence:
+            append(sentence)
+        start = stop
+
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+    return sentences
+
+
+def split_paragraphs(text: str) -> list[list[str]]:
+    """按换行分段后逐段分句，丢弃空段；段内结果与 split_sentences 一致"""
+    return [sentences for block in text.split("\n") if (sentences := split_sentences(block))]
+
+
+def _closes_ahead(text: str, pos: int) -> bool:
+    """本段内（不跨换行）_BRACKET_SPAN 个字符内是否还有右括号"""
+    limit = text.find("\n", pos, pos + _BRACKET_SPAN)
+    return _CLOSE.search(text, pos, limit if limit != -1 else pos + _BRACKET_SPAN) is not None
+
+
+def _is_boundary(text: str, end_start: int, end_stop: int) -> bool:
+    """句末标点 text[end_start:end_stop] 处是否断句"""
+    quote, word = _NEXT_WORD.match(text, end_stop).groups()
+    if not quote:
+        if not word:
+            return True  # 文本结尾
+        first = word[0]
+        if not (first.isupper() or first.isdigit()):
+            return False
+
+    if text[end_start] != ".":
+        return True
+
+    # 前一词：句点前最后一段非空白（去掉左引号/括号）
+    window = text[max(0, end_start - _LOOKBEHIND):end_start].split()
+    token = window[-1].lstrip("\"'“‘([{") if window else ""
+    if not token or not token[0].isalpha():
+        return True
+    lower = token.lower().rstrip(".")
+    if len(token) == 1 and token.isupper():
+        return False  # 姓名首字母 J. K. Rowling
+    if lower in _TITLES:
+        return False
+    if lower in _ABBREVIATIONS or _DOTTED.match(lower):
+        return word.lower().strip("\"'“‘,") in _SENTENCE_STARTERS
+    return True
@@ -0,0 +1,112 @@
+"""文章存储服务 —— 正文只存一份（压缩的句子），按需重建
+
+入库后 Article.content 不再写入，正文由句子按序拼接得到（同段以空格、跨段以换行连接）；
+句子 text_en/text_zh 以 CompressedText 压缩存储，读取时才解压。
+
+    python -m services.storage_service train    # 用现有句子训练新的压缩字典
+    python -m services.storage_service vacuum   # 回收迁移/清理后的空闲页
+"""
+import argparse
+import random
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from models import compression
+from models.tables import Article, ArticleSentence, CompressionDict
+
+# 自动训练字典所需的最少句子数
+MIN_TRAINING_SENTENCES = 2000
+# 训练时抽样的句子数
+TRAINING_SAMPLE_SIZE = 20000
+
+
+def article_text(db: Session, article_id: int) -> str:
+    """重建文章正文：按句序拼接句子；迁移前的旧数据直接返回原 content"""
+    sentences = (
+        db.query(ArticleSentence.text_en, ArticleSentence.paragraph)
+        .filter(ArticleSentence.article_id == article_id)
+        .order_by(ArticleSentence.index)
+        .all()
+    )
+    if sentences:
+        return join_sentences(sentences)
+    return db.query(Article.content).filter(Article.id == article_id).scalar() or ""
+
+
+def join_sentences(sentences) -> str:
+    """(句子, 段落序号) 序列 -> 正文；段落序号缺失（旧数据）时视为同一段"""
+    parts = []
+    previous = None
+    for sentence, paragraph in sentences:
+        if parts:
+            parts.append("\n" if paragraph is not None and paragraph != previous else " ")
+        parts.append(sentence)
+        previous = paragraph
+    return "".join(parts)
+
+
+def train_compression_dictionary(db: Session, sample_size: int = TRAINING_SAMPLE_SIZE) -> CompressionDict | None:
+    """从已存句子抽样训练新字典并设为当前写入字典；样本不足返回 None"""
+    max_id = db.query(func.max(ArticleSentence.id)).scalar() or 0
+    if not max_id:
+        return None
+
+    # 按 id 随机抽样，避免全表排序
+    ids = random.sample(range(1, max_id + 1), min(sample_size, max_id))
+    samples = []
+    for i in range(0, len(ids), 500):
+        rows = db.query(ArticleSentence.text_en).filter(ArticleSentence.id.in_(ids[i:i + 500])).all()
+        samples.extend(t for (t,) in rows if t)
+    if len(samples) < min(MIN_TRAINING_SENTENCES, max_id):
+        return None
+
+    entry = CompressionDict(data=compression.train_dictionary(samples), sample_count=len(samples))
+    db.add(entry)
+    db.commit()
+    compression.register_dictionary(entry.id, entry.data, bind=db)
+    return entry
+
+
+def ensure_compression_dictionary(db: Session) -> bool:
+    """尚无字典且语料足够时自动训练一次，返回当前是否有可用字典"""
+    if db.query(CompressionDict.id).first():
+        return True
+    if db.query(func.count(ArticleSentence.id)).scalar() < MIN_TRAINING_SENTENCES:
+        return False
+    return train_compression_dictionary(db) is not None
+
+
+def vacuum(db: Session):
+    """回收 SQLite 空闲页（需在事务外执行）"""
+    db.commit()
+    with db.get_bind().connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("VACUUM"))
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="文章存储管理")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("train", help="用现有句子训练新的压缩字典")
+    sub.add_parser("vacuum", help="回收数据库空闲空间")
+    args = parser.parse_args(argv)
+
+    from models.database import SessionLocal, init_db
+    init_db()
+    db = SessionLocal()
+    try:
+        if args.command == "train":
+            entry = train_compression_dictionary(db)
+            if entry:
+                print(f"[Storage] 已训练字典 #{entry.id}（{len(entry.data)} 字节，{entry.sample_count} 个样本）")
+            else:
+                print("[Storage] 句子样本不足，未训练字典")
+        else:
+            vacuum(db)
+            print("[Storage] VACUUM 完成")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
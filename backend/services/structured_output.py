@@ -0,0 +1,126 @@
+"""结构化输出 —— 容错的增量 JSON 解析 + 按 schema 校验
+
+模型返回的 JSON 常见问题：包在 ```json 代码块或说明文字里、末尾多逗号、
+因 max_tokens 截断而缺少右引号/右括号。JSONRepairParser 逐块喂入文本，
+边读边记录括号栈与"安全截断点"（逗号前、开括号后、闭括号后），
+任意时刻都能补齐未闭合的字符串和括号，得到尽可能完整的值；
+补齐失败时回退到最近的安全截断点，丢弃最后一个不完整的成员。
+"""
+import json
+from typing import Any
+
+from pydantic import BaseModel, ValidationError
+
+_CLOSERS = {"{": "}", "[": "]"}
+# 说明文字中可能出现的误匹配括号，最多尝试的起始位置数
+MAX_START_ATTEMPTS = 3
+
+
+class StructuredOutputError(ValueError):
+    """模型输出无法解析或不符合 schema"""
+
+
+class JSONRepairParser:
+    """增量 JSON 解析器：feed() 追加文本，value() 返回当前可解析出的最完整值"""
+
+    def __init__(self):
+        self._buf: list[str] = []
+        self._stack: list[str] = []              # 待补齐的闭括号
+        self._boundaries: list[tuple[int, tuple[str, ...]]] = []  # (截断位置, 当时的括号栈)
+        self._in_string = False
+        self._escape = False
+        self._last_token = -1                    # 字符串外最后一个非空白字符的位置
+        self.started = False
+        self.done = False
+
+    def feed(self, chunk: str):
+        buf, stack = self._buf, self._stack
+        for ch in chunk:
+            if self.done:
+                return
+            if not self.started:
+                # 跳过代码块标记、说明文字，直到第一个 { 或 [
+                if ch not in _CLOSERS:
+                    continue
+                self.started = True
+
+            pos = len(buf)
+            buf.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._last_token = pos
+                continue
+            if ch.isspace():
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in _CLOSERS:
+                stack.append(_CLOSERS[ch])
+                self._boundaries.append((pos + 1, tuple(stack)))
+            elif ch in "}]":
+                # 去掉闭括号前多余的逗号
+                if self._last_token >= 0 and buf[self._last_token] == ",":
+                    buf[self._last_token] = ""
+                if stack:
+                    stack.pop()
+                self._boundaries.append((pos + 1, tuple(stack)))
+                if not stack:
+                    self.done = True
+            elif ch == ",":
+                self._boundaries.append((pos, tuple(stack)))
+            self._last_token = pos
+
+    def value(self) -> Any:
+        """返回当前文本能修复出的值；没有任何可用内容时抛出 ValueError"""
+        if not self.started:
+            raise ValueError("no JSON value found")
+
+        text = "".join(self._buf)
+        if self.done:
+            return json.loads(text, strict=False)
+
+        # 先尝试原样补齐：闭合字符串、去掉末尾逗号/冒号、补齐括号
+        tail = text[:-1] if self._escape else text
+        if self._in_string:
+            tail += '"'
+        candidates = [tail.rstrip().rstrip(",") + "".join(reversed(self._stack))]
+        for pos, stack in reversed(self._boundaries):
+            candidates.append("".join(self._buf[:pos]).rstrip().rstrip(",") + "".join(reversed(stack)))
+
+        for candidate in candidates:
+            try:
+                return json.loads(candidate, strict=False)
+            except json.JSONDecodeError:
+                continue
+        raise ValueError("unable to repair JSON output")
+
+
+def parse_json(text: str) -> Any:
+    """容错解析一段模型输出中的 JSON；从第一个括号开始，失败时尝试后续括号"""
+    start = 0
+    for _ in range(MAX_START_ATTEMPTS):
+        positions = [p for p in (text.find("{", start), text.find("[", start)) if p >= 0]
+        if not positions:
+            break
+        begin = min(positions)
+        parser = JSONRepairParser()
+        parser.feed(text[begin:])
+        try:
+            return parser.value()
+        except ValueError:
+            start = begin + 1
+    raise ValueError("no parsable JSON in model output")
+
+
+def parse(text: str, schema: type[BaseModel]) -> dict:
+    """解析并按 schema 校验，返回规范化后的 dict"""
+    try:
+        return schema.model_validate(parse_json(text)).model_dump()
+    except (ValueError, ValidationError) as e:
+        raise StructuredOutputError(f"{schema.__name__}: {e}") from e
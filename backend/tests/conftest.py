@@ -0,0 +1,11 @@
+"""测试公共配置
+
+pytest 在收集任何测试模块之前加载本文件：数据库地址必须在 config / models.database
+首次导入前指向测试库，否则先导入的模块会让引擎连接到正式库 data/english_learning.db。
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+os.environ["DATABASE_URL"] = "sqlite:///./data/test.db"
@@ -0,0 +1,242 @@
+"""AI 服务调用合并与模型路由测试"""
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+
+from services import ai_service
+
+
+class _FakeClient:
+    """模拟上游：记录调用次数，延迟返回以制造并发窗口"""
+
+    def __init__(self, reply="ok", error=None):
+        self.calls = 0
+        self.reply = reply
+        self.error = error
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        self.calls += 1
+        time.sleep(0.1)
+        if self.error:
+            raise self.error
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self.reply))])
+
+
+def _run_concurrently(fn, n=5):
+    results, errors = [], []
+
+    def worker():
+        try:
+            results.append(fn())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+def test_identical_concurrent_calls_share_one_upstream_request(monkeypatch):
+    client = _FakeClient(reply="你好")
+    monkeypatch.setattr(ai_service, "_get_client", lambda: client)
+
+    results, errors = _run_concurrently(lambda: ai_service._chat([{"role": "user", "content": "hello"}]))
+    assert errors == []
+    assert results == ["你好"] * 5
+    assert client.calls == 1
+
+    # 完成后的新调用重新请求上游
+    ai_service._chat([{"role": "user", "content": "hello"}])
+    assert client.calls == 2
+
+
+def test_different_requests_are_not_merged(monkeypatch):
+    client = _FakeClient()
+    monkeypatch.setattr(ai_service, "_get_client", lambda: client)
+    _run_concurrently(lambda: ai_service._chat([{"role": "user", "content": "a"}]), n=2)
+    _run_concurrently(lambda: ai_service._chat([{"role": "user", "content": "a"}], temperature=0.1), n=2)
+    assert client.calls == 2
+
+
+def test_errors_are_shared_with_waiters(monkeypatch):
+    client = _FakeClient(error=RuntimeError("upstream down"))
+    monkeypatch.setattr(ai_service, "_get_client", lambda: client)
+    results, errors = _run_concurrently(lambda: ai_service._chat([{"role": "user", "content": "x"}]), n=3)
+    assert results == []
+    assert len(errors) == 3 and all(str(e) == "upstream down" for e in errors)
+    assert client.calls == 1
+
+
+def test_summary_is_written_once(monkeypatch):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from models import compression
+    from models.database import Base
+    from models.tables import Article
+    from services import rss_service
+
+    engine = create_engine("sqlite://")
+    compression.install(engine)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(Article(id=1, title="t", url="u", content="Body text."))
+    db.commit()
+
+    replies = iter(["第一份摘要", "第二份摘要"])
+
+    def summary_racing_with_other_writer(text):
+        # 模拟另一进程在本次生成期间先写入了摘要
+        db.execute(Article.__table__.update().values(summary="其他进程的摘要"))
+        return next(replies)
+
+    monkeypatch.setattr(rss_service, "generate_summary", summary_racing_with_other_writer)
+    rss_service.generate_article_summary(db, 1)
+    db.commit()
+    assert db.query(Article.summary).filter(Article.id == 1).scalar() == "其他进程的摘要"
+
+
+class _RoutedClient:
+    """按模型名返回不同结果/延迟/异常的上游"""
+
+    def __init__(self, behaviours: dict):
+        self.behaviours = behaviours
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        self.requests.append(kwargs)
+        delay, outcome = self.behaviours[kwargs["model"]]
+        time.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=outcome))])
+
+
+def _route(monkeypatch, feature, **route):
+    from config import AIRoute
+
+    monkeypatch.setattr(ai_service.settings, "ai_model", "big")
+    monkeypatch.setattr(ai_service.settings, "ai_fast_model", "small")
+    monkeypatch.setitem(ai_service.settings.ai_routes, feature, AIRoute(**route))
+
+
+def test_route_selects_model_and_parameters(monkeypatch):
+    _route(monkeypatch, "definition", model="fast", temperature=0.2, max_tokens=100, timeout=5)
+    client = _RoutedClient({"small": (0, "{}")})
+    monkeypatch.setattr(ai_service, "_get_client", lambda: client)
+
+    ai_service._chat([{"role": "user", "content": "word"}], feature="definition")
+    request = client.requests[0]
+    assert (request["model"], request["temperature"], request["max_tokens"], request["timeout"]) == (
+        "small", 0.2, 100, 5,
+    )
+
+
+def test_falls_back_to_fast_model_on_timeout(monkeypatch):
+    _route(monkeypatch, "explain", fallback="fast")
+    client = _RoutedClient({"big": (0, TimeoutError("slow")), "small": (0, "fallback answer")})
+    monkeypatch.setattr(ai_service, "_get_client", lambda: client)
+
+    assert ai_service._chat([{"role": "user", "content": "q"}], feature="explain") == "fallback answer"
+    assert [r["model"] for r in client.requests] == ["big", "small"]
+
+
+def test_request_errors_do_not_fall_back(monkeypatch):
+    _route(monkeypatch, "explain", fallback="fast")
+    client = _RoutedClient({"big": (0, ValueError("bad prompt")), "small": (0, "unused")})
+    monkeypatch.setattr(ai_service, "_get_client", lambda: client)
+
+    with pytest.raises(ValueError):
+        ai_service._chat([{"role": "user", "content": "q2"}], feature="explain")
+    assert [r["model"] for r in client.requests] == ["big"]
+
+
+def test_hedges_slow_primary_with_fast_model(monkeypatch):
+    _route(monkeypatch, "translate", fallback="fast", hedge_after=0.05)
+    client = _RoutedClient({"big": (0.5, "slow answer"), "small": (0, "fast answer")})
+    monkeypatch.setattr(ai_service, "_get_client", lambda: client)
+
+    start = time.perf_counter()
+    assert ai_service._chat([{"role": "user", "content": "hi"}], feature="translate") == "fast answer"
+    assert time.perf_counter() - start < 0.4
+
+
+def test_json_routes_request_response_format(monkeypatch):
+    _route(monkeypatch, "speaking", json_mode=True)
+    client = _RoutedClient({"big": (0, '```json\n{"reply": "Nice to meet you!", "correction": null, "sugg')})
+    monkeypatch.setattr(ai_service, "_get_client", lambda: client)
+
+    result = ai_service.speaking_reply([{"role": "user", "content": "hello"}])
+    assert client.requests[0]["response_format"] == {"type": "json_object"}
+    # 截断在最后一个字段，前面的完整字段仍被采用
+    assert result == {"reply": "Nice to meet you!", "correction": None, "suggestion": None}
+
+
+def test_rejected_response_format_is_disabled(monkeypatch):
+    import httpx
+    import openai
+
+    _route(monkeypatch, "translate", json_mode=True)
+    monkeypatch.setattr(ai_service, "_json_mode_supported", True)
+    rejection = openai.BadRequestError(
+        "response_format is not supported", response=httpx.Response(400, request=httpx.Request("POST", "http://x")),
+        body=None,
+    )
+
+    class _Client(_RoutedClient):
+        def _create(self, **kwargs):
+            if "response_format" in kwargs:
+                self.requests.append(kwargs)
+                raise rejection
+            return super()._create(**kwargs)
+
+    client = _Client({"big": (0, '{"translation": "你好"}')})
+    monkeypatch.setattr(ai_service, "_get_client", lambda: client)
+
+    assert ai_service.translate_text("hello") == {"translation": "你好", "explanation": ""}
+    assert ai_service._json_mode_supported is False
+    assert "response_format" not in client.requests[-1]
+
+
+def test_writing_schema_normalizes_and_degrades(monkeypatch):
+    _route(monkeypatch, "writing")
+    client = _RoutedClient({"big": (0, '{"score": "85", "grammar_issues": ["时态错误", "冠词缺失"],}')})
+    monkeypatch.setattr(ai_service, "_get_client", lambda: client)
+    result = ai_service.evaluate_writing("t", "Some essay.")
+    assert result["score"] == 85
+    assert result["grammar_issues"] == '["时态错误", "冠词缺失"]'
+
+    client.behaviours["big"] = (0, "Sorry, I can't grade this.")
+    result = ai_service.evaluate_writing("t", "Another essay.")
+    assert result["score"] is None and result["grammar_issues"] == "Sorry, I can't grade this."
+
+
+def test_client_does_not_retry_before_fallback(monkeypatch):
+    """SDK 内部重试会推迟降级；重试由 fallback 与任务队列负责"""
+    monkeypatch.setattr(ai_service.settings, "ai_api_key", "test")
+    assert ai_service._get_client().max_retries == 0
+
+
+def test_translate_sentences_marks_missing_lines_as_none(monkeypatch):
+    monkeypatch.setattr(ai_service, "_chat", lambda messages, feature="chat": "一\n二\n")
+    assert ai_service.translate_sentences(["One.", "Two.", "Three."]) == ["一", "二", None]
+
+
+def test_truncated_replies_are_failures(monkeypatch):
+    response = SimpleNamespace(choices=[SimpleNamespace(
+        message=SimpleNamespace(content='{"translation": "你'), finish_reason="length")])
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **kw: response)))
+    monkeypatch.setattr(ai_service, "_get_client", lambda: client)
+    with pytest.raises(ai_service.TruncatedOutputError):
+        ai_service.translate_text("hello")
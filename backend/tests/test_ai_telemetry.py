@@ -0,0 +1,110 @@
+"""AI 调用遥测测试"""
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.database import Base
+from models.tables import AICallStat
+from services import ai_service, ai_telemetry
+
+
+def _make_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+@pytest.fixture(autouse=True)
+def _clean_pending(monkeypatch):
+    ai_telemetry.stop_flusher()
+    monkeypatch.setattr(ai_telemetry, "_pending", {})
+    # 测试中不触发后台写库
+    monkeypatch.setattr(ai_telemetry, "FLUSH_INTERVAL", 10 ** 9)
+    yield
+    # 在 monkeypatch 还原 flush_now / FLUSH_INTERVAL 之前停掉本测试启动的线程
+    ai_telemetry.stop_flusher()
+
+
+def test_percentile_interpolates_within_bucket():
+    hist = [0] * (len(ai_telemetry.LATENCY_BUCKETS) + 1)
+    hist[ai_telemetry._bucket(80)] = 100          # 全部落在 (50, 100] 桶
+    assert ai_telemetry.percentile(hist, 0.5) == 75.0
+    assert ai_telemetry.percentile(hist, 0.99) == 99.5
+    assert ai_telemetry.percentile([0] * len(hist), 0.5) is None
+
+
+def test_summary_merges_flushed_and_pending_windows():
+    db = _make_session()
+    for ms in (100, 200, 300):
+        ai_telemetry.record("translate", "m1", ms, prompt_tokens=10, completion_tokens=5)
+    ai_telemetry.record("summary", "m1", 2500, error="RateLimitError")
+    assert ai_telemetry.flush(db) == 2
+    assert db.query(AICallStat).count() == 2
+
+    ai_telemetry.record("translate", "m2", 150, cache_hit=True)
+    stats = ai_telemetry.summarize(db)["features"]
+
+    assert stats["translate"]["calls"] == 4
+    assert stats["translate"]["cache_hits"] == 1
+    assert stats["translate"]["prompt_tokens"] == 30
+    assert stats["translate"]["models"] == ["m1", "m2"]
+    assert stats["translate"]["p50_ms"] <= stats["translate"]["p95_ms"] <= 300
+    assert stats["summary"]["errors"] == 1
+    assert stats["summary"]["error_classes"] == {"RateLimitError": 1}
+
+
+def test_failed_flush_keeps_aggregates_for_next_window():
+    broken = sessionmaker(bind=create_engine("sqlite://"))()    # 未建表，写入失败
+    ai_telemetry.record("translate", "m1", 100, prompt_tokens=10)
+    with pytest.raises(Exception):
+        ai_telemetry.flush(broken)
+
+    ai_telemetry.record("translate", "m1", 200, prompt_tokens=5)
+    db = _make_session()
+    assert ai_telemetry.flush(db) == 1
+    row = db.query(AICallStat).one()
+    assert (row.calls, row.prompt_tokens) == (2, 15)
+
+
+def test_pending_calls_flush_on_timer_without_further_records(monkeypatch):
+    flushed = threading.Event()
+    monkeypatch.setattr(ai_telemetry, "FLUSH_INTERVAL", 0.01)
+    monkeypatch.setattr(ai_telemetry, "flush_now", flushed.set)
+
+    ai_telemetry.record("translate", "m1", 100)
+    assert flushed.wait(2)
+
+    thread = ai_telemetry._flusher
+    ai_telemetry.stop_flusher()
+    assert not thread.is_alive() and ai_telemetry._flusher is None
+
+
+def test_chat_records_usage_and_errors_per_feature(monkeypatch):
+    response = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content='{"translation": "你好"}'))],
+        usage=SimpleNamespace(prompt_tokens=42, completion_tokens=7),
+    )
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **kw: response)))
+    monkeypatch.setattr(ai_service, "_get_client", lambda: client)
+    ai_service.translate_text("hello")
+
+    def fail(**kwargs):
+        raise TimeoutError("slow")
+
+    monkeypatch.setattr(ai_service, "_get_client", lambda: SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=fail))))
+    with pytest.raises(TimeoutError):
+        ai_service.explain_text("hello")
+
+    pending = ai_telemetry._pending
+    translate = next(agg for (feature, _), agg in pending.items() if feature == "translate")
+    explain = next(agg for (feature, _), agg in pending.items() if feature == "explain")
+    assert (translate.calls, translate.prompt_tokens, translate.completion_tokens) == (1, 42, 7)
+    assert explain.error_classes == {"TimeoutError": 1}
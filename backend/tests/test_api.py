@@ -5,11 +5,7 @@ import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-# 使用测试数据库
-os.environ["DATABASE_URL"] = "sqlite:///./data/test.db"
-
-# 确保 data 目录存在
-os.makedirs("data", exist_ok=True)
+# 测试数据库由 conftest.py 设置
 
 from models.database import init_db
 from app import create_app
@@ -22,6 +18,12 @@ app = create_app()
 client = TestClient(app)
 
 
+def test_uses_test_database():
+    """无论测试模块的导入顺序如何，引擎都连接测试库"""
+    from models.database import engine
+    assert engine.url.database == "./data/test.db"
+
+
 def test_health():
     """健康检查"""
     resp = client.get("/api/health")
@@ -113,3 +115,167 @@ def test_writing_history():
     """获取写作历史"""
     resp = client.get("/api/writing/history")
     assert resp.status_code == 200
+
+
+def test_search():
+    """全文检索"""
+    resp = client.get("/api/search", params={"q": "ubiquitous", "scope": "vocab"})
+    assert resp.status_code == 200
+    assert "items" in resp.json()
+
+
+def test_recommend():
+    """推荐文章（只读）"""
+    resp = client.get("/api/content/recommend")
+    assert resp.status_code == 200
+    assert isinstance(resp.json(), list)
+
+
+def test_vocab_list_cursor_pagination():
+    """生词列表游标分页"""
+    for word in ["alpha", "bravo", "charlie"]:
+        client.post("/api/vocab/mark", json={"word": word, "definition": word})
+
+    first = client.get("/api/vocab/list", params={"limit": 2})
+    assert first.status_code == 200
+    cursor = first.headers["X-Next-Cursor"]
+    second = client.get("/api/vocab/list", params={"limit": 2, "cursor": cursor})
+    assert second.status_code == 200
+
+    first_ids = [v["id"] for v in first.json()]
+    second_ids = [v["id"] for v in second.json()]
+    assert not set(first_ids) & set(second_ids)
+    assert max(second_ids) < min(first_ids)
+
+
+def test_cursor_header_is_exposed_to_browser():
+    """前端跨域请求可读取 X-Next-Cursor"""
+    resp = client.get("/api/vocab/list", params={"limit": 1}, headers={"Origin": "http://localhost:3000"})
+    assert "x-next-cursor" in resp.headers["access-control-expose-headers"].lower()
+
+
+def test_list_articles_rejects_bad_cursor():
+    """非法游标返回 400"""
+    resp = client.get("/api/content/articles", params={"cursor": "not-a-cursor"})
+    assert resp.status_code == 400
+
+
+def _seed_article(sentence_count: int) -> int:
+    from models.database import SessionLocal
+    from models.tables import Article, ArticleSentence
+
+    db = SessionLocal()
+    try:
+        article = Article(title="Reader test", url=f"https://example.com/reader-{os.urandom(4).hex()}",
+                          content="x", summary="已有摘要", difficulty="easy", word_count=10)
+        db.add(article)
+        db.flush()
+        db.add_all([
+            ArticleSentence(article_id=article.id, index=i, text_en=f"Sentence number {i}.")
+            for i in range(sentence_count)
+        ])
+        db.commit()
+        return article.id
+    finally:
+        db.close()
+
+
+def test_get_article_pages_sentences_without_marking_read():
+    """阅读器：头信息 + 分页句子，GET 不标记已读"""
+    article_id = _seed_article(5)
+
+    resp = client.get(f"/api/content/article/{article_id}", params={"sentence_limit": 2})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["sentence_count"] == 5
+    assert [s["index"] for s in data["sentences"]] == [0, 1]
+    assert data["next_index"] == 2
+    assert data["content"] is None
+    assert data["is_read"] is False
+
+    page = client.get(f"/api/content/article/{article_id}/sentences",
+                      params={"start": data["next_index"], "limit": 10}).json()
+    assert [s["index"] for s in page["sentences"]] == [2, 3, 4]
+    assert page["next_index"] is None
+
+
+def test_large_responses_are_gzip_compressed():
+    """超过阈值的响应压缩，小响应原样返回"""
+    article_id = _seed_article(200)
+    resp = client.get(f"/api/content/article/{article_id}", params={"sentence_limit": 200},
+                      headers={"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert resp.headers["content-encoding"] == "gzip"
+    assert len(resp.json()["sentences"]) == 200
+
+    small = client.get("/api/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+
+def test_mark_article_read_is_idempotent():
+    """已读事件幂等"""
+    article_id = _seed_article(1)
+    assert client.post(f"/api/content/article/{article_id}/read").status_code == 200
+    assert client.post(f"/api/content/article/{article_id}/read").status_code == 200
+    assert client.get(f"/api/content/article/{article_id}").json()["is_read"] is True
+    assert client.post("/api/content/article/999999/read").status_code == 404
+
+
+def test_create_and_poll_job_is_idempotent():
+    """提交 AI 任务并轮询；相同幂等键返回同一任务"""
+    body = {"kind": "translate", "payload": {"text": "hello"}}
+    first = client.post("/api/jobs", json=body, headers={"Idempotency-Key": "api-test-hello"})
+    assert first.status_code == 202
+    second = client.post("/api/jobs", json=body, headers={"Idempotency-Key": "api-test-hello"})
+    assert second.json()["id"] == first.json()["id"]
+
+    resp = client.get(f"/api/jobs/{first.json()['id']}")
+    assert resp.status_code == 200
+    assert resp.json()["status"] == "queued"
+    assert client.post("/api/jobs", json={"kind": "nope", "payload": {}}).status_code == 400
+
+
+def test_ai_metrics():
+    """AI 调用遥测"""
+    resp = client.get("/api/stats/ai?hours=1")
+    assert resp.status_code == 200
+    assert resp.json()["hours"] == 1
+    assert isinstance(resp.json()["features"], dict)
+
+
+def test_ai_endpoints_against_stub(monkeypatch):
+    """AI 相关接口经本地桩服务走完整链路"""
+    from benchmarks.llm_stub import LLMStub
+    from services import ai_service
+
+    with LLMStub() as stub:
+        monkeypatch.setattr(ai_service.settings, "ai_base_url", stub.base_url)
+        monkeypatch.setattr(ai_service.settings, "ai_api_key", "stub")
+
+        resp = client.post("/api/translate/selection", json={"text": "Markets rallied."})
+        assert resp.status_code == 200
+        assert resp.json()["translation"] == "〔译〕Markets rallied."
+
+        resp = client.post("/api/speaking/turn", json={"content": "I enjoy cooking"})
+        assert resp.status_code == 200
+        assert resp.json()["content"].startswith("That's interesting")
+
+        resp = client.post("/api/writing/evaluate", json={"title": "Cooking", "content": "I enjoys cooking."})
+        assert resp.status_code == 200
+        assert resp.json()["score"] is not None
+
+
+def test_metrics_endpoint():
+    """/metrics 以路由模板为标签导出请求与 SQL 指标"""
+    client.get("/api/content/articles")
+    client.get("/api/content/article/999999")
+    client.get("/api/no-such-route")
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    body = resp.text
+    assert 'http_requests_total{method="GET",route="/api/content/articles",status="200"}' in body
+    assert 'route="/api/content/article/{article_id}"' in body
+    assert 'route="<unmatched>"' in body
+    assert 'http_request_db_statements_bucket{method="GET",route="/api/content/articles",le="+Inf"}' in body
+    assert "/article/999999" not in body
@@ -0,0 +1,87 @@
+"""近重复文章检测测试"""
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models import compression
+from models.database import Base
+from models.tables import Article, ArticleLSH, ArticleSentence, NewsSource
+from services import dedup_service, rss_service
+
+_STORY = (
+    "The central bank kept its main interest rate unchanged on Thursday, saying inflation was "
+    "cooling faster than expected but that wage growth remained strong. Officials signalled that "
+    "cuts could begin later this year if price pressures continue to ease across the economy. "
+    "Markets rallied after the announcement, with government bond yields falling sharply."
+)
+_OTHER = (
+    "The home team won the championship final after extra time, ending a twenty year wait for a "
+    "title. Thousands of supporters gathered in the city centre to celebrate late into the night, "
+    "and the coach praised the players for their resilience throughout a difficult season."
+)
+
+
+def _make_session():
+    engine = create_engine("sqlite://")
+    compression.install(engine)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def test_similarity_separates_near_duplicates_from_unrelated_text():
+    rewritten = "LONDON (Wire) - " + _STORY + " Reporting by the newswire desk."
+    sig = dedup_service.minhash(_STORY)
+    assert dedup_service.similarity(sig, dedup_service.minhash(_STORY)) == 1.0
+    assert dedup_service.similarity(sig, dedup_service.minhash(rewritten)) >= dedup_service.DUPLICATE_THRESHOLD
+    assert dedup_service.similarity(sig, dedup_service.minhash(_OTHER)) < 0.2
+    assert dedup_service.minhash("!!!") is None
+
+
+def test_find_duplicate_uses_lsh_index():
+    db = _make_session()
+    article = Article(title="Rates", url="https://example.com/a", published_at=datetime.utcnow())
+    db.add(article)
+    db.flush()
+    dedup_service.index_fingerprint(db, article, dedup_service.minhash(_STORY))
+    db.commit()
+
+    assert db.query(ArticleLSH).count() == dedup_service.BANDS
+    assert dedup_service.find_duplicate(db, dedup_service.minhash(_STORY + " Updated.")) == article.id
+    assert dedup_service.find_duplicate(db, dedup_service.minhash(_OTHER)) is None
+
+
+def test_fetch_source_links_wire_copies_without_processing(monkeypatch):
+    db = _make_session()
+    source = NewsSource(name="Wire", url="https://example.com/feed", category="world")
+    db.add(source)
+    db.commit()
+
+    entries = [
+        {"link": "https://reuters.example/rates", "title": "Central bank holds rates"},
+        {"link": "https://ap.example/rates", "title": "Central bank keeps rates on hold"},
+        {"link": "https://example.com/sport", "title": "Home team wins"},
+    ]
+    bodies = {
+        "https://reuters.example/rates": _STORY,
+        "https://ap.example/rates": _STORY + " Editing by the desk.",
+        "https://example.com/sport": _OTHER,
+    }
+    monkeypatch.setattr(rss_service.feedparser, "parse", lambda url, **kwargs: SimpleNamespace(entries=entries))
+    monkeypatch.setattr(rss_service, "_extract_article_content", lambda url, entry: bodies[url])
+
+    assert rss_service._fetch_source(db, source) == 2
+    db.commit()
+
+    original = db.query(Article).filter(Article.url == "https://reuters.example/rates").one()
+    copy = db.query(Article).filter(Article.url == "https://ap.example/rates").one()
+    assert copy.canonical_id == original.id
+    assert db.query(ArticleSentence).filter(ArticleSentence.article_id == copy.id).count() == 0
+
+    # 再次抓取时按 URL 直接跳过
+    assert rss_service._fetch_source(db, source) == 0
@@ -0,0 +1,104 @@
+"""离线词典导入与查询测试"""
+import csv
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.database import Base
+from services import dictionary_service
+
+
+def _make_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def _write_csv(path):
+    fields = ["word", "phonetic", "definition", "translation", "pos", "collins",
+              "oxford", "tag", "bnc", "frq", "exchange", "detail", "audio"]
+    rows = [
+        {"word": "apple", "phonetic": "'æpl", "definition": "n. fruit with red or green skin",
+         "translation": "n. 苹果\\nn. 苹果树", "tag": "zk gk", "bnc": "2500", "frq": "2300"},
+        {"word": "perceive", "phonetic": "pə'si:v", "definition": "v. to become aware of",
+         "translation": "vt. 察觉, 感知", "tag": "cet4", "frq": "4100",
+         "exchange": "d:perceived/p:perceived/3:perceives/i:perceiving"},
+        {"word": "zymurgy", "translation": "n. 酿造学", "frq": "0", "bnc": "0"},
+    ]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+
+
+def test_parse_row_extracts_pos_lemma_and_rank():
+    row = dictionary_service._parse_row({
+        "word": "Perceived", "phonetic": "pə'si:vd", "translation": "vt. 察觉",
+        "exchange": "0:perceive/1:p/", "frq": "9000",
+    })
+    assert row["word"] == "perceived"
+    assert row["lemma"] == "perceive"
+    assert row["pos"] == "verb"
+    assert row["pronunciation"] == "/pə'si:vd/"
+    assert row["frequency_rank"] == 9000
+
+
+def test_import_and_lookup(tmp_path):
+    path = tmp_path / "dict.csv"
+    _write_csv(path)
+    db = _make_session()
+
+    assert dictionary_service.import_wordlist(db, str(path), max_rank=5000) == 2
+
+    apple = dictionary_service.lookup_word(db, "Apple,")
+    assert apple["word"] == "Apple,"
+    assert apple["pos"] == "noun"
+    assert apple["definition"] == "n. 苹果\nn. 苹果树"
+
+    # 变形词回退到原形
+    perceiving = dictionary_service.lookup_word(db, "perceiving")
+    assert perceiving["lemma"] == "perceive"
+
+    # 超出词频范围的词未导入，交给 AI
+    assert dictionary_service.lookup_word(db, "zymurgy") is None
+
+
+def test_misses_are_not_cached(tmp_path):
+    """未命中不进缓存：其他进程导入词库后立即可查到"""
+    db = _make_session()
+    assert dictionary_service.lookup_word(db, "quokka") is None
+
+    from models.tables import DictionaryEntry
+    db.add(DictionaryEntry(word="quokka", lemma="quokka", definition="n. 短尾矮袋鼠"))
+    db.commit()
+    assert dictionary_service.lookup_word(db, "quokka")["definition"] == "n. 短尾矮袋鼠"
+
+
+def test_cache_is_per_database():
+    from models.tables import DictionaryEntry
+    first, second = _make_session(), _make_session()
+    first.add(DictionaryEntry(word="quokka", lemma="quokka", definition="n. 短尾矮袋鼠"))
+    second.add(DictionaryEntry(word="quokka", lemma="quokka", definition="n. 袋鼠"))
+    first.commit()
+    second.commit()
+    assert dictionary_service.lookup_word(first, "quokka")["definition"] == "n. 短尾矮袋鼠"
+    assert dictionary_service.lookup_word(second, "quokka")["definition"] == "n. 袋鼠"
+
+
+def test_cached_hits_expire(monkeypatch):
+    """其他进程重新导入词库后，缓存的命中过期即读到新释义"""
+    from models.tables import DictionaryEntry
+    db = _make_session()
+    db.add(DictionaryEntry(word="quokka", lemma="quokka", definition="n. 短尾矮袋鼠"))
+    db.commit()
+    monkeypatch.setattr(dictionary_service, "_CACHE_TTL", 0)
+    assert dictionary_service.lookup_word(db, "quokka")["definition"] == "n. 短尾矮袋鼠"
+
+    db.query(DictionaryEntry).update({DictionaryEntry.definition: "n. 新释义"})
+    db.commit()
+    assert dictionary_service.lookup_word(db, "quokka")["definition"] == "n. 新释义"
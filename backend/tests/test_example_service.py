@@ -0,0 +1,67 @@
+"""词形还原与例句倒排索引测试"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.database import Base
+from models.tables import Article, ArticleSentence, VocabItem
+from services import example_service
+from services.lexicon import content_lemmas, lemmatize
+
+
+def test_lemmatize_maps_inflections_to_base_form():
+    pairs = {
+        "making": "make", "rates": "rate", "running": "run", "studies": "study",
+        "caused": "cause", "watches": "watch", "went": "go", "news": "news", "make": "make",
+    }
+    for word, lemma in pairs.items():
+        assert lemmatize(word) == lemma
+
+
+def test_content_lemmas_skips_stopwords():
+    assert content_lemmas("The banks are raising rates") == ["bank", "raise", "rate"]
+
+
+def test_find_examples_ranks_indexed_sentences():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    easy = Article(title="Easy news", url="https://example.com/e", difficulty="easy")
+    hard = Article(title="Hard news", url="https://example.com/h", difficulty="hard")
+    db.add_all([easy, hard])
+    db.flush()
+    sentences = [
+        ArticleSentence(article_id=hard.id, index=0,
+                        text_en="Policymakers reluctantly raised benchmark rates amid persistent inflationary pressure."),
+        ArticleSentence(article_id=easy.id, index=0, text_en="The bank is raising its rates again this week."),
+        ArticleSentence(article_id=easy.id, index=1, text_en="Nothing about money here at all today."),
+    ]
+    db.add_all(sentences)
+    db.flush()
+    example_service.index_sentences(db, sentences)
+    easy.is_read = True
+    vocab = VocabItem(word="raised", lemma="raise", example_sentence="Prices were raised.")
+    db.add(vocab)
+    db.commit()
+
+    examples = example_service.find_examples(db, vocab, limit=5)
+    assert [e["article_title"] for e in examples] == ["Easy news", "Hard news"]
+    assert examples[0]["text_en"].startswith("The bank is raising")
+
+
+def test_find_examples_rejects_words_the_index_skips():
+    """停用词 / 过短的词不入索引，查询时明确报错"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    for word in ("the", "go"):
+        with pytest.raises(example_service.UnsupportedWordError):
+            example_service.find_examples(db, VocabItem(word=word, lemma=word))
@@ -0,0 +1,94 @@
+"""RSS 源自适应抓取计划测试"""
+import os
+import sys
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models import compression
+from models.database import Base
+from models.tables import NewsSource
+from services import fetch_policy, rss_service
+
+_NOW = datetime(2026, 1, 1, 12, 0)
+
+
+def _make_session():
+    engine = create_engine("sqlite://")
+    compression.install(engine)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def test_learns_short_interval_for_hourly_feed():
+    source = NewsSource(name="Hourly", url="u", fetch_interval_minutes=360)
+    entries = [_NOW - timedelta(hours=h) for h in range(10)]
+    fetch_policy.record_success(source, 3, entries, now=_NOW)
+    # 观测 30 分钟与旧值 360 分钟平滑
+    assert source.fetch_interval_minutes == 195
+    assert source.health == "ok"
+    delay = (source.next_fetch_at - _NOW).total_seconds() / 60
+    assert 195 * 0.9 <= delay <= 195 * 1.1
+
+
+def test_unchanged_feed_backs_off_up_to_cap():
+    source = NewsSource(name="Weekly", url="u", fetch_interval_minutes=600)
+    for _ in range(10):
+        fetch_policy.record_success(source, 0, [], now=_NOW)
+    assert source.fetch_interval_minutes == fetch_policy.MAX_INTERVAL
+
+
+def test_failures_back_off_exponentially_and_mark_health():
+    source = NewsSource(name="Broken", url="u", fetch_interval_minutes=60)
+    delays = []
+    for _ in range(3):
+        fetch_policy.record_failure(source, "HTTP 500", now=_NOW)
+        delays.append((source.next_fetch_at - _NOW).total_seconds() / 60)
+    assert delays[0] < delays[1] < delays[2]
+    assert source.failure_count == 3
+    assert source.health == "failing"
+    assert source.last_error == "HTTP 500"
+
+    fetch_policy.record_success(source, 1, [], now=_NOW)
+    assert (source.failure_count, source.health, source.last_error) == (0, "ok", None)
+
+
+def test_due_sources_prefers_never_fetched_and_skips_future():
+    db = _make_session()
+    now = datetime.utcnow()
+    db.add_all([
+        NewsSource(name="later", url="a", next_fetch_at=now + timedelta(hours=1)),
+        NewsSource(name="overdue", url="b", next_fetch_at=now - timedelta(minutes=5)),
+        NewsSource(name="new", url="c"),
+        NewsSource(name="inactive", url="d", is_active=False),
+    ])
+    db.commit()
+    assert [s.name for s in fetch_policy.due_sources(db, now=now)] == ["new", "overdue"]
+
+
+def test_fetch_source_records_conditional_get_and_failures(monkeypatch):
+    db = _make_session()
+    source = NewsSource(name="Feed", url="https://example.com/feed", etag='"abc"')
+    db.add(source)
+    db.commit()
+
+    calls = []
+
+    def not_modified(url, **kwargs):
+        calls.append(kwargs)
+        return SimpleNamespace(status=304, entries=[])
+
+    monkeypatch.setattr(rss_service.feedparser, "parse", not_modified)
+    assert rss_service.fetch_source(db, source) == 0
+    assert calls[0]["etag"] == '"abc"'
+    assert source.health == "ok" and source.next_fetch_at is not None
+
+    monkeypatch.setattr(rss_service.feedparser, "parse", lambda url, **kwargs: SimpleNamespace(status=503, entries=[]))
+    assert rss_service.fetch_source(db, source) == 0
+    db.commit()
+    assert source.failure_count == 1
+    assert source.health == "degraded"
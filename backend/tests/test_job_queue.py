@@ -0,0 +1,158 @@
+"""AI 任务队列测试"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models import compression
+from models.database import Base
+from models.tables import AIJob, Article, ArticleSentence
+from services import job_queue
+
+
+def _make_session():
+    engine = create_engine("sqlite://")
+    compression.install(engine)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_bucket(monkeypatch):
+    monkeypatch.setattr(job_queue, "bucket", job_queue.TokenBucket(1000, 10_000_000))
+
+
+def test_enqueue_is_idempotent_by_payload_and_key():
+    db = _make_session()
+    a = job_queue.enqueue(db, "translate", {"text": "hi", "context": ""})
+    b = job_queue.enqueue(db, "translate", {"context": "", "text": "hi"})
+    c = job_queue.enqueue(db, "translate", {"text": "hi"}, idempotency_key="client-1")
+    assert a.id == b.id
+    assert c.id != a.id
+    assert job_queue.enqueue(db, "translate", {"text": "other"}, idempotency_key="client-1").id == c.id
+    with pytest.raises(ValueError):
+        job_queue.enqueue(db, "unknown", {})
+
+
+def test_process_runs_handler_and_stores_result(monkeypatch):
+    db = _make_session()
+    monkeypatch.setattr(job_queue.ai_service, "translate_text", lambda text, context="": {"translation": "你好"})
+    job = job_queue.enqueue(db, "translate", {"text": "hello"})
+
+    assert job_queue.process_jobs(db) == 1
+    db.refresh(job)
+    assert job.status == "done"
+    assert job_queue.job_to_dict(job)["result"] == {"translation": "你好"}
+
+
+def test_retryable_errors_back_off_then_fail(monkeypatch):
+    db = _make_session()
+
+    def rate_limited(text, context=""):
+        raise job_queue.RetryableError("429", retry_after=30)
+
+    monkeypatch.setattr(job_queue.ai_service, "translate_text", rate_limited)
+    job = job_queue.enqueue(db, "translate", {"text": "hello"})
+    job.max_attempts = 2
+    db.commit()
+
+    job_queue.process_jobs(db)
+    db.refresh(job)
+    assert (job.status, job.attempts) == ("queued", 1)
+    assert job.next_run_at > datetime.utcnow() + timedelta(seconds=25)
+    # 429 暂停整个队列
+    assert not job_queue.bucket.try_acquire(1)
+
+    monkeypatch.setattr(job_queue, "bucket", job_queue.TokenBucket(1000, 10_000_000))
+    job.next_run_at = datetime.utcnow()
+    db.commit()
+    job_queue.process_jobs(db)
+    db.refresh(job)
+    assert (job.status, job.attempts) == ("failed", 2)
+
+    # 失败任务可用相同幂等键重新提交
+    assert job_queue.enqueue(db, "translate", {"text": "hello"}).status == "queued"
+
+
+def test_non_retryable_error_fails_immediately(monkeypatch):
+    db = _make_session()
+
+    def broken(word, sentence=""):
+        raise ValueError("bad payload")
+
+    monkeypatch.setattr(job_queue.ai_service, "get_word_definition", broken)
+    job = job_queue.enqueue(db, "definition", {"word": "x"})
+    job_queue.process_jobs(db)
+    db.refresh(job)
+    assert job.status == "failed"
+    assert job.error == "bad payload"
+
+
+def test_stale_running_jobs_are_reclaimed(monkeypatch):
+    db = _make_session()
+    monkeypatch.setattr(job_queue.ai_service, "translate_text", lambda text, context="": {})
+    job = job_queue.enqueue(db, "translate", {"text": "x"})
+    job.status = "running"
+    job.locked_until = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+
+    assert job_queue.process_jobs(db) == 1
+    assert db.query(AIJob).get(job.id).status == "done"
+
+
+def test_token_bucket_limits_requests_and_tokens():
+    bucket = job_queue.TokenBucket(requests_per_minute=2, tokens_per_minute=1000)
+    assert bucket.try_acquire(400)
+    assert not bucket.try_acquire(700)   # token 不足，且不扣请求额度
+    assert bucket.try_acquire(500)
+    assert not bucket.try_acquire(1)     # 请求额度用尽
+
+
+def test_rate_limited_jobs_are_released_without_using_attempts(monkeypatch):
+    db = _make_session()
+    job = job_queue.enqueue(db, "translate", {"text": "x"})
+    monkeypatch.setattr(job_queue, "bucket", job_queue.TokenBucket(1, 1000))
+    job_queue.bucket.available[0] = 0
+
+    assert job_queue.process_jobs(db) == 0
+    db.refresh(job)
+    assert (job.status, job.attempts, job.locked_until) == ("queued", 0, None)
+
+
+def test_jobs_claimed_elsewhere_do_not_take_tokens(monkeypatch):
+    db = _make_session()
+    job_queue.enqueue(db, "translate", {"text": "x"})
+    bucket = job_queue.TokenBucket(10, 10_000)
+    monkeypatch.setattr(job_queue, "bucket", bucket)
+    monkeypatch.setattr(job_queue, "_claim", lambda db, job: False)
+
+    assert job_queue.process_jobs(db) == 0
+    assert bucket.available == [10.0, 10_000.0]
+
+
+def test_missing_sentence_translations_are_retried(monkeypatch):
+    db = _make_session()
+    article = Article(title="t", url="https://example.com/t")
+    db.add(article)
+    db.flush()
+    db.add_all([ArticleSentence(article_id=article.id, index=i, text_en=f"Sentence {i}.") for i in range(2)])
+    db.commit()
+    calls = []
+
+    def translate(sentences):
+        calls.append(sentences)
+        return ["句子", None] if len(calls) == 1 else ["第二句"]
+
+    monkeypatch.setattr(job_queue.ai_service, "translate_sentences", translate)
+    with pytest.raises(job_queue.RetryableError):
+        job_queue._translate_sentences(db, {"article_id": article.id})
+    assert [s.text_zh for s in db.query(ArticleSentence).order_by(ArticleSentence.index)] == ["句子", None]
+
+    assert job_queue._translate_sentences(db, {"article_id": article.id}) == {"translated": 1}
+    assert calls[1] == ["Sentence 1."]
+    assert [s.text_zh for s in db.query(ArticleSentence).order_by(ArticleSentence.index)] == ["句子", "第二句"]
@@ -0,0 +1,51 @@
+"""数据库租约测试"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.database import Base
+from models.tables import JobLease
+from services import lease_service
+
+
+def _make_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def test_only_one_owner_holds_the_lease():
+    db = _make_session()
+    assert lease_service.acquire_lease(db, "scheduler", "a", 60)
+    assert not lease_service.acquire_lease(db, "scheduler", "b", 60)
+    # 持有者续约
+    assert lease_service.acquire_lease(db, "scheduler", "a", 60)
+    assert db.query(JobLease).get("scheduler").owner == "a"
+
+
+def test_expired_lease_is_taken_over():
+    db = _make_session()
+    assert lease_service.acquire_lease(db, "scheduler", "a", 60)
+    db.query(JobLease).update({JobLease.expires_at: datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+
+    assert lease_service.acquire_lease(db, "scheduler", "b", 60)
+    assert not lease_service.acquire_lease(db, "scheduler", "a", 60)
+
+
+def test_release_only_by_owner():
+    db = _make_session()
+    lease_service.acquire_lease(db, "scheduler", "a", 60)
+    lease_service.release_lease(db, "scheduler", "b")
+    assert not lease_service.acquire_lease(db, "scheduler", "b", 60)
+    lease_service.release_lease(db, "scheduler", "a")
+    assert lease_service.acquire_lease(db, "scheduler", "b", 60)
+
+
+def test_make_owner_is_unique_per_call():
+    assert lease_service.make_owner() != lease_service.make_owner()
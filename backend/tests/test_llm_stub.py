@@ -0,0 +1,92 @@
+"""LLM 桩服务测试：经真实 OpenAI 客户端调用 ai_service"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import httpx
+import openai
+import pytest
+
+from benchmarks.llm_stub import LLMStub
+from services import ai_service
+
+
+@pytest.fixture
+def use_stub(monkeypatch):
+    """启动桩服务并把 ai_service 指向它"""
+    stubs = []
+
+    def start(**kwargs) -> LLMStub:
+        stub = LLMStub(**kwargs).start()
+        stubs.append(stub)
+        monkeypatch.setattr(ai_service.settings, "ai_base_url", stub.base_url)
+        monkeypatch.setattr(ai_service.settings, "ai_api_key", "stub")
+        return stub
+
+    yield start
+    for stub in stubs:
+        stub.stop()
+
+
+def test_synthetic_replies_parse_for_each_feature(use_stub):
+    stub = use_stub(latency_ms=30)
+
+    start = time.perf_counter()
+    assert ai_service.translate_text("The economy grew.")["translation"] == "〔译〕The economy grew."
+    assert time.perf_counter() - start >= 0.03
+
+    reply = ai_service.speaking_reply([{"role": "user", "content": "I like travel"}])
+    assert reply["reply"].startswith("That's interesting") and reply["correction"] is None
+
+    review = ai_service.evaluate_writing("Trip", "I goes to Paris last year.")
+    assert 0 <= review["score"] <= 100 and "主谓一致" in review["grammar_issues"]
+
+    assert ai_service.get_word_definition("Running")["lemma"] == "running"
+    assert len(ai_service.generate_plan_tasks("general", 30)) == 3
+    assert ai_service.translate_sentences(["One.", "Two."]) == ["〔译〕One.", "〔译〕Two."]
+    assert stub.stats["requests"] == 6
+
+
+def test_injected_rate_limits_surface_as_rate_limit_errors(use_stub):
+    stub = use_stub(rate_429=1.0, retry_after=0.01)
+    with pytest.raises(openai.RateLimitError):
+        ai_service.explain_text("hello")
+    # 客户端不重试，直接交给降级/任务队列
+    assert stub.stats["429"] == 1
+
+
+def test_timeout_fault_hangs_until_client_gives_up(use_stub):
+    stub = use_stub(hang_seconds=5)
+    with pytest.raises(httpx.ReadTimeout):
+        httpx.post(f"{stub.base_url}/chat/completions", json={"messages": []},
+                   headers={"X-Stub-Fault": "timeout"}, timeout=0.2)
+    assert stub.stats["timeouts"] == 1
+
+
+def test_record_then_replay_offline(use_stub, tmp_path):
+    cassette = str(tmp_path / "ai.jsonl")
+    upstream = LLMStub().start()
+    try:
+        recorder = use_stub(mode="record", cassette=cassette, upstream=upstream.base_url)
+        recorded = ai_service.explain_text("carry on")
+        assert recorder.stats["recorded"] == 1
+    finally:
+        upstream.stop()
+
+    replayer = use_stub(mode="replay", cassette=cassette)
+    assert ai_service.explain_text("carry on") == recorded
+    assert replayer.stats["replay_hits"] == 1
+
+
+def test_streaming_and_runtime_config(use_stub):
+    stub = use_stub()
+    httpx.post(stub.base_url.removesuffix("/v1") + "/stub/config", json={"tokens_per_second": 1000})
+    assert stub.tokens_per_second == 1000
+
+    client = openai.OpenAI(api_key="x", base_url=stub.base_url)
+    chunks = client.chat.completions.create(
+        model="m", messages=[{"role": "user", "content": "hi"}], stream=True,
+    )
+    assert "".join(c.choices[0].delta.content or "" for c in chunks) == "〔桩回复〕hi"
@@ -0,0 +1,80 @@
+"""请求指标与定时任务计时测试"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from services import metrics, scheduler
+
+
+def test_histogram_renders_cumulative_buckets():
+    hist = metrics.Histogram("demo_seconds", "示例", ("route",), (0.1, 1.0))
+    hist.observe(("/a",), 0.05)
+    hist.observe(("/a",), 0.5)
+    hist.observe(("/a",), 5)
+    lines = list(hist.samples())
+    assert lines == [
+        'demo_seconds_bucket{route="/a",le="0.1"} 1',
+        'demo_seconds_bucket{route="/a",le="1"} 2',
+        'demo_seconds_bucket{route="/a",le="+Inf"} 3',
+        'demo_seconds_sum{route="/a"} 5.55',
+        'demo_seconds_count{route="/a"} 3',
+    ]
+
+
+def test_route_template_restores_path_params():
+    scope = {"endpoint": object(), "path": "/api/vocab/12/review", "path_params": {"vocab_id": 12}}
+    assert metrics.route_template(scope) == "/api/vocab/{vocab_id}/review"
+    assert metrics.route_template({"path": "/favicon.ico"}) == "<unmatched>"
+
+
+def test_statements_are_attributed_to_current_request():
+    engine = create_engine("sqlite://")
+    metrics.install(engine)
+    metrics.install(engine)
+    before = metrics.db_statements._values.get((), 0)
+
+    db = [0, 0.0]
+    token = metrics._request_db.set(db)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+    finally:
+        metrics._request_db.reset(token)
+
+    assert db[0] == 2
+    assert metrics.db_statements._values[()] - before == 2
+
+
+def test_failed_statements_leave_no_timing_state_on_connection():
+    engine = create_engine("sqlite://")
+    metrics.install(engine)
+    before = metrics.db_statements._values.get((), 0)
+    with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing"))
+        conn.execute(text("SELECT 1"))
+        assert not any(key.startswith("metrics") for key in conn.info)
+    assert metrics.db_statements._values[()] - before == 1
+
+
+def test_scheduler_jobs_record_outcome(monkeypatch):
+    monkeypatch.setattr(scheduler, "_holds_lease", lambda: True)
+
+    @scheduler._exclusive("示例")
+    def _demo_job():
+        raise RuntimeError("boom")
+
+    _demo_job()
+    monkeypatch.setattr(scheduler, "_holds_lease", lambda: False)
+    _demo_job()
+
+    assert metrics.job_runs._values[("demo", "error")] >= 1
+    assert metrics.job_runs._values[("demo", "skipped")] >= 1
+    assert 'scheduler_job_duration_seconds_count{job="demo"} 1' in metrics.render()
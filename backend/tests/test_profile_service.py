@@ -0,0 +1,103 @@
+"""文章词汇画像测试"""
+import os
+import sys
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.database import Base
+from models.tables import Article, DictionaryEntry, VocabItem
+from services import profile_service
+
+
+def _make_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def test_pack_freqs_round_trip():
+    freqs = Counter({"économie": 3, "rate": 70000, "bank": 1})
+    packed = profile_service.pack_freqs(freqs)
+    assert profile_service.unpack_freqs(packed) == {"bank": 1, "rate": 0xFFFF, "économie": 3}
+
+
+def test_build_profile_without_dictionary_uses_word_length():
+    db = _make_session()
+    article = Article(title="t", url="https://example.com/t", readability_score=50)
+    db.add(article)
+    db.flush()
+
+    profile = profile_service.build_article_profile(db, article, "The cat investigated extraordinary boxes.")
+    assert profile.unique_lemmas == 4
+    assert profile.rare_count == 2
+    assert profile.level == 0.5
+
+
+def test_article_lexicon_uses_dictionary_bands_and_vocab_status():
+    db = _make_session()
+    db.add_all([
+        DictionaryEntry(word="bank", definition="银行", frequency_rank=300),
+        DictionaryEntry(word="raise", definition="提高", frequency_rank=900),
+        DictionaryEntry(word="inflation", definition="通胀", frequency_rank=6000),
+        DictionaryEntry(word="tighten", definition="收紧", frequency_rank=7000),
+    ])
+    article = Article(title="t", url="https://example.com/t", readability_score=40)
+    db.add(article)
+    db.flush()
+    profile_service.build_article_profile(
+        db, article, "Banks raised rates to fight inflation. Inflation may tighten budgets.")
+    db.add_all([
+        VocabItem(word="inflation", lemma="inflation", is_mastered=True),
+        VocabItem(word="banks", lemma="bank"),
+    ])
+    db.commit()
+
+    lexicon = profile_service.article_lexicon(db, article.id)
+    assert lexicon["mastered"] == ["inflation"]
+    assert lexicon["learning"] == ["bank"]
+    assert lexicon["unknown"] == ["budget", "fight", "rate", "tighten"]
+    assert lexicon["cefr_bands"] == {"A1": 1, "A2": 1, "C1": 2, "C2": 3}
+
+
+def test_learner_lemmas_cached_until_vocab_changes(monkeypatch):
+    db = _make_session()
+    db.add(VocabItem(word="banks", lemma="bank"))
+    db.commit()
+    first = profile_service.learner_lemmas(db)
+    assert first.status == {"bank": "learning"}
+
+    # 生词本未变化时直接复用缓存，不再读取词表
+    calls = []
+    monkeypatch.setattr(profile_service, "lemmatize", lambda w: calls.append(w) or w)
+    assert profile_service.learner_lemmas(db) is first
+    assert calls == []
+    monkeypatch.undo()
+
+    vocab = db.query(VocabItem).one()
+    vocab.is_mastered = True
+    db.commit()
+    assert profile_service.learner_lemmas(db).status == {"bank": "mastered"}
+
+    db.delete(vocab)
+    db.commit()
+    assert profile_service.learner_lemmas(db).status == {}
+
+
+def test_learner_lemmas_notice_writes_from_other_processes():
+    """其他进程的写入不触发本进程 ORM 事件，靠签名发现"""
+    db = _make_session()
+    assert profile_service.learner_lemmas(db).status == {}
+    db.connection().exec_driver_sql("INSERT INTO vocab_item (word, lemma, is_mastered) VALUES ('tariffs', 'tariff', 0)")
+    db.commit()
+    assert profile_service.learner_lemmas(db).learning == {"tariff"}
+
+
+def test_pack_hashes_round_trip():
+    packed = profile_service.pack_hashes(["austerity", "tariff"])
+    assert len(packed) == 8
+    assert profile_service.unpack_hashes(packed) == (
+        profile_service.lemma_hash("austerity"), profile_service.lemma_hash("tariff"))
@@ -0,0 +1,97 @@
+"""按需剖析与慢 SQL 日志测试"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from services import profiling
+
+
+def _busy(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(1000))
+
+
+def _make_app(output_dir):
+    app = FastAPI()
+    app.add_middleware(profiling.ProfilingMiddleware, output_dir=str(output_dir), interval_ms=1)
+
+    @app.get("/busy")
+    def busy():
+        _busy(0.1)
+        return {"ok": True}
+
+    return app
+
+
+def test_header_triggers_folded_profile(tmp_path):
+    client = TestClient(_make_app(tmp_path))
+
+    assert "x-profile-file" not in client.get("/busy").headers
+    resp = client.get("/busy", headers={"X-Profile": "1"})
+    assert resp.status_code == 200
+
+    path = tmp_path / resp.headers["x-profile-file"]
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert any("_busy (tests/test_profiling.py:" in line for line in lines)
+
+
+def test_armed_requests_are_profiled(tmp_path):
+    client = TestClient(_make_app(tmp_path))
+    profiling.arm(2)
+    try:
+        headers = [client.get("/busy").headers for _ in range(3)]
+    finally:
+        profiling.arm(0)
+    assert ["x-profile-file" in h for h in headers] == [True, True, False]
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_slow_sql_log_records_shape_and_plan(tmp_path):
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE word (id INTEGER PRIMARY KEY, lemma TEXT)"))
+        conn.execute(text("INSERT INTO word (lemma) VALUES (:lemma)"), [{"lemma": "a"}, {"lemma": "b"}])
+
+    profiling.install_slow_sql(engine, 0, str(tmp_path))
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT * FROM word WHERE lemma = :lemma"), {"lemma": "a"}).all()
+    finally:
+        profiling._slow_sql["threshold"] = float("inf")
+
+    records = [json.loads(line) for line in (tmp_path / "slow-sql.jsonl").read_text(encoding="utf-8").splitlines()]
+    record = next(r for r in records if r["statement"].startswith("SELECT * FROM word"))
+    assert record["params"] == "(str)"
+    assert any("SCAN" in step for step in record["plan"])
+
+
+def test_failed_statements_leave_no_timing_state_on_connection(tmp_path):
+    engine = create_engine("sqlite://")
+    profiling.install_slow_sql(engine, 0, str(tmp_path))
+    try:
+        with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing"))
+            conn.execute(text("SELECT 1"))
+            assert not any(key.startswith("slow_sql") for key in conn.info)
+    finally:
+        profiling._slow_sql["threshold"] = float("inf")
+
+
+def test_parameter_shape():
+    assert profiling.parameter_shape((1, "a")) == "(int, str)"
+    assert profiling.parameter_shape([(1, "a"), (2, "b")], executemany=True) == "2 × (int, str)"
+    assert profiling.parameter_shape({"id": 1}) == "{id: int}"
@@ -0,0 +1,90 @@
+"""个性化推荐测试"""
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.database import Base
+from models.tables import Article, ArticleProfile, VocabItem
+from services import profile_service, recommend_service
+
+
+def _make_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def _article(db, title, readability, category, read=False, age_hours=1, rare=10, rare_words=None):
+    rare_words = rare_words or [f"rare{i}" for i in range(rare)]
+    article = Article(
+        title=title, url=f"https://example.com/{title}", category=category,
+        readability_score=readability, is_read=read,
+        published_at=datetime.utcnow() - timedelta(hours=age_hours),
+    )
+    db.add(article)
+    db.flush()
+    db.add(ArticleProfile(article_id=article.id, level=profile_service.readability_to_level(readability),
+                          unique_lemmas=200, rare_count=rare,
+                          rare_words=json.dumps(rare_words),
+                          rare_hashes=profile_service.pack_hashes(rare_words)))
+    return article
+
+
+def test_recommend_prefers_learner_level_and_does_not_write():
+    db = _make_session()
+    for i in range(3):
+        _article(db, f"read-{i}", 75, "world", read=True)
+    easy = _article(db, "easy-fresh", 72, "world")
+    _article(db, "hard", 10, "science", rare=60)
+    _article(db, "easy-stale", 72, "world", age_hours=24 * 14)
+    db.commit()
+
+    result = recommend_service.recommend_articles(db, count=3)
+    assert result[0].id == easy.id
+    # 难度不匹配的文章排在过期的同级文章之后
+    assert [a.title for a in result] == ["easy-fresh", "easy-stale", "hard"]
+    assert not db.dirty and not db.new
+    assert all(a.is_recommended is False for a in result)
+
+
+def _known(*lemmas):
+    return frozenset(map(profile_service.lemma_hash, lemmas))
+
+
+def test_unknown_ratio_ignores_common_vocab_words():
+    """生词本中的常用词不抵扣文章的陌生词数，只有低频词命中才抵扣"""
+    rare = profile_service.pack_hashes(["austerity", "tariff", "subsidy"])
+    assert recommend_service._unknown_count(rare, 3, _known("the", "make", "rate")) == 3
+    assert recommend_service._unknown_count(rare, 3, _known("tariff")) == 2
+    assert recommend_service._unknown_count(None, 3, _known("tariff")) == 3
+
+
+def test_recommend_with_common_vocab_keeps_i_plus_one_preference():
+    db = _make_session()
+    # 10/200 = 目标陌生词比例；0/200 过于简单
+    target = _article(db, "target", 72, "world", rare=10)
+    _article(db, "all-known", 72, "science", rare=10, rare_words=[f"known{i}" for i in range(10)])
+    db.add_all([VocabItem(word=f"known{i}", lemma=f"known{i}") for i in range(10)])
+    db.add_all([VocabItem(word=w, lemma=w) for w in ("government", "market", "people")])
+    db.commit()
+
+    result = recommend_service.recommend_articles(db, count=2)
+    assert [a.title for a in result] == ["target", "all-known"]
+
+
+def test_article_without_profile_is_not_treated_as_ideal():
+    """无画像文章的陌生词比例得分取中性值，不会排到画像匹配的文章前面"""
+    db = _make_session()
+    target = _article(db, "target", 72, "world", rare=10)
+    db.add(Article(title="unprofiled", url="https://example.com/unprofiled", category="science",
+                   readability_score=72, published_at=datetime.utcnow() - timedelta(hours=1)))
+    db.commit()
+
+    result = recommend_service.recommend_articles(db, count=2)
+    assert [a.title for a in result] == ["target", "unprofiled"]
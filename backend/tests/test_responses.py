@@ -0,0 +1,42 @@
+"""快速 JSON 响应测试"""
+import os
+import sys
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from pydantic import TypeAdapter
+
+from schemas.schemas import VocabItemOut
+from services import responses
+
+
+def _row(**overrides):
+    row = {
+        "id": 1, "word": "resilience", "lemma": "resilience", "pos": "noun", "definition": "韧性",
+        "definition_en": None, "example_sentence": None, "ease_factor": 2.5, "interval_days": 6,
+        "repetitions": 2, "next_review_date": date(2026, 10, 19),
+        "is_mastered": False, "created_at": datetime(2026, 10, 19, 8, 30, 15, 123456),
+    }
+    row.update(overrides)
+    return row
+
+
+def test_rows_match_pydantic_serialization():
+    """行字典直接输出与按 response_model 序列化的结果一致"""
+    adapter = TypeAdapter(list[VocabItemOut])
+    rows = [_row(), _row(id=2, created_at=datetime(2026, 10, 19, 8, 30))]
+    expected = adapter.dump_json(adapter.validate_python(rows))
+    assert responses.dumps(rows) == expected
+
+
+def test_model_response_validates_attributes_once():
+    class Item:
+        def __init__(self, **fields):
+            self.__dict__.update(fields)
+
+    adapter = TypeAdapter(list[VocabItemOut])
+    resp = responses.model_response(adapter, [Item(**_row())], headers={"X-Next-Cursor": "c"})
+    assert resp.media_type == "application/json"
+    assert resp.headers["X-Next-Cursor"] == "c"
+    assert resp.body == responses.dumps([_row()])
@@ -0,0 +1,125 @@
+"""文章保留与归档测试"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models import compression
+from models.database import Base
+from models.tables import (
+    ArchivedArticle, Article, ArticleProfile, ArticleSentence, SentenceLemma, VocabItem,
+)
+from services import retention_service
+
+
+def _make_session():
+    engine = create_engine("sqlite://")
+    compression.install(engine)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def _article(db, key: str, age_days: int, **kwargs) -> Article:
+    article = Article(
+        title=f"Article {key}", url=f"https://example.com/{key}",
+        published_at=datetime.utcnow() - timedelta(days=age_days), **kwargs,
+    )
+    db.add(article)
+    db.flush()
+    sentence = ArticleSentence(article_id=article.id, index=0, paragraph=0, text_en=f"Sentence of {key}.", text_zh="句子")
+    db.add(sentence)
+    db.flush()
+    db.add(SentenceLemma(lemma="sentence", sentence_id=sentence.id, article_id=article.id))
+    db.add(ArticleProfile(article_id=article.id))
+    return article
+
+
+def test_archives_only_old_unread_unreferenced_articles(tmp_path):
+    db = _make_session()
+    old = _article(db, "old", 60)
+    _article(db, "recent", 5)
+    _article(db, "read", 60, is_read=True)
+    linked = _article(db, "linked", 60)
+    db.add(VocabItem(word="sentence", article_id=linked.id))
+    db.commit()
+    old_id = old.id
+
+    result = retention_service.apply_retention(db, days=30, archive_dir=str(tmp_path), vacuum_after=False)
+
+    assert result["archived"] == 1
+    assert {a.title for a in db.query(Article).all()} == {"Article recent", "Article read", "Article linked"}
+    assert db.query(ArticleSentence).filter(ArticleSentence.article_id == old_id).count() == 0
+    assert db.query(SentenceLemma).filter(SentenceLemma.article_id == old_id).count() == 0
+    assert db.query(ArticleProfile).get(old_id) is None
+
+    stub = db.query(ArchivedArticle).filter(ArchivedArticle.article_id == old_id).one()
+    assert stub.url == "https://example.com/old"
+
+    records = list(retention_service.read_archive(result["file"]))
+    assert [r["id"] for r in records] == [old_id]
+    assert records[0]["sentences"] == [["Sentence of old.", "句子", 0]]
+
+
+def test_runs_incrementally_in_batches(tmp_path):
+    db = _make_session()
+    for i in range(5):
+        _article(db, str(i), 90)
+    db.commit()
+
+    first = retention_service.apply_retention(
+        db, days=30, archive_dir=str(tmp_path), batch_size=2, max_batches=1, vacuum_after=False,
+    )
+    assert first["archived"] == 2
+    rest = retention_service.apply_retention(db, days=30, archive_dir=str(tmp_path), batch_size=2, vacuum_after=False)
+    assert rest["archived"] == 3
+    assert db.query(Article).count() == 0
+    assert len(list(retention_service.read_archive(rest["file"]))) == 5
+
+
+def test_zero_days_disables_retention(tmp_path):
+    db = _make_session()
+    _article(db, "old", 400)
+    db.commit()
+    assert retention_service.apply_retention(db, days=0, archive_dir=str(tmp_path))["archived"] == 0
+
+
+def test_reused_article_ids_can_be_archived_again(tmp_path):
+    """SQLite 复用已删除的 article.id，再次归档不应主键冲突"""
+    db = _make_session()
+    first = _article(db, "first", 60)
+    db.commit()
+    first_id = first.id
+    retention_service.apply_retention(db, days=30, archive_dir=str(tmp_path), vacuum_after=False)
+
+    second = _article(db, "second", 60)
+    db.commit()
+    assert second.id == first_id
+    result = retention_service.apply_retention(db, days=30, archive_dir=str(tmp_path), vacuum_after=False)
+
+    assert result["archived"] == 1
+    stubs = db.query(ArchivedArticle).filter(ArchivedArticle.article_id == first_id).all()
+    assert sorted(s.url for s in stubs) == ["https://example.com/first", "https://example.com/second"]
+
+
+def test_near_duplicates_follow_their_canonical(tmp_path):
+    db = _make_session()
+    original = _article(db, "original", 60)
+    db.flush()
+    copy = Article(title="copy", url="https://example.com/copy", canonical_id=original.id,
+                   published_at=datetime.utcnow() - timedelta(days=1))
+    kept = Article(title="kept", url="https://example.com/kept", canonical_id=original.id,
+                   published_at=datetime.utcnow() - timedelta(days=1), is_read=True)
+    db.add_all([copy, kept])
+    db.commit()
+
+    result = retention_service.apply_retention(db, days=30, archive_dir=str(tmp_path), vacuum_after=False)
+
+    assert result["archived"] == 2
+    assert {a.url for a in db.query(ArchivedArticle)} == {"https://example.com/original", "https://example.com/copy"}
+    remaining = db.query(Article).one()
+    assert remaining.title == "kept"
+    assert remaining.canonical_id is None
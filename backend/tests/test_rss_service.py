@@ -52,3 +52,32 @@ def test_clean_extracted_text_removes_footer_noise_line():
     cleaned = rss_service._clean_extracted_text(raw)
     assert "BBC in other languages" not in cleaned
     assert "clean story paragraph" in cleaned
+
+
+def test_fetch_all_sources_against_fixture_server():
+    """端到端：本地夹具服务 -> 抓取 -> 入库；重抓走条件请求"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from benchmarks.feed_server import FeedServer
+    from models import compression
+    from models.database import Base
+    from models.tables import Article, ArticleSentence, NewsSource
+
+    engine = create_engine("sqlite://")
+    compression.install(engine)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    with FeedServer(sources=2, entries=3, paragraphs=4) as server:
+        db.add_all(NewsSource(name=f"S{i}", url=url, category="world") for i, url in enumerate(server.feed_urls))
+        db.commit()
+
+        assert rss_service.fetch_all_sources(db) == 6
+        assert rss_service.fetch_all_sources(db) == 0
+        assert server.not_modified == 2
+
+    assert db.query(Article).count() == 6
+    # 正文来自网页 <article>，导航/页脚不进入句子
+    texts = [s.text_en for s in db.query(ArticleSentence).all()]
+    assert texts and not any("Subscribe" in t or "Weather" in t for t in texts)
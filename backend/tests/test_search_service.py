@@ -0,0 +1,87 @@
+"""FTS5 全文检索测试"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models import compression
+from models.database import Base
+from models.tables import Article, ArticleSentence, VocabItem
+from services import search_service
+
+
+def _make_session():
+    engine = create_engine("sqlite://")
+    compression.install(engine)
+    Base.metadata.create_all(bind=engine)
+    search_service.init_search_index(engine)
+    return sessionmaker(bind=engine)()
+
+
+def _seed(db):
+    article = Article(title="Central banks raise interest rates", url="https://example.com/a")
+    other = Article(title="Football results", url="https://example.com/b")
+    db.add_all([article, other])
+    db.flush()
+    db.add_all([
+        ArticleSentence(article_id=article.id, index=0, text_en="Central banks raised interest rates again.",
+                        text_zh="各国央行再次加息。"),
+        ArticleSentence(article_id=article.id, index=1, text_en="Markets reacted calmly."),
+    ])
+    db.add(VocabItem(word="interest", lemma="interest", definition="利息", definition_en="money paid for a loan"))
+    db.commit()
+    return article
+
+
+def test_search_articles_ranks_title_matches_with_snippet():
+    db = _make_session()
+    article = _seed(db)
+
+    result = search_service.search(db, "interest rate", scope="articles")
+    assert result["total"] == 1
+    hit = result["items"][0]
+    assert hit["id"] == article.id
+    assert "<mark>" in hit["snippet"]
+
+
+def test_search_sentences_supports_chinese_and_tracks_updates():
+    db = _make_session()
+    article = _seed(db)
+
+    assert search_service.search(db, "央行再次", scope="sentences")["items"][0]["article_id"] == article.id
+
+    sentence = db.query(ArticleSentence).filter(ArticleSentence.index == 1).first()
+    sentence.text_en = "Investors stayed calm."
+    db.commit()
+    assert search_service.search(db, "markets", scope="sentences")["total"] == 0
+    assert search_service.search(db, "investors", scope="sentences")["total"] == 1
+
+
+def test_search_vocab_and_sanitizes_query_syntax():
+    db = _make_session()
+    _seed(db)
+
+    assert search_service.search(db, '"interest*', scope="vocab")["total"] == 1
+    assert search_service.search(db, "***", scope="vocab")["items"] == []
+
+
+def test_article_scores_are_normalised_per_index():
+    """标题与句子的 bm25 各自归一化：标题最佳命中不被句子分数的量级淹没"""
+    db = _make_session()
+    titled = Article(title="Inflation outlook", url="https://example.com/t")
+    wordy = Article(title="Weekly roundup", url="https://example.com/w")
+    db.add_all([titled, wordy])
+    db.flush()
+    db.add_all([
+        ArticleSentence(article_id=wordy.id, index=i, text_en=f"Inflation inflation inflation item {i}.")
+        for i in range(3)
+    ] + [ArticleSentence(article_id=titled.id, index=0, text_en="Prices were steady.")])
+    db.commit()
+
+    items = search_service.search(db, "inflation", scope="articles")["items"]
+    assert [i["id"] for i in items] == [titled.id, wordy.id]
+    assert items[0]["score"] == search_service._TITLE_WEIGHT
+    assert items[1]["score"] == 1.0
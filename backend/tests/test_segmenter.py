@@ -0,0 +1,30 @@
+"""分句器测试（黄金语料见 fixtures/segmenter_golden.json）"""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+
+from services.segmenter import split_paragraphs, split_sentences
+
+_GOLDEN = os.path.join(os.path.dirname(__file__), "fixtures", "segmenter_golden.json")
+
+with open(_GOLDEN, encoding="utf-8") as f:
+    _CASES = json.load(f)
+
+
+@pytest.mark.parametrize("case", _CASES, ids=[c["text"][:30] or "empty" for c in _CASES])
+def test_golden_corpus(case):
+    assert split_sentences(case["text"]) == case["sentences"]
+
+
+def test_unbalanced_brackets_do_not_swallow_the_rest():
+    text = "An aside (never closed. Next paragraph.\nThe story continues. It ends."
+    assert split_sentences(text)[-2:] == ["The story continues.", "It ends."]
+
+
+def test_split_paragraphs_keeps_block_boundaries():
+    text = "First one. First two.\n\n  \nSecond block."
+    assert split_paragraphs(text) == [["First one.", "First two."], ["Second block."]]
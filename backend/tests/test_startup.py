@@ -0,0 +1,66 @@
+"""启动路径测试：延迟导入、按版本跳过迁移、首次运行才写默认数据"""
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.database import Base
+from models.tables import NewsSource
+from services import scheduler
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(code: str, database: str) -> str:
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{database}")
+    proc = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    return proc.stdout.strip()
+
+
+def test_importing_app_skips_heavy_dependencies(tmp_path):
+    out = _run(
+        "import sys, app; print(','.join(m for m in ('openai', 'feedparser', 'httpx', 'alembic') if m in sys.modules))",
+        str(tmp_path / "app.db"),
+    )
+    assert out == ""
+
+
+def test_restart_skips_migrations_and_seeding(tmp_path):
+    database = str(tmp_path / "boot.db")
+    assert _run("from models.database import init_db; init_db(); print('ok')", database) == "ok"
+
+    out = _run(
+        "import sys\n"
+        "from models import database\n"
+        "from models.database import SessionLocal, init_db\n"
+        "from models.tables import NewsSource\n"
+        "def fail(): raise AssertionError('migrations should be skipped')\n"
+        "database._run_migrations = fail\n"
+        "db = SessionLocal(); db.query(NewsSource).delete(); db.commit(); db.close()\n"
+        "init_db()\n"
+        "db = SessionLocal(); print(db.query(NewsSource).count(), 'alembic' in sys.modules)\n",
+        database,
+    )
+    assert out == "0 False"
+
+
+def test_initial_crawl_skipped_after_recent_fetch(monkeypatch):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)
+    monkeypatch.setattr(scheduler, "SessionLocal", session)
+
+    assert not scheduler._fetched_recently()
+    db = session()
+    db.add(NewsSource(name="A", url="https://a.example/rss", last_success_at=datetime.utcnow() - timedelta(days=2)))
+    db.commit()
+    assert not scheduler._fetched_recently()
+    db.add(NewsSource(name="B", url="https://b.example/rss", last_success_at=datetime.utcnow() - timedelta(minutes=10)))
+    db.commit()
+    assert scheduler._fetched_recently()
@@ -0,0 +1,114 @@
+"""压缩存储测试"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from models import compression
+from models.database import Base
+from models.tables import Article, ArticleSentence
+from services import storage_service
+
+_SENTENCES = [
+    "The central bank said on Tuesday that interest rates would stay unchanged.",
+    "Officials said inflation remained above the target for the third month.",
+    "The government said on Monday that it would raise spending on schools.",
+    "Markets rose after the central bank said rates would stay on hold.",
+]
+
+
+def _make_session():
+    engine = create_engine("sqlite://")
+    compression.install(engine)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def test_compress_round_trip_and_legacy_plaintext():
+    for value in ["", "short", "经济增长放缓，央行维持利率不变。", _SENTENCES[0] * 3]:
+        assert compression.decompress_text(compression.compress_text(value)) == value
+    assert compression.decompress_text("legacy plain text") == "legacy plain text"
+    assert compression.compress_text(None) is None
+
+
+def test_trained_dictionary_shrinks_short_sentences():
+    samples = _SENTENCES * 50
+    zdict = compression.train_dictionary(samples)
+    assert 0 < len(zdict) <= compression.MAX_DICT_SIZE
+
+    raw = _SENTENCES[0].encode("utf-8")
+    assert len(compression._deflate(raw, zdict)) < len(compression._deflate(raw, None))
+
+
+def test_sentences_stored_compressed_and_article_text_rebuilt():
+    db = _make_session()
+    article = Article(title="t", url="https://example.com/t")
+    db.add(article)
+    db.flush()
+    db.add_all([
+        ArticleSentence(article_id=article.id, index=i, text_en=s, text_zh="中文")
+        for i, s in enumerate(_SENTENCES)
+    ])
+    db.commit()
+
+    stored = db.execute(text("SELECT typeof(text_en), unz(text_en) FROM article_sentence ORDER BY id")).first()
+    assert stored[0] == "blob"
+    assert stored[1] == _SENTENCES[0]
+    assert storage_service.article_text(db, article.id) == " ".join(_SENTENCES)
+
+
+def test_article_text_falls_back_to_legacy_content():
+    db = _make_session()
+    article = Article(title="t", url="https://example.com/t", content="Old body.")
+    db.add(article)
+    db.commit()
+    assert storage_service.article_text(db, article.id) == "Old body."
+
+
+def test_dictionaries_are_scoped_per_engine():
+    """两个数据库的同一字典 id 对应不同字典，互不干扰"""
+    sessions = [_make_session(), _make_session()]
+    for db, sentence in zip(sessions, (_SENTENCES[0], _SENTENCES[2])):
+        compression.register_dictionary(1, compression.train_dictionary([sentence] * 10), bind=db)
+
+    for db, sentence in zip(sessions, (_SENTENCES[0], _SENTENCES[2])):
+        article = Article(title="t", url="https://example.com/t")
+        db.add(article)
+        db.flush()
+        db.add(ArticleSentence(article_id=article.id, index=0, text_en=sentence, text_zh="中文"))
+        db.commit()
+
+    for db, sentence in zip(sessions, (_SENTENCES[0], _SENTENCES[2])):
+        blob = db.execute(text("SELECT text_en FROM article_sentence")).scalar()
+        assert blob[0] == 0x02
+        assert compression.store_for(db).decompress(blob) == sentence
+        assert db.execute(text("SELECT unz(text_en) FROM article_sentence")).scalar() == sentence
+    assert compression.store_for(sessions[0]) is not compression.store_for(sessions[1])
+
+
+def test_install_registers_unz_for_new_engines():
+    """迁移命令自建的引擎调用 install 后即可在 SQL 中使用 unz()"""
+    engine = create_engine("sqlite://")
+    store = compression.install(engine)
+    assert compression.install(engine) is store
+    with engine.connect() as conn:
+        packed = store.compress(_SENTENCES[1])
+        assert conn.execute(text("SELECT unz(:v)"), {"v": packed}).scalar() == _SENTENCES[1]
+
+
+def test_article_text_restores_paragraph_breaks():
+    db = _make_session()
+    article = Article(title="t", url="https://example.com/t")
+    db.add(article)
+    db.flush()
+    db.add_all([
+        ArticleSentence(article_id=article.id, index=i, paragraph=p, text_en=s)
+        for i, (p, s) in enumerate(zip([0, 0, 1, 1], _SENTENCES))
+    ])
+    db.commit()
+    assert storage_service.article_text(db, article.id) == (
+        f"{_SENTENCES[0]} {_SENTENCES[1]}\n{_SENTENCES[2]} {_SENTENCES[3]}"
+    )
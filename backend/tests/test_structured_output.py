@@ -0,0 +1,78 @@
+"""容错 JSON 解析与 schema 校验测试"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from pydantic import BaseModel
+
+from services.structured_output import JSONRepairParser, StructuredOutputError, parse, parse_json
+
+
+def test_plain_and_fenced_json():
+    assert parse_json('{"a": 1}') == {"a": 1}
+    assert parse_json('```json\n{"a": [1, 2]}\n```') == {"a": [1, 2]}
+    assert parse_json('Here is the result:\n{"a": "b"}\nHope it helps!') == {"a": "b"}
+
+
+def test_trailing_commas_are_dropped():
+    assert parse_json('{"a": [1, 2,], "b": 3,}') == {"a": [1, 2], "b": 3}
+
+
+def test_truncated_output_is_closed():
+    assert parse_json('{"reply": "Hello wor') == {"reply": "Hello wor"}
+    assert parse_json('{"a": 1, "tasks": [{"title": "x"}, {"title": "y"') == {
+        "a": 1, "tasks": [{"title": "x"}, {"title": "y"}],
+    }
+
+
+def test_incomplete_member_is_discarded():
+    assert parse_json('{"a": "x", "b": tru') == {"a": "x"}
+    assert parse_json('{"a": "x", "ke') == {"a": "x"}
+    assert parse_json('{"a": "x", "b":') == {"a": "x"}
+    assert parse_json('[1, 2, ') == [1, 2]
+
+
+def test_strings_containing_brackets_and_escapes():
+    text = '{"a": "use [brackets] and {braces}, \\"quotes\\"", "b": "line\nbreak"}'
+    assert parse_json(text) == {"a": 'use [brackets] and {braces}, "quotes"', "b": "line\nbreak"}
+
+
+def test_skips_bracketed_prose_before_json():
+    assert parse_json('Answer [see below]: {"a": 1}') == {"a": 1}
+
+
+def test_incremental_feed_matches_whole_text():
+    text = '```json\n{"reply": "Sure, let\'s talk.", "correction": null, "suggestion": "x"}\n```'
+    parser = JSONRepairParser()
+    snapshots = []
+    for i in range(0, len(text), 7):
+        parser.feed(text[i:i + 7])
+        if parser.started:
+            try:
+                snapshots.append(parser.value())
+            except ValueError:
+                pass
+    assert parser.done
+    assert snapshots[-1] == parse_json(text)
+    # 中途的快照也是合法的部分结果
+    assert any(s.get("reply", "").startswith("Sure") and "suggestion" not in s for s in snapshots)
+
+
+def test_no_json_raises():
+    with pytest.raises(ValueError):
+        parse_json("I cannot answer that.")
+
+
+class _Reply(BaseModel):
+    reply: str
+    correction: str | None = None
+
+
+def test_parse_validates_schema():
+    assert parse('{"reply": "hi"}', _Reply) == {"reply": "hi", "correction": None}
+    with pytest.raises(StructuredOutputError):
+        parse('{"answer": "hi"}', _Reply)
+    with pytest.raises(StructuredOutputError):
+        parse("plain text", _Reply)
@@ -0,0 +1,30 @@
+"""独立任务 worker —— 在 Web 进程之外运行 RSS 抓取、归档等定时任务
+
+    SCHEDULER_ENABLED=false uvicorn main:app --workers 4   # Web 进程只处理请求
+    python worker.py                                       # 定时任务单独运行
+
+可启动多个 worker 做热备，数据库租约保证同一时刻只有一个在执行任务。
+"""
+import signal
+import threading
+
+from models.database import init_db
+from services import ai_telemetry
+from services.scheduler import shutdown_scheduler, start_scheduler
+
+
+def main():
+    init_db()
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+
+    start_scheduler()
+    print("[Worker] 已启动，Ctrl+C 退出")
+    stop.wait()
+    shutdown_scheduler()
+    ai_telemetry.shutdown()
+
+
+if __name__ == "__main__":
+    main()